@@ -9,6 +9,11 @@ def inject(new_data):
     data = new_data
 
 
+def get_data():
+    """Returns the complete injected input data."""
+    return data
+
+
 def get_schedule() -> [(int, int)]:
     """Returns a dictionary of date indices to day and time slot details."""
     return data["timeslots"]
@@ -7,11 +7,32 @@ from src.python.io import printer_json
 # DEFAULT CONFIGURATION
 config = {
     "algorithm": {
-        "generations_max": 50
+        "generations_max": 50,
+        "fitness_cache_mb": 256,
+        "log_interval": 100,
+        "fitness_workers": 0,
+        "seeded_population_fraction": 0.0,
+        "local_search_interval": 0,
+        "local_search_top_k": 3,
+        "local_search_moves": 200,
+        "fitness_weight_core": 1,
+        "fitness_weight_hard": 1,
+        "fitness_weight_soft": 1,
+        "fitness_lexicographic": False,
+        "stagnation_generations": 0,
+        "multi_objective": False,
+        "multi_objective_fairness": False,
+        "pareto_front_size": 5,
+        "checkpoint_interval": 100,
+        "islands": 0,
+        "island_migration_interval": 50,
+        "island_migration_size": 2
     },
     "application": {
         "filepath_input": "input.json",
-        "server_allowed_ips": ["*"]
+        "server_allowed_ips": ["*"],
+        "job_workers": 1,
+        "result_format": "json"
     }
 }
 
@@ -48,6 +69,61 @@ def get_path_input_custom(filename):
 def get_algorithm_generations_max():
     return config["algorithm"]["generations_max"]
 
+def get_algorithm_fitness_cache_mb():
+    return config["algorithm"]["fitness_cache_mb"]
+
+def get_algorithm_log_interval():
+    return config["algorithm"]["log_interval"]
+
+def get_algorithm_fitness_workers():
+    return config["algorithm"]["fitness_workers"]
+
+def get_algorithm_seeded_population_fraction():
+    return config["algorithm"]["seeded_population_fraction"]
+
+def get_algorithm_local_search():
+    # None disables the memetic local search
+    if config["algorithm"]["local_search_interval"] <= 0:
+        return None
+
+    return {
+        "interval": config["algorithm"]["local_search_interval"],
+        "top_k": config["algorithm"]["local_search_top_k"],
+        "max_moves": config["algorithm"]["local_search_moves"]
+    }
+
+def get_algorithm_fitness_weights():
+    return {
+        "core": config["algorithm"]["fitness_weight_core"],
+        "hard": config["algorithm"]["fitness_weight_hard"],
+        "soft": config["algorithm"]["fitness_weight_soft"],
+        "lexicographic": config["algorithm"]["fitness_lexicographic"]
+    }
+
+def get_algorithm_stagnation_generations():
+    return config["algorithm"]["stagnation_generations"]
+
+def get_algorithm_multi_objective():
+    return config["algorithm"]["multi_objective"]
+
+def get_algorithm_multi_objective_fairness():
+    return config["algorithm"]["multi_objective_fairness"]
+
+def get_algorithm_pareto_front_size():
+    return config["algorithm"]["pareto_front_size"]
+
+def get_algorithm_checkpoint_interval():
+    return config["algorithm"]["checkpoint_interval"]
+
+def get_algorithm_islands():
+    return config["algorithm"]["islands"]
+
+def get_algorithm_island_migration_interval():
+    return config["algorithm"]["island_migration_interval"]
+
+def get_algorithm_island_migration_size():
+    return config["algorithm"]["island_migration_size"]
+
 
 def get_application_path_config():
     # macht nur sinn hardcoded
@@ -60,3 +136,14 @@ def get_config():
 
 def get_server_allowed_ips():
     return config["application"]["server_allowed_ips"]
+
+def get_application_job_workers():
+    return config["application"]["job_workers"]
+
+def get_application_result_format():
+    return config["application"]["result_format"]
+
+def use_config(snapshot):
+    # replaces the configuration of this process only, e.g. with the snapshot of a job, without saving it
+    config.clear()
+    config.update(snapshot)
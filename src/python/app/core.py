@@ -1,14 +1,21 @@
 from src.python.api import database
 from src.python.app import config
-from src.python.ga import genetic_algorithm
-from src.python.io import reader_json
-from src.python.io import printer_json
+from src.python.ga import checkpoint, genetic_algorithm, island_model
+from src.python.io import reader_json, reader_compact
+from src.python.io import printer_json, printer_compact
 from src.python.log.logger import logger_app
-from src.python.utils import time_utils, stundenplan_utils
+from src.python.utils import path_utils, time_utils, stundenplan_utils
 
 
-def run():
-    input_data = reader_json.parse(config.get_path_input())
+def run(resume=None, warm_start=None, pin_unchanged=False, input_data=None, on_progress=None, job_id=None,
+        checkpoint_id=None):
+    """Runs the genetic algorithm on the configured input and saves the solution.
+
+    Jobs pass their own `input_data`, an `on_progress` callback, their `job_id`, which is part of the
+    solution's file name, and the `checkpoint_id` of their run. Returns the path of the saved solution, `None` if the run could not start.
+    """
+    if input_data is None:
+        input_data = reader_json.parse(config.get_path_input())
 
     if input_data is None:
         logger_app.error("Could not start core application, no input data exists")
@@ -21,14 +28,70 @@ def run():
         logger_app.error("Messages: " + str(verify["messages"]))
         return
 
+    if resume is not None and not checkpoint.exists(resume):
+        logger_app.error(f"Could not resume run, no checkpoint {resume} exists")
+        return
+
+    previous_timetable = None
+    if warm_start is not None and resume is None:
+        solution_path = path_utils.find_solution_path(warm_start)
+        previous_solution = reader_compact.parse_solution(solution_path) if solution_path is not None else None
+        if previous_solution is None or "timetable" not in previous_solution:
+            logger_app.error(f"Could not warm start run, no solution {warm_start} exists")
+            return
+        logger_app.debug(f"Warm start from {solution_path}")
+        previous_timetable = previous_solution["timetable"]
+
     database.inject(input_data)
 
     generations = config.get_algorithm_generations_max()
     logger_app.debug(f"Genetic algorithm started (generations = {generations})")
 
-    runtime, parsed_solution, fitness, generations_completed = genetic_algorithm.genetic_algorithm(generations)
+    islands = config.get_algorithm_islands()
+    multi_objective = config.get_algorithm_multi_objective()
+    if multi_objective and islands > 1:
+        logger_app.info("Multi-objective runs use a single population, islands are ignored")
+    if (resume is not None or previous_timetable is not None) and islands > 1:
+        logger_app.info("Resumed and warm started runs use a single population, islands are ignored")
+
+    if islands > 1 and not multi_objective and resume is None and previous_timetable is None:
+        runtime, parsed_solution, fitness, generations_completed = island_model.run_islands(
+            generations,
+            islands,
+            migration_interval=config.get_algorithm_island_migration_interval(),
+            migration_size=config.get_algorithm_island_migration_size(),
+            fitness_cache_mb=config.get_algorithm_fitness_cache_mb(),
+            log_interval=config.get_algorithm_log_interval(),
+            seeded_fraction=config.get_algorithm_seeded_population_fraction(),
+            local_search=config.get_algorithm_local_search(),
+            fitness_weights=config.get_algorithm_fitness_weights(),
+            stagnation_generations=config.get_algorithm_stagnation_generations(),
+            on_progress=on_progress
+        )
+    else:
+        runtime, parsed_solution, fitness, generations_completed = genetic_algorithm.genetic_algorithm(
+            generations,
+            fitness_cache_mb=config.get_algorithm_fitness_cache_mb(),
+            log_interval=config.get_algorithm_log_interval(),
+            fitness_workers=config.get_algorithm_fitness_workers(),
+            seeded_fraction=config.get_algorithm_seeded_population_fraction(),
+            local_search=config.get_algorithm_local_search(),
+            fitness_weights=config.get_algorithm_fitness_weights(),
+            stagnation_generations=config.get_algorithm_stagnation_generations(),
+            multi_objective=multi_objective,
+            fairness_objective=config.get_algorithm_multi_objective_fairness(),
+            pareto_front_size=config.get_algorithm_pareto_front_size(),
+            checkpoint_interval=config.get_algorithm_checkpoint_interval(),
+            resume=resume,
+            checkpoint_id=checkpoint_id,
+            warm_start=previous_timetable,
+            pin_unchanged=pin_unchanged,
+            on_progress=on_progress
+        )
     logger_app.debug(f"Solution fitness: {fitness}")
     logger_app.debug(f"Generations completed: {generations_completed}")
     logger_app.debug(f"Actual runtime: {time_utils.seconds_to_formatted_duration(runtime)}")
 
-    printer_json.save_solution(parsed_solution)
\ No newline at end of file
+    if config.get_application_result_format() == "compact":
+        return printer_compact.save_solution(parsed_solution, job_id)
+    return printer_json.save_solution(parsed_solution, job_id)
\ No newline at end of file
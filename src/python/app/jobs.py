@@ -0,0 +1,236 @@
+import copy
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.python.app import config, core
+from src.python.app.progress import ProgressBuffer
+from src.python.ga import checkpoint
+from src.python.log import logger
+from src.python.log.logger import logger_app
+from src.python.utils.process_utils import PROCESS_CONTEXT
+
+MAX_JOBS: int = 100
+"""Created and finished jobs kept in memory, the oldest ones are forgotten first."""
+
+CREATED = "created"
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class Job:
+    """One run of the algorithm with its own input, config snapshot, progress and result."""
+
+    def __init__(self, input_data: Dict[str, Any], input_filename: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.status = CREATED
+        self.input_data = input_data
+        self.input_filename = input_filename
+        self.config: Optional[Dict[str, Any]] = None
+        self.options: Dict[str, Any] = {}
+        self.checkpoint_id: Optional[str] = None
+        self.progress: Dict[str, Any] = {}
+        self.events = ProgressBuffer()
+        self.result_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created = datetime.now().isoformat()
+        self.started: Optional[str] = None
+        self.finished: Optional[str] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "input": self.input_filename,
+            "progress": self.progress,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """Runs jobs in worker processes, at most `workers()` at a time, in the order they were queued.
+
+    Every job runs `core.run` in its own spawned process with its own input and a snapshot of the config
+    taken when it is queued, so jobs neither share the injected database nor the GIL. The process reports
+    progress, log records and its result through a queue, read by a thread of the server per running job.
+    The path of every solution is passed to the `on_completed` callbacks before the job is marked completed.
+    """
+
+    def __init__(self, workers: Callable[[], int]):
+        self.workers = workers
+        self.on_completed: List[Callable[[str], None]] = []
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self.posted_id: Optional[str] = None
+        self.pending: deque = deque()
+        self.running = 0
+        self.condition = threading.Condition()
+        self.dispatcher: Optional[threading.Thread] = None
+
+    def create(self, input_data: Dict[str, Any], input_filename: Optional[str] = None, posted: bool = False) -> Job:
+        """Creates a job for an input, `posted` marks it as the job of the latest POST."""
+        job = Job(input_data, input_filename)
+        with self.condition:
+            self.jobs[job.id] = job
+            if posted:
+                self.posted_id = job.id
+            self._forget_inactive()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def latest_posted(self) -> Optional[Job]:
+        """Returns the job of the latest POST, `None` if it has already been queued or forgotten."""
+        with self.condition:
+            job = self.jobs.get(self.posted_id) if self.posted_id is not None else None
+            return job if job is not None and job.status == CREATED else None
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in list(self.jobs.values())]
+
+    def is_busy(self) -> bool:
+        return any(job.is_active for job in list(self.jobs.values()))
+
+    def active_checkpoints(self) -> List[str]:
+        """Returns the ids of the checkpoints queued or running jobs write or resume from."""
+        return [job.checkpoint_id for job in list(self.jobs.values()) if job.is_active]
+
+    def submit(self, job: Job, **options) -> None:
+        """Queues a created job with a snapshot of the current config and the options of `core.run`.
+
+        Raises:
+            `ValueError`: If the job has already been queued.
+        """
+        with self.condition:
+            if job.status != CREATED:
+                raise ValueError(f"Job {job.id} has already been queued")
+            job.status = QUEUED
+            job.config = copy.deepcopy(config.get_config())
+            job.events.generations_max = job.config["algorithm"]["generations_max"]
+            # the checkpoint id is known up front, so the checkpoints of active jobs can be told apart
+            job.checkpoint_id = options.get("resume") or checkpoint.new_checkpoint_id()
+            job.options = dict(options, checkpoint_id=job.checkpoint_id)
+            self.pending.append(job)
+
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+                self.dispatcher.start()
+            self.condition.notify_all()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending or self.running >= max(self.workers(), 1):
+                    self.condition.wait()
+                job = self.pending.popleft()
+                self.running += 1
+                job.status = RUNNING
+                job.started = datetime.now().isoformat()
+
+            threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True).start()
+
+    def _run(self, job: Job) -> None:
+        logger_app.info(f"Job {job.id} started")
+        try:
+            job.result_path = _execute(job)
+            for callback in self.on_completed:
+                try:
+                    callback(job.result_path)
+                except Exception as e:
+                    logger_app.error(f"Result of job {job.id} could not be published: {e}")
+            job.status = COMPLETED
+            logger_app.info(f"Job {job.id} completed")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger_app.error(f"Job {job.id} failed: {e}")
+        finally:
+            job.finished = datetime.now().isoformat()
+            job.input_data = None
+            job.events.close()
+            with self.condition:
+                self.running -= 1
+                self._forget_inactive()
+                self.condition.notify_all()
+
+    def _forget_inactive(self) -> None:
+        # jobs created by a POST but never queued hold their input, they count like finished ones
+        inactive = [job_id for job_id, job in self.jobs.items()
+                    if not job.is_active and job_id != self.posted_id]
+        for job_id in inactive[:max(len(inactive) - MAX_JOBS, 0)]:
+            del self.jobs[job_id]
+
+
+def _execute(job: Job) -> str:
+    """Runs a job in a new process and returns the path of its solution."""
+    messages = PROCESS_CONTEXT.Queue()
+    # not a daemon, the island model and the parallel fitness evaluation start processes of their own
+    process = PROCESS_CONTEXT.Process(
+        target=_run_job,
+        args=(job.id, job.input_data, job.config, job.options, messages),
+        name=f"job-{job.id}"
+    )
+    process.start()
+
+    try:
+        while True:
+            try:
+                message = messages.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    raise RuntimeError(f"Job process exited with code {process.exitcode}")
+                continue
+
+            if isinstance(message, logging.LogRecord):
+                logger.handle_forwarded(message)
+            elif message[0] == "progress":
+                job.progress = job.events.append(message[1])
+            elif message[0] == "result":
+                if message[1] is None:
+                    raise RuntimeError("Run did not produce a solution, see the application log")
+                return message[1]
+            else:
+                raise RuntimeError(message[1])
+    finally:
+        process.join()
+
+
+def _run_job(job_id, input_data, config_snapshot, options, messages) -> None:
+    """Entry point of a job process.
+
+    The process is spawned, so it imports the modules anew: logging is configured from the logging config
+    file, appending to the server's log files, and the config is set from the job's snapshot, nothing is
+    inherited from the server.
+    """
+    logger.configure_logging()
+    # log files and console are written by this process, the in-memory logs of the server are fed by it
+    logger.forward_memory_logs(messages)
+
+    config.use_config(config_snapshot)
+    start = time.perf_counter()
+
+    def on_progress(progress):
+        messages.put(("progress", dict(progress, runtime=round(time.perf_counter() - start, 2))))
+
+    try:
+        result_path = core.run(input_data=input_data, on_progress=on_progress, job_id=job_id, **options)
+        messages.put(("result", result_path))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
+
+job_queue = JobQueue(config.get_application_job_workers)
@@ -0,0 +1,85 @@
+import json
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+PROGRESS_BUFFER_SIZE: int = 256
+"""Progress records kept per job, clients that fall further behind skip the oldest ones."""
+
+RATE_WINDOW: int = 10
+"""Records the generations per second are averaged over."""
+
+KEEPALIVE_SECONDS: float = 15.0
+
+
+class ProgressBuffer:
+    """Ring buffer of the latest progress records of one job.
+
+    Records are numbered consecutively, the numbers are used as SSE event ids, so a client reconnecting
+    with `Last-Event-ID` continues where it left off. Appending derives the generations per second and the
+    remaining time up to `generations_max` from the generation and runtime of the record.
+    """
+
+    def __init__(self, size: int = PROGRESS_BUFFER_SIZE):
+        self.records: deque = deque(maxlen=size)
+        self.sequence = 0
+        self.closed = False
+        self.generations_max: Optional[int] = None
+        self.condition = threading.Condition()
+
+    def append(self, progress: Dict[str, Any]) -> Dict[str, Any]:
+        with self.condition:
+            record = dict(progress)
+            record["generations_per_second"] = None
+            record["eta"] = None
+
+            if self.records and "runtime" in record:
+                reference = self.records[-min(RATE_WINDOW, len(self.records))]
+                seconds = record["runtime"] - reference["runtime"]
+                if seconds > 0:
+                    rate = (record["generation"] - reference["generation"]) / seconds
+                    record["generations_per_second"] = round(rate, 2)
+                    if rate > 0 and self.generations_max is not None:
+                        # an upper bound, runs stop early once they reach fitness 0 or stagnate
+                        record["eta"] = round(max(self.generations_max - record["generation"], 0) / rate, 1)
+
+            self.sequence += 1
+            record["id"] = self.sequence
+            self.records.append(record)
+            self.condition.notify_all()
+        return record
+
+    def close(self) -> None:
+        """Marks the job as finished and wakes up all waiting clients."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def since(self, last_id: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """Waits up to `timeout` seconds for records after `last_id`.
+
+        Returns:
+            The records after `last_id` still in the buffer and whether the buffer is closed.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > last_id or self.closed, timeout)
+            return [record for record in self.records if record["id"] > last_id], self.closed
+
+
+def stream(buffer: ProgressBuffer, last_id: int, final: Callable[[], Dict[str, Any]]) -> Iterator[str]:
+    """Yields the records of `buffer` after `last_id` as Server-Sent Events until the buffer is closed.
+
+    The last event is a `done` event with the data returned by `final`. Comments are sent while no
+    record arrives, so proxies keep the connection open.
+    """
+    while True:
+        records, closed = buffer.since(last_id, KEEPALIVE_SECONDS)
+        for record in records:
+            last_id = record["id"]
+            yield f"id: {last_id}\nevent: progress\ndata: {json.dumps(record, separators=(',', ':'))}\n\n"
+
+        if closed:
+            yield f"event: done\ndata: {json.dumps(final(), separators=(',', ':'))}\n\n"
+            return
+        if not records:
+            yield ": keepalive\n\n"
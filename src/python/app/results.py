@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.python.io import reader_compact
+from src.python.log.logger import logger_app
+from src.python.utils import path_utils
+
+GZIP_LEVEL: int = 6
+
+
+class CachedResult:
+    """A solution rendered once into the body of a response, uncompressed and gzipped."""
+
+    def __init__(self, path: str, body: bytes):
+        self.path = path
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        self.etag = hashlib.sha1(body).hexdigest()
+
+
+class ResultCache:
+    """Keeps the response of the latest solution in memory.
+
+    The latest solution is found through `path_utils.LATEST_SOLUTION_POINTER_PATH`, which every saved
+    solution updates, so a request only stats the pointer file instead of listing the output folder and
+    parsing the solution again. Jobs publish their solution when they finish, solutions saved by other
+    processes (e.g. `main.py`) are picked up through the pointer on the next request.
+    """
+
+    def __init__(self, render: Callable[[Dict[str, Any]], Dict[str, Any]] = lambda response: response):
+        self.render = render
+        self.result: Optional[CachedResult] = None
+        self.pointer_state: Optional[Tuple[int, int]] = None
+        self.lock = threading.Lock()
+
+    def latest(self) -> Optional[CachedResult]:
+        """Returns the latest solution, `None` if no solution has been generated yet.
+
+        Raises:
+            `ValueError`: If the solution can't be parsed.
+        """
+        pointer_state = _pointer_state()
+        with self.lock:
+            if self.result is not None and pointer_state == self.pointer_state:
+                return self.result
+
+            filepath = path_utils.find_solution_path("latest")
+            if filepath is None:
+                return None
+            if self.result is None or self.result.path != filepath:
+                logger_app.debug(f"Newest file determined: {filepath}")
+                self.result = self._load(filepath)
+            self.pointer_state = pointer_state
+            return self.result
+
+    def publish(self, filepath: str) -> None:
+        """Makes a newly saved solution the latest one."""
+        pointer_state = _pointer_state()
+        result = self._load(filepath)
+        with self.lock:
+            self.result = result
+            self.pointer_state = pointer_state
+
+    def _load(self, filepath: str) -> CachedResult:
+        data = reader_compact.parse_solution(filepath)
+        if data is None:
+            raise ValueError(f"Solution {filepath} can't be parsed")
+
+        # the timestamp of the solution, so unchanged solutions keep the same body and ETag
+        timestamp = datetime.fromtimestamp(os.path.getmtime(filepath)).isoformat()
+        response = self.render({"status": "success", "timestamp": timestamp, "data": data})
+        return CachedResult(filepath, json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
+
+def _pointer_state() -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path_utils.LATEST_SOLUTION_POINTER_PATH)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import queue
+import random
+import re
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+import pytz
+
+from src.python.log.logger import logger_ga
+from src.python.utils import path_utils
+
+CHECKPOINT_INTERVAL: int = 0
+"""Generations between two checkpoints of a run, 0 disables checkpoints."""
+
+CHECKPOINT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def new_checkpoint_id() -> str:
+    current_time: str = (
+        datetime.now(pytz.utc)
+        .astimezone(pytz.timezone("Europe/Berlin"))
+        .strftime("%Y-%m-%d_%H-%M-%S")
+    )
+    # runs of concurrent jobs may start within the same second
+    return f"run_{current_time}_{uuid.uuid4().hex[:6]}"
+
+
+def checkpoint_path(checkpoint_id: str) -> str:
+    """Returns the path of a checkpoint, ids are restricted to file name characters."""
+    if not CHECKPOINT_ID_PATTERN.match(checkpoint_id):
+        raise ValueError(f'Invalid checkpoint id "{checkpoint_id}".')
+    return os.path.join(path_utils.RESOURCE_CHECKPOINT_PATH, f"{checkpoint_id}.npz")
+
+
+def exists(checkpoint_id: str) -> bool:
+    try:
+        return os.path.isfile(checkpoint_path(checkpoint_id))
+    except ValueError:
+        return False
+
+
+def list_checkpoints() -> List[str]:
+    """Returns the ids of all stored checkpoints, newest first."""
+    directory = path_utils.RESOURCE_CHECKPOINT_PATH
+    if not os.path.isdir(directory):
+        return []
+
+    files = [f for f in os.listdir(directory) if f.endswith(".npz")]
+    files.sort(key=lambda f: os.path.getmtime(os.path.join(directory, f)), reverse=True)
+    return [f[:-len(".npz")] for f in files]
+
+
+def input_digest(lessons, date_x_room) -> str:
+    """Fingerprint of the input a checkpoint belongs to, a population only fits the same lessons and genes."""
+    content = json.dumps([lessons, date_x_room], sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def random_states(rng: np.random.Generator) -> str:
+    """Returns the states of the gene space's generator and the global generators pygad uses as JSON."""
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    version, internal_state, gauss_next = random.getstate()
+    return json.dumps({
+        "gene_space": rng.bit_generator.state,
+        "numpy": [name, keys.tolist(), pos, has_gauss, cached_gaussian],
+        "random": [version, list(internal_state), gauss_next],
+    })
+
+
+def restore_random_states(rng: np.random.Generator, states: str) -> None:
+    states = json.loads(states)
+    rng.bit_generator.state = states["gene_space"]
+
+    name, keys, pos, has_gauss, cached_gaussian = states["numpy"]
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
+
+    version, internal_state, gauss_next = states["random"]
+    random.setstate((version, tuple(internal_state), gauss_next))
+
+
+def save(checkpoint_id: str, arrays: Dict[str, Any]) -> None:
+    """Writes a checkpoint atomically: a crash while writing leaves the previous checkpoint intact."""
+    filepath = checkpoint_path(checkpoint_id)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    temporary_path = f"{filepath}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez_compressed(file, **arrays)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, filepath)
+
+
+def load(checkpoint_id: str) -> Dict[str, Any]:
+    """Reads a checkpoint into a dictionary of its arrays, scalars are unpacked.
+
+    Raises:
+        `FileNotFoundError`: If no checkpoint with the id exists.
+    """
+    with np.load(checkpoint_path(checkpoint_id), allow_pickle=False) as data:
+        return {key: data[key].item() if data[key].ndim == 0 else data[key] for key in data.files}
+
+
+def remove(checkpoint_id: str) -> None:
+    if exists(checkpoint_id):
+        os.remove(checkpoint_path(checkpoint_id))
+
+
+class CheckpointWriter:
+    """Writes the checkpoints of one run on a background thread.
+
+    `submit` only copies the arrays and returns, the thread compresses and writes them. If the thread is
+    still busy with a previous checkpoint, the pending one is replaced, so only the newest state is written.
+    """
+
+    def __init__(self, checkpoint_id: str):
+        self.checkpoint_id = checkpoint_id
+        self.pending: queue.Queue = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._run, name=f"checkpoint-{checkpoint_id}", daemon=True)
+        self.thread.start()
+
+    def submit(self, arrays: Dict[str, Any]) -> None:
+        arrays = {key: np.copy(value) for key, value in arrays.items()}
+        try:
+            self.pending.get_nowait()
+        except queue.Empty:
+            pass
+        self.pending.put(arrays)
+
+    def close(self) -> None:
+        """Writes the pending checkpoint, if any, and stops the thread."""
+        self.pending.put(None)
+        self.thread.join()
+
+    def _run(self) -> None:
+        while True:
+            arrays = self.pending.get()
+            if arrays is None:
+                return
+            try:
+                save(self.checkpoint_id, arrays)
+            except OSError as e:
+                logger_ga.error(f"Could not write checkpoint {self.checkpoint_id}: {e}")
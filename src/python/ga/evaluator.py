@@ -2,8 +2,41 @@ import numpy as np
 from typing import Optional, Any, Dict, Tuple, List, Set
 from numpy.typing import NDArray
 
-from src.python.api import database
-from src.python.ga import evaluator_constraint, evaluator_expression
+from src.python.ga import problem
+
+
+def evaluate_breakdown(population: NDArray[np.uint32], lessons, date_x_room) -> NDArray[np.int64]:
+    """Evaluates all constraints of a 2-D population, see `Problem.evaluate` for the row layout.
+
+    If the compiled problem has a fitness cache, solutions that have been evaluated before are taken
+    from it and only the remaining solutions are evaluated (in one batch).
+    """
+    population = np.asarray(population, dtype=np.int64)
+    compiled = problem.get_problem(lessons, date_x_room)
+    cache = compiled.fitness_cache
+
+    evaluate = compiled.evaluate if compiled.parallel_evaluator is None else compiled.parallel_evaluator.evaluate
+
+    if cache is None:
+        return evaluate(population)
+
+    keys = [cache.key(solution) for solution in population]
+    breakdown = np.empty((len(population), compiled.num_columns), dtype=np.int64)
+    missing = []
+
+    for idx, key in enumerate(keys):
+        cached = cache.get(key)
+        if cached is None:
+            missing.append(idx)
+        else:
+            breakdown[idx] = cached
+
+    if missing:
+        breakdown[missing] = evaluate(population[missing])
+        for idx in missing:
+            cache.put(keys[idx], breakdown[idx].copy())
+
+    return breakdown
 
 
 def evaluate_constraints_core(
@@ -15,90 +48,25 @@ def evaluate_constraints_core(
     Evaluates core constraints like overlaps for students, teachers, and rooms.
     Returns fitness, violations, and satisfied constraints.
     """
-    constraint_violations = {
-        "employee_conflicts": 0,
-        "student_conflicts": 0,
-        "room_capacity": 0,
-        "room_type": 0,
-    }
-    constraints_satisfied = {
-        "employee_conflicts": 0,
-        "student_conflicts": 0,
-        "room_capacity": 0,
-        "room_type": 0,
-    }
-    employee_planned_at_date = set()
-    date_x_students = set()
-
-    for event_idx, date_x_room_id in enumerate(solution):
-        event = lessons[event_idx]
-        schedule = date_x_room[date_x_room_id]
-        date = schedule["date"]
-        room = schedule["room"]
-
-        # event = {name: string, employees: [string], participants: [string], size: integer, weekly_blocks: integer, room_type: string}
-        # date = {day: integer, timeslot: integer}
-        # room = {name: string, capacity: integer, room_type: string}
-
-        # Check for employee conflicts
-        for employee_id in event["employees"]:
-            employee_x_date = (employee_id, tuple(date.items()))
-            if employee_x_date in employee_planned_at_date:
-                constraint_violations["employee_conflicts"] += 1
-            else:
-                constraints_satisfied["employee_conflicts"] += 1
-            employee_planned_at_date.add(employee_x_date)
-
-        # Check for student conflicts
-        for participant in event["participants"]:
-            date_x_student = (participant, tuple(date.items()))
-            if date_x_student in date_x_students:
-                constraint_violations["student_conflicts"] += 1
-            else:
-                constraints_satisfied["student_conflicts"] += 1
-            date_x_students.add(date_x_student)
-
-        if room["capacity"] < event["size"]:
-            constraint_violations["room_capacity"] += 1
-        else:
-            constraints_satisfied["room_capacity"] += 1
+    compiled = problem.get_problem(lessons, date_x_room)
+    violated = evaluate_breakdown(np.asarray(solution)[np.newaxis, :], lessons, date_x_room)[0, compiled.core_columns]
+    satisfied = compiled.core_totals - violated
 
-        # Check for room type
-        if room["room_type"] != event["room_type"]:
-            constraint_violations["room_type"] += 1
-        else:
-            constraints_satisfied["room_type"] += 1
+    constraint_violations = {name: int(count) for name, count in zip(problem.CORE_CONSTRAINTS, violated)}
+    constraints_satisfied = {name: int(count) for name, count in zip(problem.CORE_CONSTRAINTS, satisfied)}
 
     fitness = -sum(constraint_violations.values())
 
     return fitness, constraint_violations, constraints_satisfied
 
 
-def evaluate_constraint(constraint, solution, lessons, date_x_room):
-    type = constraint["type"]
-
-    if type.lower() == "EmployeeFreeTimeslots".lower():
-        return evaluator_constraint.evaluate_employee_free_timeslots(constraint, solution, lessons, date_x_room)
-    elif type.lower() == "EmployeeSubsequentTimeslots".lower():
-        return evaluator_constraint.evaluate_employee_subsequent_timeslots(constraint, solution, lessons, date_x_room)
-    elif type.lower() == "EventDistributeWeeklyBlocks".lower():
-        return evaluator_constraint.evaluate_event_distribute_weekly_blocks(constraint, solution, lessons, date_x_room)
-    elif type.lower() == "Expression".lower():
-        return evaluator_expression.evaluate_expression(constraint["fields"]["expression"], solution, lessons,
-                                                        date_x_room)
-
-    return 0
-
-
-def evaluate_constraints_hard(solution: NDArray[np.uint32], lessons, date_x_room):
+def evaluate_constraints(constraints: List[problem.CompiledConstraint], fitness_values: NDArray[np.int64]):
     violations = []
     satisfied = []
     total_fitness = 0
 
-    constraints = database.get_constraints_hard()
-
-    for constraint in constraints:
-        fitness = evaluate_constraint(constraint, solution, lessons, date_x_room)
+    for (constraint, _), fitness in zip(constraints, fitness_values):
+        fitness = int(fitness)
         if fitness == 0:
             satisfied.append(constraint)
         else:
@@ -108,32 +76,56 @@ def evaluate_constraints_hard(solution: NDArray[np.uint32], lessons, date_x_room
     return total_fitness, violations, satisfied
 
 
+def evaluate_constraints_hard(solution: NDArray[np.uint32], lessons, date_x_room):
+    compiled = problem.get_problem(lessons, date_x_room)
+    breakdown = evaluate_breakdown(np.asarray(solution)[np.newaxis, :], lessons, date_x_room)[0]
+    return evaluate_constraints(compiled.constraints_hard, breakdown[compiled.hard_columns])
+
+
 def evaluate_constraints_soft(solution: NDArray[np.uint32], lessons, date_x_room):
-    violations = []
-    satisfied = []
-    total_fitness = 0
+    compiled = problem.get_problem(lessons, date_x_room)
+    breakdown = evaluate_breakdown(np.asarray(solution)[np.newaxis, :], lessons, date_x_room)[0]
+    return evaluate_constraints(compiled.constraints_soft, breakdown[compiled.soft_columns])
 
-    constraints = database.get_constraints_soft()
 
-    for constraint in constraints:
-        fitness = evaluate_constraint(constraint, solution, lessons, date_x_room)
-        if fitness == 0:
-            satisfied.append(constraint)
-        else:
-            total_fitness += fitness
-            violations.append(constraint)
+def evaluate_population(
+        population: NDArray[np.uint32], lessons, date_x_room
+) -> Tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+    """Evaluates the core, hard and soft fitness of all solutions of a 2-D population at once.
 
-    return total_fitness, violations, satisfied
+    Returns:
+        Three arrays with one core, hard and soft fitness value per solution.
+    """
+    compiled = problem.get_problem(lessons, date_x_room)
+    breakdown = evaluate_breakdown(population, lessons, date_x_room)
+
+    core_fitness = -breakdown[:, compiled.core_columns].sum(axis=1)
+    hard_fitness = breakdown[:, compiled.hard_columns].sum(axis=1)
+    soft_fitness = breakdown[:, compiled.soft_columns].sum(axis=1)
+
+    return core_fitness, hard_fitness, soft_fitness
 
 
 def fitness_function(
         instance: Any, solution: NDArray[np.uint32], solution_idx: int
-) -> int:
-    """Fitness function to evaluate individual solutions."""
-    lessons, date_x_room = instance.variables  # type: ignore
+) -> Any:
+    """Fitness function to evaluate individual solutions, a list of objectives in multi-objective runs."""
+    return fitness_function_batch(instance, solution[np.newaxis, :], [solution_idx])[0].tolist()
 
-    core_fitness, core_violations, core_satisfied = evaluate_constraints_core(solution, lessons, date_x_room)
-    hard_fitness, hard_violations, hard_satisfied = evaluate_constraints_hard(solution, lessons, date_x_room)
-    soft_fitness, soft_violations, soft_satisfied = evaluate_constraints_soft(solution, lessons, date_x_room)
 
-    return core_fitness + hard_fitness + soft_fitness
+def fitness_function_batch(
+        instance: Any, solutions: NDArray[np.uint32], solutions_indices: List[int]
+) -> NDArray[np.int64]:
+    """Fitness function to evaluate a batch of solutions, used with pygad's `fitness_batch_size`.
+
+    Core, hard and soft results are combined with the weights of the compiled problem, see
+    `Problem.set_fitness_weights`. In multi-objective runs one row of `Problem.objectives` is returned
+    per solution instead.
+    """
+    lessons, date_x_room = instance.variables  # type: ignore
+
+    compiled = problem.get_problem(lessons, date_x_room)
+    breakdown = evaluate_breakdown(solutions, lessons, date_x_room)
+    if compiled.multi_objective:
+        return compiled.objectives(breakdown)
+    return compiled.fitness(breakdown)
@@ -1,5 +1,12 @@
-def evaluate_employee_free_timeslots(constraint, solution, lessons, date_x_room):
-    employee = constraint["owner"]
+import numpy as np
+
+# Constraints are compiled once per run: each compile function resolves everything that does not depend
+# on a solution (lesson indices, forbidden dates, ...) and returns a closure that receives a 2-D
+# population of shape (solutions, lessons) and returns one fitness value (0 or negative) per solution.
+
+
+def employee_free_timeslots_mask(constraint, problem):
+    """Returns a boolean array over all genes that is True where the employee must not have lessons."""
     timeslots = constraint["fields"]["timeslots"]
     inverted = constraint["inverted"]
 
@@ -9,80 +16,98 @@ def evaluate_employee_free_timeslots(constraint, solution, lessons, date_x_room)
     # if inverted, employee is only allowed to have events in given timeslots
 
     forbidden_slots = {(slot["day"], slot["timeslot"]) for slot in timeslots}
+    forbidden_dates = np.array(
+        [(day, timeslot) in forbidden_slots for day, timeslot in zip(problem.date_day, problem.date_timeslot)],
+        dtype=bool
+    )
+    if inverted:
+        forbidden_dates = ~forbidden_dates
+
+    return forbidden_dates[problem.gene_date]
+
+
+def day_timeslot_keys(problem):
+    """Returns one sortable key per gene for its (day, timeslot).
+
+    Consecutive timeslots of the same day differ by exactly 1, timeslots of different days by more.
+    """
+    timeslot_min = problem.date_timeslot.min()
+    day_span = problem.date_timeslot.max() - timeslot_min + 2
+    return (problem.date_day * day_span + problem.date_timeslot - timeslot_min)[problem.gene_date]
+
+
+def count_subsequent_violations(sorted_slots, limit):
+    """Counts the lessons exceeding `limit` lessons in a row within the sorted timeslots of one day."""
     violations = 0
+    consecutive_count = 1
+    for i in range(1, len(sorted_slots)):
+        if sorted_slots[i] == sorted_slots[i - 1] + 1:
+            consecutive_count += 1
+            if consecutive_count > limit:
+                violations += 1
+        else:
+            consecutive_count = 1
+
+    return violations
 
-    for event_idx, date_x_room_id in enumerate(solution):
-        event = lessons[event_idx]
-        schedule = date_x_room[date_x_room_id]
-        date = schedule["date"]
 
-        if employee in event["employees"]:
-            if not inverted:
-                if (date["day"], date["timeslot"]) in forbidden_slots:
-                    return -1
-            else:
-                if (date["day"], date["timeslot"]) not in forbidden_slots:
-                    return -1
+def compile_employee_free_timeslots(constraint, problem):
+    employee = constraint["owner"]
 
-    return 0
+    forbidden_genes = employee_free_timeslots_mask(constraint, problem)
+    lesson_indices = problem.lessons_of_employee(employee)
 
+    def evaluate(population):
+        return -np.any(forbidden_genes[population[:, lesson_indices]], axis=1).astype(np.int64)
 
-def evaluate_employee_subsequent_timeslots(constraint, solution, lessons, date_x_room):
+    return evaluate
+
+
+def compile_employee_subsequent_timeslots(constraint, problem):
     employee = constraint["owner"]
     limit = constraint["fields"]["limit"]
     # invert ignored
     # employee is not allowed to have more than limit lessons in a row
 
-    employee = constraint["owner"]
-    limit = constraint["fields"]["limit"]
-    employee_schedule = {}
+    lesson_indices = problem.lessons_of_employee(employee)
 
-    for event_idx, date_x_room_id in enumerate(solution):
-        event = lessons[event_idx]
-        schedule = date_x_room[date_x_room_id]
-        date = schedule["date"]
+    gene_keys = day_timeslot_keys(problem)
 
-        if employee in event["employees"]:
-            if date["day"] not in employee_schedule:
-                employee_schedule[date["day"]] = []
-            employee_schedule[date["day"]].append(date["timeslot"])
+    def evaluate(population):
+        if len(lesson_indices) < 2:
+            return np.zeros(len(population), dtype=np.int64)
 
-    violations = 0
+        keys = np.sort(gene_keys[population[:, lesson_indices]], axis=1)
+
+        # run[i] = number of consecutive +1 steps ending at position i + 1
+        subsequent = np.diff(keys, axis=1) == 1
+        steps = np.cumsum(subsequent, axis=1)
+        run = steps - np.maximum.accumulate(np.where(subsequent, 0, steps), axis=1)
 
-    for day, timeslots in employee_schedule.items():
-        sorted_slots = sorted(timeslots)
-        consecutive_count = 1
-        for i in range(1, len(sorted_slots)):
-            if sorted_slots[i] == sorted_slots[i - 1] + 1:
-                consecutive_count += 1
-                if consecutive_count > limit:
-                    violations += 1
-            else:
-                consecutive_count = 1
+        return -np.count_nonzero(subsequent & (run >= limit), axis=1)
 
-    return -violations
+    return evaluate
 
 
-def evaluate_event_distribute_weekly_blocks(constraint, solution, lessons, date_x_room):
+def compile_event_distribute_weekly_blocks(constraint, problem):
     # if not inverted, events with the same name must not be on the same day
     # if inverted, then events with the same name must be on the same day
 
     event_name = constraint["fields"]["event"]
     inverted = constraint["inverted"]
-    event_days = set()
-
-    for event_idx, date_x_room_id in enumerate(solution):
-        event = lessons[event_idx]
-        if event["name"] == event_name:
-            schedule = date_x_room[date_x_room_id]
-            date = schedule["date"]
-            if date["day"] in event_days:
-                if not inverted:
-                    return -1
-            else:
-                event_days.add(date["day"])
-
-    if not inverted:
-        return 0
-    else:
-        return 0 if len(event_days) <= 1 else -1
+
+    lesson_indices = problem.lessons_of_event(event_name)
+    gene_days = problem.date_day[problem.gene_date]
+
+    def evaluate(population):
+        if len(lesson_indices) == 0:
+            return np.zeros(len(population), dtype=np.int64)
+
+        days = np.sort(gene_days[population[:, lesson_indices]], axis=1)
+
+        if not inverted:
+            return -np.any(days[:, 1:] == days[:, :-1], axis=1).astype(np.int64)
+        else:
+            return -(days[:, -1] != days[:, 0]).astype(np.int64)
+
+    return evaluate
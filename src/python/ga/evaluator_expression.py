@@ -1,3 +1,11 @@
+import functools
+
+import numpy as np
+
+from src.python.ga import evaluator_expression_lowering, evaluator_expression_numpy
+from src.python.log.logger import logger_ga
+
+
 def has_employee(employee, event):
     """Prüft, ob der Mitarbeiter im Event beteiligt ist."""
     return employee in event.get("employees", [])
@@ -53,66 +61,200 @@ def events_all_same_day(events, name):
     return len(days) == 1
 
 
+EXPRESSION_GLOBALS = {
+    "__builtins__": None,
+    "has_employee": has_employee,
+    "has_participant": has_participant,
+    "on_day": on_day,
+    "on_timeslot": on_timeslot,
+    "day": day,
+    "timeslot": timeslot,
+    "event_room_name": event_room_name,
+    "event_named": event_named,
+    "events_by_name": events_by_name,
+    "events_by_employee": events_by_employee,
+    "events_all_same_day": events_all_same_day,
+    "any": any,
+    "all": all,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "len": len,
+    "range": range,
+}
+"""Sichere Umgebung: nur erlaubte Funktionen, `events` wird pro Lösung ergänzt."""
+
+
+@functools.lru_cache(maxsize=None)
+def compile_source(expression):
+    """Compiles a DSL expression once into a code object, raises SyntaxError for invalid expressions."""
+    return compile(expression, "<expression>", "eval")
+
+
+class Event:
+    """Read-only view of one event in `EventColumns`, usable like the event dictionaries of the DSL."""
+
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    def get(self, key, default=None):
+        return self.columns.value(self.index, key, default)
+
+    def __getitem__(self, key):
+        value = self.columns.value(self.index, key, KeyError)
+        if value is KeyError:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self.columns.lesson_columns or key in self.columns.gene_columns
+
+
+class EventColumns:
+    """Column-oriented view of the events of one solution.
+
+    Lesson columns (name, employees, ...) are the same for every solution and gene columns (day,
+    room name, ...) are looked up by the solution's gene of the event, so loading a solution only
+    replaces the gene list. The `Event` views are created once and read the currently loaded solution.
+    """
+
+    def __init__(self, lessons, date_x_room):
+        self.lesson_columns = {
+            "name": [lesson.get("name", None) for lesson in lessons],
+            "employees": [lesson.get("employees", []) for lesson in lessons],
+            "participants": [lesson.get("participants", []) for lesson in lessons],
+            "size": [lesson.get("size") for lesson in lessons],
+        }
+        self.gene_columns = {
+            "day": [schedule["date"].get("day") for schedule in date_x_room],
+            "timeslot": [schedule["date"].get("timeslot") for schedule in date_x_room],
+            "room_name": [schedule["room"].get("name") for schedule in date_x_room],
+            "room_capacity": [schedule["room"].get("capacity") for schedule in date_x_room],
+            "room_size": [schedule["room"].get("size") for schedule in date_x_room],
+        }
+        self.genes = []
+        self.events = [Event(self, i) for i in range(len(lessons))]
+
+    def load(self, solution):
+        self.genes = [int(gene) for gene in solution]
+
+    def value(self, index, key, default=None):
+        column = self.lesson_columns.get(key)
+        if column is not None:
+            return column[index]
+
+        column = self.gene_columns.get(key)
+        if column is not None:
+            return column[self.genes[index]]
+
+        return default
+
+
+def _evaluate_code(code, expression_globals):
+    """Evaluates a compiled expression against globals holding the `events`: 0 if it holds, otherwise -1."""
+    return 0 if eval(code, expression_globals) else -1
+
+
 def evaluate_expression(expression, solution, lessons, date_x_room):
     """
     Wertet einen DSL-Ausdruck aus und liefert das Ergebnis zurück.
 
     Dabei wird ein vereinfachter Kontext erstellt, in dem alle Events
-    als Dictionary mit den Schlüsseln 'day', 'timeslot', 'employees' und 'name'
-    verfügbar sind. Zudem stehen Hilfsfunktionen zur Verfügung, die das
-    Schreiben von Constraints erleichtern.
+    mit den Schlüsseln 'name', 'employees', 'participants', 'size', 'day',
+    'timeslot', 'room_name', 'room_capacity' und 'room_size' verfügbar sind.
+    Zudem stehen Hilfsfunktionen zur Verfügung, die das Schreiben von
+    Constraints erleichtern.
     """
-
-    # Kombiniere die Daten zu einer Liste von Events
-    events = []
-    for i, schedule_id in enumerate(solution):
-        event = lessons[i]
-        schedule = date_x_room[schedule_id]
-        date = schedule["date"]
-        room = schedule["date"]
-
-        events.append({
-            "name": event.get("name", None),
-            "employees": event.get("employees", []),
-            "participants": event.get("participants", []),
-            "size": event.get("size"),
-            "day": date.get("day"),
-            "timeslot": date.get("timeslot"),
-            "room_name": room.get("name"),
-            "room_capacity": room.get("capacity"),
-            "room_size": room.get("size"),
-        })
-
-    # Sichere Umgebung: nur erlaubte Funktionen und Daten
-    safe_globals = {"__builtins__": None}
-    safe_globals.update({
-        "events": events,
-        "has_employee": has_employee,
-        "has_participant": has_participant,
-        "on_day": on_day,
-        "on_timeslot": on_timeslot,
-        "day": day,
-        "timeslot": timeslot,
-        "event_room_name": event_room_name,
-        "event_named": event_named,
-        "events_by_name": events_by_name,
-        "events_by_employee": events_by_employee,
-        "events_all_same_day": events_all_same_day,
-        "any": any,
-        "all": all,
-        "min": min,
-        "max": max,
-        "sum": sum,
-        "len": len,
-        "range": range,
-    })
+    columns = EventColumns(lessons, date_x_room)
+    columns.load(solution)
 
     try:
-        result = eval(expression, safe_globals)
-        if result:
-            return 0
-        else:
-            return -1
+        return _evaluate_code(compile_source(expression), dict(EXPRESSION_GLOBALS, events=columns.events))
     except Exception as e:
-        print("Fehler beim Auswerten des Ausdrucks:", e)
+        logger_ga.warning(f"Fehler beim Auswerten des Ausdrucks: {e}")
         return -1
+
+
+BACKENDS = {
+    "python": (EventColumns, EXPRESSION_GLOBALS),
+    "numpy": (evaluator_expression_numpy.EventTable, evaluator_expression_numpy.EXPRESSION_GLOBALS),
+}
+"""Event view and DSL functions per backend: the reference implementation above or the indexed NumPy one."""
+
+EXPRESSION_BACKEND = "numpy"
+
+
+class ExpressionEvaluator:
+    """Evaluates all expression constraints of a problem together, one solution at a time.
+
+    Expressions are compiled once when they are added. The event view of a solution is loaded once and
+    shared by all expressions, the results of the latest population are kept until `clear` so that
+    the evaluation function of every expression constraint only picks its own column.
+    """
+
+    def __init__(self, lessons, date_x_room, backend=EXPRESSION_BACKEND):
+        columns, expression_globals = BACKENDS[backend]
+        self.columns = columns(lessons, date_x_room)
+        # the event views never change, only the solution loaded into the columns
+        self.globals = dict(expression_globals, events=self.columns.events)
+        self.codes = []
+        self.failed = set()
+        self.population = None
+        self.results = None
+
+    def add(self, expression):
+        """Registers an expression and returns its column in the results of `evaluate`."""
+        self.codes.append(compile_source(expression))
+        self.clear()
+        return len(self.codes) - 1
+
+    def clear(self):
+        self.population = None
+        self.results = None
+
+    def evaluate(self, population):
+        """Returns the fitness (0 or -1) of every expression for every solution, shape (solutions, expressions)."""
+        if population is self.population:
+            return self.results
+
+        results = np.empty((len(population), len(self.codes)), dtype=np.int64)
+        for row, solution in enumerate(population):
+            self.columns.load(solution)
+            for column, code in enumerate(self.codes):
+                try:
+                    results[row, column] = _evaluate_code(code, self.globals)
+                except Exception as e:
+                    results[row, column] = -1
+                    if column not in self.failed:
+                        # reported once per expression, not for every solution
+                        self.failed.add(column)
+                        logger_ga.warning(f"Fehler beim Auswerten des Ausdrucks: {e}")
+
+        self.population = population
+        self.results = results
+        return results
+
+
+def compile_expression(constraint, problem):
+    expression = constraint["fields"]["expression"]
+
+    lowered = evaluator_expression_lowering.lower_expression(expression, problem)
+    if lowered is not None:
+        problem.lowered_expressions.append(constraint.get("id"))
+        logger_ga.debug(f"Expression von Constraint {constraint.get('id')} als Array-Auswertung übersetzt: {expression}")
+        return lowered
+
+    try:
+        column = problem.expressions.add(expression)
+    except SyntaxError as e:
+        # verify_input rejects invalid expressions, a run must not continue with a constraint that can never hold
+        raise ValueError(f"Expression of constraint {constraint.get('id')} is invalid: {e}") from e
+
+    def evaluate(population):
+        return problem.expressions.evaluate(population)[:, column]
+
+    evaluate.lessons = evaluator_expression_lowering.referenced_lessons(expression, problem)
+    return evaluate
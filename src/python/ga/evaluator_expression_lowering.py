@@ -0,0 +1,268 @@
+import ast
+import operator
+
+import numpy as np
+
+# Lowers expression constraints of common shapes to array evaluations over whole populations, e.g.
+#
+#   all(not (has_employee('X', event) and on_day(event, 2)) for event in events)
+#   all(on_timeslot(event, 1) for event in events_by_name(events, 'Y'))
+#   events_all_same_day(events, 'Z')
+#
+# An `all`/`any` over events becomes a boolean matrix of shape (lessons, genes) built from the predicate:
+# lesson atoms (has_employee, has_participant, event_named) vary over lessons, gene atoms (on_day,
+# on_timeslot, comparisons of day, timeslot and room name) vary over genes. The result for a population is
+# read from that matrix at (lesson, gene of the lesson). Expressions using anything else are not lowered
+# and keep being evaluated by the interpreter.
+#
+# Both lowered and interpreted expressions expose the lessons whose genes can change their result, so the
+# incremental evaluator only evaluates an expression again when one of these lessons moves.
+
+COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+GENE_FUNCTIONS = {
+    "day": "day",
+    "timeslot": "timeslot",
+    "event_room_name": "room_name",
+}
+"""DSL functions returning a gene dependent value of an event, by the event key they read."""
+
+
+class NotLowerable(Exception):
+    pass
+
+
+class Lowering:
+    """Translates the AST of one expression into a function of the population, see `lower_expression`."""
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.num_lessons = problem.num_lessons
+        self.gene_values = {
+            "day": [schedule["date"].get("day") for schedule in problem.date_x_room],
+            "timeslot": [schedule["date"].get("timeslot") for schedule in problem.date_x_room],
+            "room_name": [schedule["room"].get("name") for schedule in problem.date_x_room],
+        }
+        # lessons whose gene the expression depends on
+        self.lessons = np.zeros(self.num_lessons, dtype=bool)
+
+    def solution_level(self, node):
+        """Returns a function mapping a population to one bool per solution for a whole expression."""
+        if isinstance(node, ast.BoolOp):
+            operands = [self.solution_level(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda population: combine.reduce([operand(population) for operand in operands])
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self.solution_level(node.operand)
+            return lambda population: ~operand(population)
+
+        name = _call_name(node)
+        if name in ("all", "any") and len(node.args) == 1 and not node.keywords:
+            return self.quantifier(name, node.args[0])
+
+        if name == "events_all_same_day" and len(node.args) == 2 and not node.keywords:
+            lessons = np.intersect1d(self.source(node.args[0]), self.problem.lessons_of_event(_constant(node.args[1])))
+            return self.all_same_day(lessons)
+
+        raise NotLowerable(ast.dump(node))
+
+    def quantifier(self, name, node):
+        if not isinstance(node, ast.GeneratorExp) or len(node.generators) != 1:
+            raise NotLowerable(ast.dump(node))
+
+        generator = node.generators[0]
+        if not isinstance(generator.target, ast.Name) or generator.is_async:
+            raise NotLowerable(ast.dump(node))
+
+        variable = generator.target.id
+        lessons = self.source(generator.iter)
+        matrix = self.predicate(node.elt, variable)
+        for condition in generator.ifs:
+            # events failing the condition are skipped: true for all(), false for any()
+            condition_matrix = self.predicate(condition, variable)
+            matrix = (~condition_matrix | matrix) if name == "all" else (condition_matrix & matrix)
+
+        matrix = np.broadcast_to(matrix, (self.num_lessons, self.problem.num_genes))
+        reduce = np.all if name == "all" else np.any
+
+        # a lesson whose row is the same for every gene can't change the result
+        rows = matrix[lessons]
+        self.lessons[lessons[rows.any(axis=1) & ~rows.all(axis=1)]] = True
+
+        def evaluate(population):
+            return reduce(matrix[lessons, population[:, lessons]], axis=1)
+
+        return evaluate
+
+    def all_same_day(self, lessons):
+        self.lessons[lessons] = True
+        day_ids = {}
+        gene_day = np.array([day_ids.setdefault(day, len(day_ids)) for day in self.gene_values["day"]], dtype=np.int64)
+
+        def evaluate(population):
+            if len(lessons) == 0:
+                return np.zeros(len(population), dtype=bool)
+            days = gene_day[population[:, lessons]]
+            return np.all(days == days[:, :1], axis=1)
+
+        return evaluate
+
+    def source(self, node):
+        """Returns the lesson indices an event selection (`events`, `events_by_name(...)`, ...) yields."""
+        if isinstance(node, ast.Name) and node.id == "events":
+            return np.arange(self.num_lessons)
+
+        name = _call_name(node)
+        if name in ("events_by_name", "events_by_employee") and len(node.args) == 2 and not node.keywords:
+            lessons = self.source(node.args[0])
+            if name == "events_by_name":
+                selected = self.problem.lessons_of_event(_constant(node.args[1]))
+            else:
+                selected = self.problem.lessons_of_employee(_constant(node.args[1]))
+            return np.intersect1d(lessons, selected)
+
+        raise NotLowerable(ast.dump(node))
+
+    def predicate(self, node, variable):
+        """Returns a bool matrix broadcastable to (lessons, genes) for a predicate over one event."""
+        if isinstance(node, ast.BoolOp):
+            operands = [self.predicate(value, variable) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            result = operands[0]
+            for operand in operands[1:]:
+                result = combine(result, operand)
+            return result
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ~self.predicate(node.operand, variable)
+
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in COMPARISONS:
+            compare = COMPARISONS[type(node.ops[0])]
+            left, right = node.left, node.comparators[0]
+            if _is_constant(left):
+                # 'R' == event_room_name(event) is evaluated as written, constant on the left
+                key = self.gene_key(right, variable)
+                return self.gene_mask(key, lambda value: compare(left.value, value))
+            key = self.gene_key(left, variable)
+            constant = _constant(right)
+            return self.gene_mask(key, lambda value: compare(value, constant))
+
+        name = _call_name(node)
+        if name in ("has_employee", "has_participant") and len(node.args) == 2 and not node.keywords:
+            _expect_variable(node.args[1], variable)
+            owner = _constant(node.args[0])
+            key = "employees" if name == "has_employee" else "participants"
+            return self.lesson_mask(lambda lesson: owner in lesson.get(key, []))
+
+        if name == "event_named" and len(node.args) == 2 and not node.keywords:
+            _expect_variable(node.args[0], variable)
+            event_name = _constant(node.args[1])
+            return self.lesson_mask(lambda lesson: lesson.get("name", None) == event_name)
+
+        if name in ("on_day", "on_timeslot") and len(node.args) == 2 and not node.keywords:
+            _expect_variable(node.args[0], variable)
+            constant = _constant(node.args[1])
+            key = "day" if name == "on_day" else "timeslot"
+            return self.gene_mask(key, lambda value: value == constant)
+
+        raise NotLowerable(ast.dump(node))
+
+    def gene_key(self, node, variable):
+        name = _call_name(node)
+        if name in GENE_FUNCTIONS and len(node.args) == 1 and not node.keywords:
+            _expect_variable(node.args[0], variable)
+            return GENE_FUNCTIONS[name]
+        raise NotLowerable(ast.dump(node))
+
+    def gene_mask(self, key, test):
+        return np.array([bool(test(value)) for value in self.gene_values[key]], dtype=bool)[np.newaxis, :]
+
+    def lesson_mask(self, test):
+        return np.array([bool(test(lesson)) for lesson in self.problem.lessons], dtype=bool)[:, np.newaxis]
+
+
+def _call_name(node):
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        return node.func.id
+    return None
+
+
+def _is_constant(node):
+    return isinstance(node, ast.Constant)
+
+
+def _constant(node):
+    if not _is_constant(node):
+        raise NotLowerable(ast.dump(node))
+    return node.value
+
+
+def _expect_variable(node, variable):
+    if not (isinstance(node, ast.Name) and node.id == variable):
+        raise NotLowerable(ast.dump(node))
+
+
+def lower_expression(expression, problem):
+    """Returns an array evaluation (population -> fitness 0 or -1 per solution) of the expression, or None
+    if the expression does not have one of the supported shapes.
+
+    The returned function has a `lessons` attribute with the indices of the lessons it depends on.
+    """
+    lowering = Lowering(problem)
+    try:
+        evaluate = lowering.solution_level(ast.parse(expression, mode="eval").body)
+    except (NotLowerable, SyntaxError, TypeError, ValueError):
+        # anything the lowering does not understand or cannot evaluate up front stays with the interpreter
+        return None
+
+    def evaluate_fitness(population):
+        return np.where(evaluate(np.asarray(population, dtype=np.int64)), 0, -1).astype(np.int64)
+
+    evaluate_fitness.lessons = np.flatnonzero(lowering.lessons)
+    return evaluate_fitness
+
+
+def referenced_lessons(expression, problem):
+    """Returns the indices of the lessons an interpreted expression can read, or None if unknown.
+
+    Known if `events` is only used as the first argument of `events_by_name`, `events_by_employee` or
+    `events_all_same_day` with a constant second argument: the expression then only sees these lessons.
+    """
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        return None
+
+    lowering = Lowering(problem)
+    selections = {}
+    for node in ast.walk(tree):
+        name = _call_name(node)
+        if name in ("events_by_name", "events_by_employee", "events_all_same_day") and node.args:
+            selections[id(node.args[0])] = node
+
+    lessons = np.zeros(problem.num_lessons, dtype=bool)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Name) or node.id != "events":
+            continue
+        call = selections.get(id(node))
+        if not isinstance(node.ctx, ast.Load) or call is None:
+            return None
+        try:
+            if _call_name(call) == "events_all_same_day":
+                if len(call.args) != 2 or call.keywords:
+                    return None
+                lessons[problem.lessons_of_event(_constant(call.args[1]))] = True
+            else:
+                lessons[lowering.source(call)] = True
+        except (NotLowerable, TypeError):
+            return None
+
+    return np.flatnonzero(lessons)
@@ -0,0 +1,211 @@
+import numpy as np
+
+# NumPy backend of the expression DSL. It offers the same functions as evaluator_expression, but `events`
+# is backed by per-lesson and per-gene columns with prebuilt indexes by event name and employee, so
+# selecting events costs O(selected events) instead of a scan over all events.
+
+
+class Event:
+    """View of one event of the loaded solution, usable like the event dictionaries of the DSL."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def get(self, key, default=None):
+        return self.table.value(self.index, key, default)
+
+    def __getitem__(self, key):
+        value = self.table.value(self.index, key, KeyError)
+        if value is KeyError:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self.table.lesson_columns or key in self.table.gene_columns
+
+
+class Events(list):
+    """List of the events with the given lesson indices of an `EventTable`, keeping the indices."""
+
+    def __init__(self, table, indices):
+        super().__init__(table.views[index] for index in indices.tolist())
+        self.table = table
+        self.indices = indices
+
+
+class EventTable:
+    """Column-oriented events of one problem, `load` switches the solution the columns refer to.
+
+    Lesson columns and the name and employee indexes are built once. Loading a solution only looks up
+    the day and timeslot arrays of its genes, the room columns are read per gene on access.
+    """
+
+    def __init__(self, lessons, date_x_room):
+        self.lesson_columns = {
+            "name": [lesson.get("name", None) for lesson in lessons],
+            "employees": [lesson.get("employees", []) for lesson in lessons],
+            "participants": [lesson.get("participants", []) for lesson in lessons],
+            "size": [lesson.get("size") for lesson in lessons],
+        }
+        self.gene_columns = {
+            "day": [schedule["date"].get("day") for schedule in date_x_room],
+            "timeslot": [schedule["date"].get("timeslot") for schedule in date_x_room],
+            "room_name": [schedule["room"].get("name") for schedule in date_x_room],
+            "room_capacity": [schedule["room"].get("capacity") for schedule in date_x_room],
+            "room_size": [schedule["room"].get("size") for schedule in date_x_room],
+        }
+
+        self.employee_sets = [frozenset(employees) for employees in self.lesson_columns["employees"]]
+        self.participant_sets = [frozenset(participants) for participants in self.lesson_columns["participants"]]
+
+        by_name = {}
+        by_employee = {}
+        for index, lesson in enumerate(lessons):
+            by_name.setdefault(lesson.get("name", None), []).append(index)
+            for employee in self.employee_sets[index]:
+                by_employee.setdefault(employee, []).append(index)
+        self.index_by_name = {name: np.array(indices, dtype=np.int64) for name, indices in by_name.items()}
+        self.index_by_employee = {
+            employee: np.array(indices, dtype=np.int64) for employee, indices in by_employee.items()
+        }
+
+        self.gene_day = np.array(self.gene_columns["day"], dtype=object)
+        self.gene_timeslot = np.array(self.gene_columns["timeslot"], dtype=object)
+
+        self.views = [Event(self, index) for index in range(len(lessons))]
+        self.events = Events(self, np.arange(len(lessons), dtype=np.int64))
+
+        self.genes = []
+        self.day = np.zeros(0, dtype=object)
+        self.timeslot = np.zeros(0, dtype=object)
+        self.day_list = []
+        self.timeslot_list = []
+
+    def load(self, solution):
+        genes = np.asarray(solution, dtype=np.int64)
+        self.genes = genes.tolist()
+        self.day = self.gene_day[genes]
+        self.timeslot = self.gene_timeslot[genes]
+        self.day_list = self.day.tolist()
+        self.timeslot_list = self.timeslot.tolist()
+
+    def value(self, index, key, default=None):
+        if key == "day":
+            return self.day_list[index]
+        if key == "timeslot":
+            return self.timeslot_list[index]
+
+        column = self.lesson_columns.get(key)
+        if column is not None:
+            return column[index]
+
+        column = self.gene_columns.get(key)
+        if column is not None:
+            return column[self.genes[index]]
+
+        return default
+
+    def select(self, events, index, keep):
+        """Returns the `events` in `index` if they are all events of this table, else filters them."""
+        if events is self.events:
+            return Events(self, index)
+        if isinstance(events, Events):
+            return Events(self, np.intersect1d(events.indices, index))
+        return [event for event in events if keep(event)]
+
+
+def _table(event):
+    return event.table if isinstance(event, (Event, Events)) else None
+
+
+def has_employee(employee, event):
+    """Prüft, ob der Mitarbeiter im Event beteiligt ist."""
+    if isinstance(event, Event):
+        return employee in event.table.employee_sets[event.index]
+    return employee in event.get("employees", [])
+
+
+def has_participant(participant, event):
+    """Prüft, ob der Mitarbeiter im Event beteiligt ist."""
+    if isinstance(event, Event):
+        return participant in event.table.participant_sets[event.index]
+    return participant in event.get("participants", [])
+
+
+def on_day(event, day):
+    """Prüft, ob das Event an einem bestimmten Tag stattfindet."""
+    return event.get("day") == day
+
+
+def on_timeslot(event, timeslot):
+    """Prüft, ob das Event im angegebenen Timeslot stattfindet."""
+    return event.get("timeslot") == timeslot
+
+
+def day(event):
+    return event.get("day")
+
+
+def timeslot(event):
+    return event.get("timeslot")
+
+
+def event_named(event, name):
+    """Prüft, ob das Event den angegebenen Namen hat."""
+    return event.get("name") == name
+
+
+def events_by_name(events, name):
+    table = _table(events)
+    if table is None:
+        return [event for event in events if event.get("name") == name]
+    index = table.index_by_name.get(name, _NO_EVENTS)
+    return table.select(events, index, lambda event: event.get("name") == name)
+
+
+def event_room_name(event):
+    return event.get("room_name")
+
+
+def events_by_employee(events, employee):
+    table = _table(events)
+    if table is None:
+        return [event for event in events if employee in event.get("employees")]
+    index = table.index_by_employee.get(employee, _NO_EVENTS)
+    return table.select(events, index, lambda event: employee in event.get("employees"))
+
+
+def events_all_same_day(events, name):
+    events = events_by_name(events, name)
+    if isinstance(events, Events):
+        days = events.table.day[events.indices]
+        return len(days) > 0 and bool(np.all(days == days[0]))
+    return len({event["day"] for event in events}) == 1
+
+
+_NO_EVENTS = np.zeros(0, dtype=np.int64)
+
+EXPRESSION_GLOBALS = {
+    "__builtins__": None,
+    "has_employee": has_employee,
+    "has_participant": has_participant,
+    "on_day": on_day,
+    "on_timeslot": on_timeslot,
+    "day": day,
+    "timeslot": timeslot,
+    "event_room_name": event_room_name,
+    "event_named": event_named,
+    "events_by_name": events_by_name,
+    "events_by_employee": events_by_employee,
+    "events_all_same_day": events_all_same_day,
+    "any": any,
+    "all": all,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "len": len,
+    "range": range,
+}
@@ -0,0 +1,306 @@
+import bisect
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.python.ga import evaluator_constraint
+from src.python.ga.problem import CORE_CONSTRAINTS, Problem
+
+# Incremental counterpart of evaluator.evaluate_population for a single solution. The occupancy state of
+# the solution is kept in memory, so changing a few genes only updates the terms of the lessons involved.
+
+
+class _EmployeeFreeTimeslots:
+    def __init__(self, constraint, problem: Problem, solution):
+        self.lessons = problem.lessons_of_employee(constraint["owner"])
+        self.forbidden_genes = evaluator_constraint.employee_free_timeslots_mask(constraint, problem)
+        self.forbidden_count = int(np.count_nonzero(self.forbidden_genes[solution[self.lessons]]))
+
+    def move(self, lesson, old_gene, new_gene):
+        self.forbidden_count += int(self.forbidden_genes[new_gene]) - int(self.forbidden_genes[old_gene])
+
+    def fitness(self):
+        return -1 if self.forbidden_count > 0 else 0
+
+
+class _EmployeeSubsequentTimeslots:
+    def __init__(self, constraint, problem: Problem, solution):
+        self.lessons = problem.lessons_of_employee(constraint["owner"])
+        self.limit = constraint["fields"]["limit"]
+        self.gene_days = problem.date_day[problem.gene_date]
+        self.gene_keys = evaluator_constraint.day_timeslot_keys(problem)
+
+        # per day the sorted (day, timeslot) keys of the employee's lessons
+        self.day_slots: Dict[int, List[int]] = {}
+        for gene in solution[self.lessons]:
+            bisect.insort(self.day_slots.setdefault(int(self.gene_days[gene]), []), int(self.gene_keys[gene]))
+
+        self.day_violations = {
+            day: evaluator_constraint.count_subsequent_violations(slots, self.limit)
+            for day, slots in self.day_slots.items()
+        }
+        self.violations = sum(self.day_violations.values())
+
+    def _update_day(self, day):
+        violations = evaluator_constraint.count_subsequent_violations(self.day_slots[day], self.limit)
+        self.violations += violations - self.day_violations[day]
+        self.day_violations[day] = violations
+
+    def move(self, lesson, old_gene, new_gene):
+        old_day = int(self.gene_days[old_gene])
+        new_day = int(self.gene_days[new_gene])
+
+        self.day_slots[old_day].remove(int(self.gene_keys[old_gene]))
+        bisect.insort(self.day_slots.setdefault(new_day, []), int(self.gene_keys[new_gene]))
+        self.day_violations.setdefault(new_day, 0)
+
+        self._update_day(old_day)
+        if new_day != old_day:
+            self._update_day(new_day)
+
+    def fitness(self):
+        return -self.violations
+
+
+class _EventDistributeWeeklyBlocks:
+    def __init__(self, constraint, problem: Problem, solution):
+        self.lessons = problem.lessons_of_event(constraint["fields"]["event"])
+        self.inverted = constraint["inverted"]
+        self.gene_days = problem.date_day[problem.gene_date]
+        self.day_counts = Counter(int(day) for day in self.gene_days[solution[self.lessons]])
+        self.shared_days = sum(1 for count in self.day_counts.values() if count > 1)
+
+    def move(self, lesson, old_gene, new_gene):
+        old_day = int(self.gene_days[old_gene])
+        new_day = int(self.gene_days[new_gene])
+        if old_day == new_day:
+            return
+
+        self.shared_days -= self.day_counts[old_day] == 2
+        self.day_counts[old_day] -= 1
+        if self.day_counts[old_day] == 0:
+            del self.day_counts[old_day]
+
+        self.day_counts[new_day] += 1
+        self.shared_days += self.day_counts[new_day] == 2
+
+    def fitness(self):
+        # if not inverted, events with the same name must not be on the same day
+        # if inverted, then events with the same name must be on the same day
+        if not self.inverted:
+            return -1 if self.shared_days > 0 else 0
+        else:
+            return -1 if len(self.day_counts) > 1 else 0
+
+
+class _Recompute:
+    """Fallback for constraints without incremental state (e.g. expressions), evaluated from scratch.
+
+    Only moves of the lessons the evaluation function depends on (its `lessons` attribute, e.g. of compiled
+    expressions) mark it for evaluation, without that attribute all lessons do.
+    """
+
+    def __init__(self, evaluate, problem: Problem, solution):
+        lessons = getattr(evaluate, "lessons", None)
+        self.lessons = np.arange(problem.num_lessons) if lessons is None else lessons
+        self.evaluate = evaluate
+        self.solution = solution
+        self.value = int(evaluate(solution[np.newaxis, :])[0])
+        self.dirty = False
+
+    def move(self, lesson, old_gene, new_gene):
+        self.dirty = True
+
+    def fitness(self):
+        if self.dirty:
+            self.value = int(self.evaluate(self.solution[np.newaxis, :])[0])
+            self.dirty = False
+        return self.value
+
+
+INCREMENTAL_CONSTRAINTS = {
+    "EmployeeFreeTimeslots".lower(): _EmployeeFreeTimeslots,
+    "EmployeeSubsequentTimeslots".lower(): _EmployeeSubsequentTimeslots,
+    "EventDistributeWeeklyBlocks".lower(): _EventDistributeWeeklyBlocks,
+}
+
+
+class IncrementalEvaluator:
+    """Keeps the occupancy state of one solution and updates its fitness when genes change.
+
+    The state consists of employee x date and participant x date counts for the core constraints and
+    per constraint state for the hard and soft constraints (forbidden lesson counts, per day slot lists
+    for `EmployeeSubsequentTimeslots`, day counts for `EventDistributeWeeklyBlocks`). Changing a gene
+    costs O(employees + participants + constraints) of the lesson instead of O(lessons). Expression
+    constraints have no incremental state and are evaluated again when a change touches them.
+
+    Usable for local search: `delta` scores a move without keeping it, `apply` keeps it.
+    """
+
+    def __init__(self, problem: Problem, solution: NDArray):
+        self.problem = problem
+        self.solution = np.array(solution, dtype=np.int64)
+
+        dates = problem.gene_date[self.solution]
+        self.employee_cells = problem.employee_owner * problem.num_dates + dates[problem.employee_lesson]
+        self.participant_cells = problem.participant_owner * problem.num_dates + dates[problem.participant_lesson]
+        self.employee_counts = Counter(self.employee_cells.tolist())
+        self.participant_counts = Counter(self.participant_cells.tolist())
+
+        # incidence entries of each lesson, so a move only touches the cells of that lesson
+        self.lesson_employee_entries = _entries_by_lesson(problem.employee_lesson, problem.num_lessons)
+        self.lesson_participant_entries = _entries_by_lesson(problem.participant_lesson, problem.num_lessons)
+
+        self.core_violations = np.zeros(len(CORE_CONSTRAINTS), dtype=np.int64)
+        self.core_violations[0] = len(self.employee_cells) - len(self.employee_counts)
+        self.core_violations[1] = len(self.participant_cells) - len(self.participant_counts)
+        self.core_violations[2] = np.count_nonzero(problem.gene_room_capacity[self.solution] < problem.lesson_size)
+        self.core_violations[3] = np.count_nonzero(problem.gene_room_type[self.solution] != problem.lesson_room_type)
+
+        self.constraints_hard = [self._track(c) for c in problem.constraints_hard]
+        self.constraints_soft = [self._track(c) for c in problem.constraints_soft]
+
+        self.constraints_by_lesson: List[List[Tuple[object, List[int], int]]] = [[] for _ in range(problem.num_lessons)]
+        self.fitness_hard = [tracker.fitness() for tracker in self.constraints_hard]
+        self.fitness_soft = [tracker.fitness() for tracker in self.constraints_soft]
+        for fitness_list, trackers in ((self.fitness_hard, self.constraints_hard), (self.fitness_soft, self.constraints_soft)):
+            for idx, tracker in enumerate(trackers):
+                for lesson in np.unique(tracker.lessons):
+                    self.constraints_by_lesson[lesson].append((tracker, fitness_list, idx))
+
+    def _track(self, compiled_constraint):
+        constraint, evaluate = compiled_constraint
+        tracker = INCREMENTAL_CONSTRAINTS.get(constraint["type"].lower())
+        if tracker is None:
+            return _Recompute(evaluate, self.problem, self.solution)
+        return tracker(constraint, self.problem, self.solution)
+
+    @property
+    def core_fitness(self) -> int:
+        return -int(self.core_violations.sum())
+
+    @property
+    def hard_fitness(self) -> int:
+        return sum(self.fitness_hard)
+
+    @property
+    def soft_fitness(self) -> int:
+        return sum(self.fitness_soft)
+
+    @property
+    def fitness(self):
+        """Fitness with the weights of the problem, the same value as `evaluator.fitness_function`."""
+        return self.problem.fitness(np.concatenate([self.core_violations, self.fitness_hard, self.fitness_soft])).item()
+
+    def conflicting_lessons(self) -> NDArray[np.int64]:
+        """Returns the lessons sharing an employee or participant date with another lesson, placed in a
+        room that does not fit or involved in a violated hard or soft constraint."""
+        problem = self.problem
+        conflicting = np.zeros(problem.num_lessons, dtype=bool)
+
+        for cells, lessons in ((self.employee_cells, problem.employee_lesson),
+                               (self.participant_cells, problem.participant_lesson)):
+            # an owner listed twice in one lesson is a conflict no move can resolve, only count distinct lessons
+            pairs = np.unique(cells * problem.num_lessons + lessons)
+            _, inverse, counts = np.unique(pairs // problem.num_lessons, return_inverse=True, return_counts=True)
+            conflicting[pairs[counts[inverse] > 1] % problem.num_lessons] = True
+
+        conflicting |= problem.gene_room_capacity[self.solution] < problem.lesson_size
+        conflicting |= problem.gene_room_type[self.solution] != problem.lesson_room_type
+
+        for trackers, fitness_list in ((self.constraints_hard, self.fitness_hard),
+                                       (self.constraints_soft, self.fitness_soft)):
+            for tracker, tracker_fitness in zip(trackers, fitness_list):
+                if tracker_fitness < 0:
+                    conflicting[tracker.lessons] = True
+
+        return np.flatnonzero(conflicting)
+
+    def _move_cells(self, cells, counts, entries, old_date, new_date) -> int:
+        """Moves the incidence cells of one lesson to a new date, returns the change of conflicts."""
+        conflicts = 0
+        for entry in entries:
+            old_cell = int(cells[entry])
+            counts[old_cell] -= 1
+            if counts[old_cell] > 0:
+                conflicts -= 1
+            else:
+                del counts[old_cell]
+
+            new_cell = old_cell + (new_date - old_date)
+            if counts[new_cell] > 0:
+                conflicts += 1
+            counts[new_cell] += 1
+            cells[entry] = new_cell
+
+        return conflicts
+
+    def _move(self, lesson: int, new_gene: int) -> None:
+        problem = self.problem
+        old_gene = int(self.solution[lesson])
+        if old_gene == new_gene:
+            return
+
+        old_date = int(problem.gene_date[old_gene])
+        new_date = int(problem.gene_date[new_gene])
+        if old_date != new_date:
+            self.core_violations[0] += self._move_cells(
+                self.employee_cells, self.employee_counts, self.lesson_employee_entries[lesson], old_date, new_date
+            )
+            self.core_violations[1] += self._move_cells(
+                self.participant_cells, self.participant_counts, self.lesson_participant_entries[lesson],
+                old_date, new_date
+            )
+
+        size = problem.lesson_size[lesson]
+        room_type = problem.lesson_room_type[lesson]
+        self.core_violations[2] += (
+            int(problem.gene_room_capacity[new_gene] < size) - int(problem.gene_room_capacity[old_gene] < size)
+        )
+        self.core_violations[3] += (
+            int(problem.gene_room_type[new_gene] != room_type) - int(problem.gene_room_type[old_gene] != room_type)
+        )
+
+        self.solution[lesson] = new_gene
+
+        for tracker, fitness_list, idx in self.constraints_by_lesson[lesson]:
+            tracker.move(lesson, old_gene, new_gene)
+
+    def apply(self, changes: Dict[int, int]) -> int:
+        """Assigns new genes to the given lessons ({lesson index: gene}) and returns the new fitness."""
+        touched = {}
+        for lesson, gene in changes.items():
+            self._move(int(lesson), int(gene))
+            for tracker, fitness_list, idx in self.constraints_by_lesson[int(lesson)]:
+                touched[id(tracker)] = (tracker, fitness_list, idx)
+
+        for tracker, fitness_list, idx in touched.values():
+            fitness_list[idx] = tracker.fitness()
+
+        return self.fitness
+
+    def delta(self, changes: Dict[int, int]) -> int:
+        """Returns the fitness change the given changes would cause, without keeping them."""
+        fitness = self.fitness
+        previous = {lesson: int(self.solution[lesson]) for lesson in changes}
+        fitness_hard = list(self.fitness_hard)
+        fitness_soft = list(self.fitness_soft)
+
+        new_fitness = self.apply(changes)
+
+        # moving back restores the state, the fitness values are restored instead of evaluated again
+        for lesson, gene in previous.items():
+            self._move(lesson, gene)
+        self.fitness_hard[:] = fitness_hard
+        self.fitness_soft[:] = fitness_soft
+
+        return new_fitness - fitness
+
+
+def _entries_by_lesson(entry_lessons: NDArray[np.int64], num_lessons: int) -> List[List[int]]:
+    entries: List[List[int]] = [[] for _ in range(num_lessons)]
+    for entry, lesson in enumerate(entry_lessons):
+        entries[lesson].append(entry)
+    return entries
@@ -0,0 +1,97 @@
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.python.ga.problem import Problem
+from src.python.utils.process_utils import PROCESS_CONTEXT
+
+MIN_SOLUTIONS_PER_WORKER: int = 8
+"""Populations smaller than workers x this value are evaluated in the calling process."""
+
+# State of a worker process, set once by _init_worker
+_worker_problem: Optional[Problem] = None
+_worker_memory = []
+_worker_population: Optional[NDArray[np.uint32]] = None
+_worker_breakdown: Optional[NDArray[np.int64]] = None
+
+
+def _init_worker(lessons, date_x_room, constraints_hard, constraints_soft, population_name, breakdown_name, shape):
+    """Compiles the problem once per worker and maps the shared population and result buffers."""
+    global _worker_problem, _worker_memory, _worker_population, _worker_breakdown
+
+    _worker_problem = Problem(lessons, date_x_room, constraints_hard, constraints_soft)
+
+    population_memory = shared_memory.SharedMemory(name=population_name)
+    breakdown_memory = shared_memory.SharedMemory(name=breakdown_name)
+    _worker_memory = [population_memory, breakdown_memory]
+
+    _worker_population = np.ndarray(shape, dtype=np.uint32, buffer=population_memory.buf)
+    _worker_breakdown = np.ndarray((shape[0], _worker_problem.num_columns), dtype=np.int64,
+                                   buffer=breakdown_memory.buf)
+
+
+def _evaluate_slice(start: int, stop: int) -> None:
+    """Evaluates the solutions [start, stop) of the shared population into the shared result buffer."""
+    _worker_breakdown[start:stop] = _worker_problem.evaluate(_worker_population[start:stop])
+
+
+class ParallelEvaluator:
+    """Evaluates populations of a compiled problem in a pool of worker processes.
+
+    Every worker compiles the problem once when the pool starts. Populations and results are
+    exchanged through shared memory buffers, so each evaluation only sends the bounds of the slice a
+    worker has to evaluate instead of pickled solutions.
+    """
+
+    def __init__(self, problem: Problem, workers: int, max_solutions: int):
+        self.problem = problem
+        self.workers = workers
+        self.max_solutions = max_solutions
+
+        shape = (max_solutions, problem.num_lessons)
+        self.population_memory = shared_memory.SharedMemory(
+            create=True, size=max(1, int(np.prod(shape)) * np.dtype(np.uint32).itemsize)
+        )
+        self.breakdown_memory = shared_memory.SharedMemory(
+            create=True, size=max(1, max_solutions * problem.num_columns * np.dtype(np.int64).itemsize)
+        )
+        self.population = np.ndarray(shape, dtype=np.uint32, buffer=self.population_memory.buf)
+        self.breakdown = np.ndarray((max_solutions, problem.num_columns), dtype=np.int64,
+                                    buffer=self.breakdown_memory.buf)
+
+        self.pool = PROCESS_CONTEXT.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(
+                problem.lessons, problem.date_x_room,
+                problem.source_constraints_hard, problem.source_constraints_soft,
+                self.population_memory.name, self.breakdown_memory.name, shape
+            )
+        )
+
+    def evaluate(self, population: NDArray) -> NDArray[np.int64]:
+        """Same as `Problem.evaluate`, split across the worker processes."""
+        size = len(population)
+        if size < self.workers * MIN_SOLUTIONS_PER_WORKER or size > self.max_solutions:
+            return self.problem.evaluate(population)
+
+        self.population[:size] = population
+        bounds = np.linspace(0, size, self.workers + 1, dtype=np.int64)
+        self.pool.starmap(_evaluate_slice, [(int(start), int(stop)) for start, stop in zip(bounds, bounds[1:])])
+
+        return self.breakdown[:size].copy()
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        for memory in (self.population_memory, self.breakdown_memory):
+            memory.close()
+            memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
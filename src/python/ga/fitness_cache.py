@@ -0,0 +1,55 @@
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+ENTRY_OVERHEAD_BYTES: int = 300
+"""Approximate memory used per cache entry besides the breakdown values (key, array and dict overhead)."""
+
+
+class FitnessCache:
+    """Bounded LRU cache of fitness breakdowns keyed by a hash of the solution's genes.
+
+    Values are the rows produced by `Problem.evaluate`, so callers can rebuild the core, hard and
+    soft results of a solution without evaluating it again.
+    """
+
+    def __init__(self, max_bytes: int, num_columns: int):
+        entry_bytes = ENTRY_OVERHEAD_BYTES + num_columns * np.dtype(np.int64).itemsize
+        self.max_entries: int = max(1, max_bytes // entry_bytes)
+        self.entries: OrderedDict[bytes, NDArray[np.int64]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def key(solution: NDArray) -> bytes:
+        """Returns a 128 bit hash of the `uint32` gene buffer of a solution."""
+        genes = np.ascontiguousarray(solution, dtype=np.uint32)
+        return hashlib.blake2b(genes.tobytes(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[NDArray[np.int64]]:
+        breakdown = self.entries.get(key)
+        if breakdown is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return breakdown
+
+    def put(self, key: bytes, breakdown: NDArray[np.int64]) -> None:
+        self.entries[key] = breakdown
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self) -> str:
+        lookups = self.hits + self.misses
+        hit_rate = 100 * self.hits / lookups if lookups else 0
+        return (f"{len(self.entries)}/{self.max_entries} entries, {self.hits} hits, {self.misses} misses "
+                f"({hit_rate:.1f}% hit rate)")
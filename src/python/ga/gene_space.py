@@ -0,0 +1,127 @@
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pygad
+from numpy.typing import NDArray
+
+from src.python.ga import evaluator
+from src.python.ga.problem import Problem
+
+MAX_DOMAIN_ATTEMPTS: int = 10
+"""Random picks from a lesson's domain before a duplicate gene falls back to any unused gene."""
+
+
+class GeneSpace:
+    """Per lesson domains of the genes, restricted to the rooms that fit the lesson.
+
+    Genes outside of a lesson's domain always violate the room type or room capacity core constraint,
+    so the population is initialised and mutated within the domains only. Solutions never assign the
+    same date x room pair to two lessons: duplicates are replaced by unused genes of the same domain.
+    Pinned lessons keep a single gene, which is removed from the domains of all other lessons.
+    """
+
+    def __init__(self, problem: Problem, random_seed: Optional[int] = None):
+        self.problem = problem
+        self.rng = np.random.default_rng(random_seed)
+        self.pinned = np.zeros(0, dtype=np.int64)
+        self._set_domains(problem.gene_domains())
+
+    def _set_domains(self, domains: List[NDArray[np.int64]]) -> None:
+        self.domain_sizes = np.array([len(domain) for domain in domains], dtype=np.int64)
+
+        # domains padded to a matrix, so genes of many lessons can be drawn at once
+        self.domain_genes = np.zeros((self.problem.num_lessons, max(self.domain_sizes, default=1)), dtype=np.int64)
+        for lesson_idx, domain in enumerate(domains):
+            self.domain_genes[lesson_idx, :len(domain)] = domain
+
+    def domain(self, lesson_idx: int) -> NDArray[np.int64]:
+        return self.domain_genes[lesson_idx, :self.domain_sizes[lesson_idx]]
+
+    def pin(self, solution: NDArray, lessons: NDArray[np.int64]) -> None:
+        """Fixes the given lessons to their genes of `solution` for all following samples and repairs."""
+        pinned = np.zeros(self.problem.num_genes, dtype=bool)
+        pinned[solution[lessons]] = True
+        free_genes = np.flatnonzero(~pinned)
+
+        domains = []
+        for lesson_idx in range(self.problem.num_lessons):
+            domain = self.domain(lesson_idx)
+            domain = domain[~pinned[domain]]
+            # a lesson whose rooms are all taken by pinned lessons may use any free gene
+            domains.append(domain if len(domain) > 0 else free_genes)
+        for lesson_idx, gene in zip(lessons.tolist(), solution[lessons].tolist()):
+            domains[lesson_idx] = np.array([gene], dtype=np.int64)
+
+        self.pinned = np.asarray(lessons, dtype=np.int64)
+        self._set_domains(domains)
+
+    def sample(self, lesson_indices: NDArray[np.int64]) -> NDArray[np.int64]:
+        """Draws one random gene from the domain of every given lesson."""
+        picks = (self.rng.random(lesson_indices.shape) * self.domain_sizes[lesson_indices]).astype(np.int64)
+        return self.domain_genes[lesson_indices, picks]
+
+    def random_population(self, size: int) -> NDArray[np.uint32]:
+        """Creates `size` random solutions without duplicate genes."""
+        lesson_indices = np.broadcast_to(np.arange(self.problem.num_lessons), (size, self.problem.num_lessons))
+        population = self.sample(lesson_indices).astype(np.uint32)
+        return self.repair(population)
+
+    def repair(self, population: NDArray) -> NDArray:
+        """Replaces duplicate genes of every solution in place by unused genes of the lesson's domain."""
+        for solution in population:
+            _, first = np.unique(solution, return_index=True)
+            if len(first) == len(solution):
+                continue
+
+            duplicates = np.ones(len(solution), dtype=bool)
+            duplicates[first] = False
+            used = set(solution.tolist())
+
+            for lesson_idx in np.flatnonzero(duplicates):
+                gene = self._unused_gene(lesson_idx, used)
+                solution[lesson_idx] = gene
+                used.add(gene)
+
+        return population
+
+    def _unused_gene(self, lesson_idx: int, used: set) -> int:
+        for _ in range(MAX_DOMAIN_ATTEMPTS):
+            gene = int(self.sample(np.array([lesson_idx]))[0])
+            if gene not in used:
+                return gene
+
+        unused = np.setdiff1d(self.domain(lesson_idx), list(used))
+        if len(unused) == 0:
+            # every gene of the domain is taken, the core constraints will penalise the lesson
+            unused = np.setdiff1d(np.arange(self.problem.num_genes), list(used))
+        return int(self.rng.choice(unused))
+
+    def adaptive_mutation(self, mutation_probability: Tuple[float, float]) -> Callable[[NDArray, pygad.GA], NDArray]:
+        """Returns a PyGad mutation function drawing new genes from the lessons' domains.
+
+        Like PyGad's adaptive mutation, offspring with a fitness below the population's average are
+        mutated with the first probability and all others with the second one. With several objectives
+        the weighted fitness (`Problem.fitness`) of the offspring is compared with the average of the
+        current population.
+        """
+        low_quality, high_quality = mutation_probability
+
+        def mutation(offspring, ga_instance):
+            if self.problem.multi_objective:
+                # pygad's helper would sort the population by NSGA-II, the core, hard and soft objectives
+                # of the population already add up to its weighted fitness
+                average_fitness = ga_instance.last_generation_fitness[:, :3].sum(axis=1).mean()
+                lessons, date_x_room = ga_instance.variables
+                offspring_fitness = self.problem.fitness(evaluator.evaluate_breakdown(offspring, lessons, date_x_room))
+            else:
+                average_fitness, offspring_fitness = ga_instance.adaptive_mutation_population_fitness(offspring)
+            probability = np.where(offspring_fitness < average_fitness, low_quality, high_quality)
+
+            mutate = self.rng.random(offspring.shape) < probability[:, np.newaxis]
+            rows, lesson_indices = np.nonzero(mutate)
+            offspring[rows, lesson_indices] = self.sample(lesson_indices)
+
+            # crossover and mutation can both assign a date x room pair twice
+            return self.repair(offspring)
+
+        return mutation
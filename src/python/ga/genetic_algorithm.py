@@ -1,23 +1,204 @@
 import time
-from typing import Any, List, Dict
+from typing import Any, Callable, List, Dict, Optional, Tuple
 
 import numpy as np
 import pygad
+from numpy.typing import NDArray
 from src.python.api import database
-from src.python.ga import evaluator
+from src.python.ga import checkpoint, evaluator, problem
+from src.python.ga.checkpoint import CHECKPOINT_INTERVAL, CheckpointWriter
+from src.python.ga.evaluator_parallel import ParallelEvaluator
+from src.python.ga.fitness_cache import FitnessCache
+from src.python.ga.gene_space import GeneSpace
+from src.python.ga.local_search import LocalSearch
+from src.python.ga.pareto import PARETO_FRONT_SIZE, ParetoArchive
+from src.python.ga.population_seeding import SEEDED_FRACTION, initial_population
+from src.python.ga.warm_start import warm_start_population
 from src.python.log.logger import logger_ga
 from src.python.utils import stundenplan_utils
 
 NUM_GENERATIONS: int = 20000
 SOL_PER_POP: int = 300
+FITNESS_CACHE_MB: int = 256
+LOG_INTERVAL: int = 100
+FITNESS_WORKERS: int = 0
+STAGNATION_GENERATIONS: int = 0
+MUTATION_PROBABILITY: Tuple[float, float] = (0.1, 0.01)
 
-def genetic_algorithm(generations: int = NUM_GENERATIONS):
+
+def create_ga_instance(
+        lessons,
+        date_x_room,
+        generations: int,
+        on_generation: Callable[[pygad.GA], Any],
+        mutation_probability: Tuple[float, float] = MUTATION_PROBABILITY,
+        random_seed: Optional[int] = None,
+        seeded_fraction: float = SEEDED_FRACTION,
+        local_search: Optional[Dict[str, int]] = None,
+        multi_objective: bool = False,
+        population: Optional[NDArray] = None,
+        warm_start: Optional[List[Dict[str, Any]]] = None,
+        pin_unchanged: bool = False
+) -> pygad.GA:
+    """Creates the PyGad instance used to schedule the given lessons.
+
+    Args:
+        lessons: List of lesson dictionaries, one gene per lesson.
+        date_x_room: List of date and room pairs, the values a gene can take.
+        generations: Number of generations to run.
+        on_generation: Callback called by PyGad after each generation.
+        mutation_probability: Adaptive mutation probabilities for low and high quality solutions.
+        random_seed: Seed of the random generators, `None` for a random seed.
+        seeded_fraction: Fraction of the initial population built greedily, the rest is random.
+        local_search: Keyword arguments of the `LocalSearch` run before `on_generation`, `None`
+            disables it.
+        multi_objective: Selects parents by NSGA-II for the vector fitness of multi-objective runs. Such
+            runs have no single fitness to reach 0, `on_generation` has to stop them, and skip the
+            local search, which improves the weighted fitness.
+        population: Initial population to start from, e.g. of a checkpoint, `None` builds a new one.
+        warm_start: Timetable of a previous solution to derive the initial population from, see
+            `warm_start_population`.
+        pin_unchanged: Keeps the unchanged lessons of `warm_start` in place.
+
+    Returns:
+        The PyGad instance, with `variables` set to the lessons and date x room pairs and `lesson_domains`
+        to the `GeneSpace` of its mutation.
+    """
+    # every gene only takes date x room values whose room has the type and capacity of its lesson
+    gene_space = GeneSpace(problem.get_problem(lessons, date_x_room), random_seed)
+
+    if local_search is not None and not multi_objective:
+        memetic_step = LocalSearch(gene_space, **local_search)
+
+        def on_generation_memetic(instance: pygad.GA):
+            memetic_step.on_generation(instance)
+            return on_generation(instance)
+    else:
+        on_generation_memetic = on_generation
+
+    if population is None and warm_start is not None:
+        population = warm_start_population(gene_space, warm_start, SOL_PER_POP, seeded_fraction, pin_unchanged)
+    if population is None:
+        population = initial_population(gene_space, SOL_PER_POP, seeded_fraction)
+
+    ga_instance = pygad.GA(
+        num_genes=len(lessons),
+        gene_type=np.uint32,  # type: ignore
+        gene_space={"low": 0, "high": len(date_x_room)},
+        # no allow_duplicate_genes=False: the mutation repairs duplicates within the lessons' domains,
+        # pygad's duplicate gene solver would pick replacements outside of them
+        initial_population=population,
+        fitness_func=evaluator.fitness_function_batch,
+        fitness_batch_size=SOL_PER_POP,
+        num_generations=generations,
+        mutation_type=gene_space.adaptive_mutation(mutation_probability),
+        num_parents_mating=10,
+        parent_selection_type="nsga2" if multi_objective else "tournament",
+        K_tournament=30,
+        crossover_type="scattered",
+        stop_criteria=None if multi_objective else "reach_0",
+        keep_elitism=1,
+        random_seed=random_seed,
+        suppress_warnings=True,
+        on_generation=on_generation_memetic,  # Add callback here
+    )
+    ga_instance.variables = (lessons, date_x_room)  # type: ignore
+    ga_instance.lesson_domains = gene_space  # type: ignore
+
+    return ga_instance
+
+
+class StagnationStop:
+    """Stop criterion for runs whose soft constraints cannot all be satisfied.
+
+    A run is stopped once its best solution satisfies all core and hard constraints and its fitness, with
+    the weights of the problem (`Problem.fitness`) the algorithm maximises, has not improved for
+    `generations` generations. 0 disables the criterion.
+    """
+
+    def __init__(self, lessons, date_x_room, generations: int):
+        self.lessons = lessons
+        self.date_x_room = date_x_room
+        self.generations = generations
+        self.best_fitness = None
+        self.improved_at = 0
+
+    def update(self, best_solution, generation: int) -> bool:
+        """Records the best solution of a generation and returns whether the run should stop."""
+        if self.generations <= 0:
+            return False
+
+        compiled = problem.get_problem(self.lessons, self.date_x_room)
+        breakdown = evaluator.evaluate_breakdown(best_solution[np.newaxis, :], self.lessons, self.date_x_room)[0]
+        if breakdown[compiled.core_columns].any() or breakdown[compiled.hard_columns].sum() < 0:
+            self.best_fitness = None
+            return False
+
+        fitness = compiled.fitness(breakdown)
+        if self.best_fitness is None or fitness > self.best_fitness:
+            self.best_fitness = fitness
+            self.improved_at = generation
+            return False
+
+        return generation - self.improved_at >= self.generations
+
+
+def genetic_algorithm(
+        generations: int = NUM_GENERATIONS,
+        fitness_cache_mb: int = FITNESS_CACHE_MB,
+        log_interval: int = LOG_INTERVAL,
+        fitness_workers: int = FITNESS_WORKERS,
+        seeded_fraction: float = SEEDED_FRACTION,
+        local_search: Optional[Dict[str, int]] = None,
+        fitness_weights: Optional[Dict[str, Any]] = None,
+        stagnation_generations: int = STAGNATION_GENERATIONS,
+        multi_objective: bool = False,
+        fairness_objective: bool = False,
+        pareto_front_size: int = PARETO_FRONT_SIZE,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        resume: Optional[str] = None,
+        checkpoint_id: Optional[str] = None,
+        warm_start: Optional[List[Dict[str, Any]]] = None,
+        pin_unchanged: bool = False,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+):
     """Executes a genetic algorithm using PyGad to find the optimal scheduling of events for a given
     term.
 
     Args:
         generations: Number of generations for which the genetic algorithm should run, defaults to
             `NUM_GENERATIONS`.
+        fitness_cache_mb: Memory cap of the fitness cache in megabytes, 0 disables the cache.
+        log_interval: Number of generations between two logs of the best solution's constraint
+            violations, which are logged as well whenever the best fitness improves.
+        fitness_workers: Number of worker processes evaluating the population, 0 or 1 evaluates it
+            in the algorithm's own process.
+        seeded_fraction: Fraction of the initial population built greedily, most constrained lessons
+            first, instead of at random.
+        local_search: Settings of the memetic local search on the best solutions (`interval`,
+            `top_k`, `max_moves`), `None` disables it.
+        fitness_weights: Keyword arguments of `Problem.set_fitness_weights` (`core`, `hard`, `soft`,
+            `lexicographic`), `None` adds the three tiers with equal weight.
+        stagnation_generations: Stops the run once core and hard constraints are satisfied and the
+            weighted fitness has not improved for this many generations, 0 disables it.
+        multi_objective: Optimises core, hard and soft fitness as separate objectives (NSGA-II) and
+            keeps the non-dominated solutions, up to `pareto_front_size` of them are returned as
+            `candidates` of the result.
+        fairness_objective: Adds the fitness of the employee with the most violated constraints as a
+            fourth objective of multi-objective runs.
+        pareto_front_size: Number of candidate timetables of a multi-objective run.
+        checkpoint_interval: Generations between two checkpoints of the run's state, 0 disables them.
+            The checkpoint is removed once the run completes.
+        resume: Id of the checkpoint to resume a run from, the run continues with the checkpoint's
+            population, random states and pinned lessons up to `generations` generations in total.
+        checkpoint_id: Id of the checkpoints of a new run, a new id by default. Resumed runs keep
+            the id of `resume`.
+        warm_start: Timetable of a previous solution, after a small change of the input the run starts
+            from it instead of from scratch.
+        pin_unchanged: Keeps the lessons of `warm_start` that are unchanged and without conflicts in
+            place for the whole run.
+        on_progress: Called after every generation with the generation, the best fitness so far and its
+            core, hard and soft fitness.
 
     Returns:
         A tuple containing the following elements:
@@ -25,63 +206,178 @@ def genetic_algorithm(generations: int = NUM_GENERATIONS):
         parsed_solution: Best solution parsed into a human-readable format.
         fitness: Fitness of the best solution.
         generations_completed: Number of generations completed by the algorithm.
+
+    Raises:
+        `ValueError`: If the checkpoint to resume from was written for a different input.
     """
     lessons = database.get_lessons()
     date_x_room = database.get_date_x_room()
 
-    logger_ga.info(f"Starting genetic algorithm with {generations} generations")
+    # compiles lessons and constraints once for the whole run
+    compiled = problem.get_problem(lessons, date_x_room)
+    if fitness_cache_mb > 0:
+        compiled.fitness_cache = FitnessCache(fitness_cache_mb * 1024 * 1024, compiled.num_columns)
+    compiled.set_fitness_weights(**(fitness_weights or {}))
+    compiled.multi_objective = multi_objective
+    compiled.fairness_objective = multi_objective and fairness_objective
+    try:
+        stagnation = StagnationStop(lessons, date_x_room, stagnation_generations)
+        archive = ParetoArchive()
 
-    def on_generation(instance: pygad.GA):
-        """Callback to log constraint violations of the best solution after each generation."""
-        nonlocal best_solution_g, fitness_g
-        best_solution_g, fitness_g, _ = instance.best_solution()  # type: ignore
+        best_solution_g = None
+        fitness_g = None
+        progress_tiers: Dict[str, int] = {}
+        generation_offset = 0
+        population = None
 
-        _, violated_core, _ = evaluator.evaluate_constraints_core(best_solution_g, lessons, date_x_room)
-        _, violated_hard, _ = evaluator.evaluate_constraints_hard(best_solution_g, lessons, date_x_room)
-        _, violated_soft, _ = evaluator.evaluate_constraints_soft(best_solution_g, lessons, date_x_room)
+        digest = checkpoint.input_digest(lessons, date_x_room)
+        state = checkpoint.load(resume) if resume is not None else None
+        if state is not None:
+            if state["input_digest"] != digest:
+                raise ValueError(f"Checkpoint {resume} was written for a different input")
+            generation_offset = state["generation"]
+            population = state["population"]
+            best_solution_g = state["best_solution"]
+            fitness_g = state["best_fitness"]
+            if multi_objective and "archive_solutions" in state:
+                archive.solutions = state["archive_solutions"]
+                archive.objectives = state["archive_objectives"]
+            logger_ga.info(f"Resuming run {resume} after generation {generation_offset}")
 
-        logger_ga.info("----------------------------------------------------------")
-        logger_ga.info(f"Generation {instance.generations_completed} with Best Fitness {fitness_g}")
-        logger_ga.info(f"Core Constraints conflicts: {violated_core}")
-        logger_ga.info(f"Hard Constraints conflicts: {violated_hard}")
-        logger_ga.info(f"Soft Constraints conflicts: {violated_soft}")
+        if resume is not None:
+            checkpoint_id = resume
+        elif checkpoint_id is None:
+            checkpoint_id = checkpoint.new_checkpoint_id()
+        writer = CheckpointWriter(checkpoint_id) if checkpoint_interval > 0 else None
 
-    # sometimes inconsistencies occur, because on_generation has a different best_solution
-    # than the best_solution being found here
-    best_solution_g = None
-    fitness_g = None
+        logger_ga.info(f"Starting genetic algorithm with {generations} generations")
 
-    ga_instance = pygad.GA(
-        num_genes=len(lessons),
-        gene_type=np.uint32,  # type: ignore
-        gene_space={"low": 0, "high": len(date_x_room)},
-        allow_duplicate_genes=False,
-        fitness_func=evaluator.fitness_function,
-        num_generations=generations,
-        sol_per_pop=SOL_PER_POP,
-        mutation_type="adaptive",
-        mutation_probability=(0.1, 0.01),
-        num_parents_mating=10,
-        parent_selection_type="tournament",
-        K_tournament=30,
-        crossover_type="scattered",
-        stop_criteria="reach_0",
-        keep_elitism=1,
-        random_seed=None,
-        suppress_warnings=True,
-        on_generation=on_generation,  # Add callback here
-    )
-    ga_instance.variables = (lessons, date_x_room)  # type: ignore
+        def on_generation(instance: pygad.GA):
+            """Callback to log the progress after each generation.
+
+            The best solution is taken from the fitness values pygad has already computed for the
+            generation and only replaced when the best fitness has improved. Its constraint violations
+            are only logged every `log_interval` generations or on improvement, its core, hard and soft
+            fitness for `on_progress` are only evaluated on improvement.
+            """
+            nonlocal best_solution_g, fitness_g
+            fitness = instance.last_generation_fitness
+            if multi_objective:
+                # the best solution of a multi-objective run is the one with the best core + hard + soft
+                archive.update(instance.population, fitness)
+                fitness = fitness[:, :3].sum(axis=1)
+
+            best_idx = int(np.argmax(fitness))
+            improved = fitness_g is None or fitness[best_idx] > fitness_g
+            if improved:
+                best_solution_g = instance.population[best_idx].copy()
+                fitness_g = fitness[best_idx]
+
+            generation = generation_offset + instance.generations_completed
+            logger_ga.info(f"Generation {generation} with Best Fitness {fitness_g}")
+            if on_progress is not None:
+                if improved or not progress_tiers:
+                    # the core, hard and soft fitness only change with the best solution
+                    core, hard, soft = evaluator.evaluate_population(best_solution_g[np.newaxis, :], lessons,
+                                                                     date_x_room)
+                    progress_tiers.update(core=core[0].item(), hard=hard[0].item(), soft=soft[0].item())
+                on_progress({"generation": generation, "fitness": fitness_g.item(), **progress_tiers})
+
+            if writer is not None and generation % checkpoint_interval == 0:
+                writer.submit(checkpoint_state(instance, generation))
+
+            if stagnation.update(best_solution_g, generation):
+                logger_ga.info(f"Core and hard constraints satisfied, fitness unchanged for "
+                               f"{stagnation_generations} generations, stopping")
+                return "stop"
+            if multi_objective and fitness_g >= 0:
+                return "stop"
+
+            if not improved and generation % log_interval != 0:
+                return
+
+            _, violated_core, _ = evaluator.evaluate_constraints_core(best_solution_g, lessons, date_x_room)
+            _, violated_hard, _ = evaluator.evaluate_constraints_hard(best_solution_g, lessons, date_x_room)
+            _, violated_soft, _ = evaluator.evaluate_constraints_soft(best_solution_g, lessons, date_x_room)
+
+            logger_ga.info("----------------------------------------------------------")
+            logger_ga.info(f"Core Constraints conflicts: {violated_core}")
+            logger_ga.info(f"Hard Constraints conflicts: {violated_hard}")
+            logger_ga.info(f"Soft Constraints conflicts: {violated_soft}")
+            if compiled.fitness_cache is not None:
+                logger_ga.info(f"Fitness cache: {compiled.fitness_cache}")
+
+        def checkpoint_state(instance: pygad.GA, generation: int) -> Dict[str, Any]:
+            arrays = {
+                "population": instance.population,
+                "fitness": instance.last_generation_fitness,
+                "generation": generation,
+                "best_solution": best_solution_g,
+                "best_fitness": fitness_g,
+                "random_states": checkpoint.random_states(instance.lesson_domains.rng),
+                "pinned": instance.lesson_domains.pinned,
+                "input_digest": digest,
+            }
+            if multi_objective and archive.solutions is not None:
+                arrays["archive_solutions"] = archive.solutions
+                arrays["archive_objectives"] = archive.objectives
+            return arrays
+
+        ga_instance = create_ga_instance(lessons, date_x_room, max(generations - generation_offset, 1), on_generation,
+                                         seeded_fraction=seeded_fraction, local_search=local_search,
+                                         multi_objective=multi_objective, population=population,
+                                         warm_start=warm_start, pin_unchanged=pin_unchanged)
+        if state is not None:
+            checkpoint.restore_random_states(ga_instance.lesson_domains.rng, state["random_states"])
+            if len(state.get("pinned", ())) > 0:
+                # the pinned genes are the same in every solution of the population
+                ga_instance.lesson_domains.pin(population[0], state["pinned"])
+                logger_ga.info(f"Resumed run keeps {len(state['pinned'])} lessons pinned")
+        if writer is not None:
+            logger_ga.info(f"Checkpointing every {checkpoint_interval} generations as {checkpoint_id}")
+
+        if fitness_workers > 1:
+            logger_ga.info(f"Evaluating fitness with {fitness_workers} worker processes")
+            compiled.parallel_evaluator = ParallelEvaluator(compiled, fitness_workers, SOL_PER_POP)
+
+        logger_ga.info("Running genetic algorithm...")
+        start_time = time.perf_counter()
+        try:
+            ga_instance.run()
+        finally:
+            if compiled.parallel_evaluator is not None:
+                compiled.parallel_evaluator.close()
+                compiled.parallel_evaluator = None
+            if writer is not None:
+                writer.close()
+        # an interrupted run keeps its checkpoint, a completed one does not need it anymore
+        if writer is not None or resume is not None:
+            checkpoint.remove(checkpoint_id)
+        runtime = round(time.perf_counter() - start_time, 2)
+        logger_ga.info(f"Genetic algorithm completed in {runtime:.2f} seconds")
+
+        logger_ga.info(f"Best fitness: {fitness_g}")  # type: ignore
 
-    logger_ga.info("Running genetic algorithm...")
-    start_time = time.perf_counter()
-    ga_instance.run()
-    runtime = round(time.perf_counter() - start_time, 2)
-    logger_ga.info(f"Genetic algorithm completed in {runtime:.2f} seconds")
+        # ----------
+        result = stundenplan_utils.parse_solution_for_print(best_solution_g, fitness_g, runtime, date_x_room, lessons)
 
-    logger_ga.info(f"Best fitness: {fitness_g}")  # type: ignore
+        if multi_objective:
+            result["candidates"] = []
+            for solution, objectives in archive.front(pareto_front_size):
+                candidate = stundenplan_utils.parse_solution_for_print(
+                    solution, objectives["core"] + objectives["hard"] + objectives["soft"], runtime,
+                    date_x_room, lessons
+                )
+                candidate["metadata"]["objectives"] = objectives
+                result["candidates"].append(candidate)
+            logger_ga.info(f"Pareto front: {[objectives for _, objectives in archive.front(pareto_front_size)]}")
 
-    # ----------
-    result = stundenplan_utils.parse_solution_for_print(best_solution_g, fitness_g, runtime, date_x_room, lessons)
+        if compiled.fitness_cache is not None:
+            logger_ga.info(f"Fitness cache: {compiled.fitness_cache}")
 
-    return runtime, result, fitness_g, ga_instance.generations_completed
+        return runtime, result, fitness_g, generation_offset + ga_instance.generations_completed
+    finally:
+        # the compiled problem is shared by the following runs of the process, also after a failed run
+        compiled.multi_objective = False
+        compiled.fairness_objective = False
+        compiled.fitness_cache = None
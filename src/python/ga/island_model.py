@@ -0,0 +1,202 @@
+import logging
+import queue
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pygad
+
+from src.python.api import database
+from src.python.ga import evaluator, genetic_algorithm as ga, problem
+from src.python.ga.fitness_cache import FitnessCache
+from src.python.log import logger
+from src.python.log.logger import logger_ga
+from src.python.utils import stundenplan_utils
+from src.python.utils.process_utils import PROCESS_CONTEXT
+
+MIGRATION_INTERVAL: int = 50
+MIGRATION_SIZE: int = 2
+MUTATION_SPREAD: float = 2.0
+"""Factor between the lowest and the highest mutation probabilities of the islands."""
+
+# latest progress per island of the current run, see get_progress()
+_progress: Dict[int, Dict[str, Any]] = {}
+
+
+def get_progress() -> List[Dict[str, Any]]:
+    """Returns the latest reported generation, best fitness and its core, hard and soft fitness of every island
+    of the current run."""
+    return [dict(progress) for _, progress in sorted(_progress.items())]
+
+
+def _run_island(island, data, generations, mutation_probability, random_seed, fitness_cache_mb, log_interval,
+                seeded_fraction, local_search, fitness_weights, stagnation_generations, migration_interval, migration_size, inbox, outbox, messages, stop_event):
+    """Runs one island's population in its own process and reports progress, logs and result via `messages`."""
+    # islands must not wait for their migrants to be consumed when they stop
+    outbox.cancel_join_thread()
+    logger.forward_memory_logs(messages)
+
+    database.inject(data)
+    lessons = database.get_lessons()
+    date_x_room = database.get_date_x_room()
+
+    compiled = problem.get_problem(lessons, date_x_room)
+    if fitness_cache_mb > 0:
+        compiled.fitness_cache = FitnessCache(fitness_cache_mb * 1024 * 1024, compiled.num_columns)
+    compiled.set_fitness_weights(**(fitness_weights or {}))
+    stagnation = ga.StagnationStop(lessons, date_x_room, stagnation_generations)
+
+    best = {"solution": None, "fitness": None}
+
+    def on_generation(instance: pygad.GA):
+        fitness = instance.last_generation_fitness
+        generation = instance.generations_completed
+
+        if generation % migration_interval == 0:
+            order = np.argsort(fitness)
+            emigrants = order[-migration_size:]
+            outbox.put((instance.population[emigrants].copy(), fitness[emigrants].copy()))
+
+            try:
+                immigrants, immigrant_fitness = inbox.get_nowait()
+                worst = order[:len(immigrants)]
+                instance.population[worst] = immigrants
+                fitness[worst] = immigrant_fitness
+            except queue.Empty:
+                pass
+
+        best_idx = int(np.argmax(fitness))
+        improved = best["fitness"] is None or fitness[best_idx] > best["fitness"]
+        best["solution"] = instance.population[best_idx].copy()
+        best["fitness"] = fitness[best_idx]
+
+        if improved or generation % log_interval == 0:
+            core, hard, soft = evaluator.evaluate_population(best["solution"][np.newaxis, :], lessons, date_x_room)
+            messages.put(("progress", island, generation, {
+                "fitness": float(best["fitness"]), "core": core[0].item(), "hard": hard[0].item(), "soft": soft[0].item()
+            }))
+
+        if best["fitness"] >= 0 or stagnation.update(best["solution"], generation):
+            stop_event.set()
+        if stop_event.is_set():
+            return "stop"
+
+    ga_instance = ga.create_ga_instance(
+        lessons, date_x_room, generations, on_generation,
+        mutation_probability=mutation_probability,
+        random_seed=random_seed,
+        seeded_fraction=seeded_fraction,
+        local_search=local_search
+    )
+    ga_instance.run()
+
+    messages.put(("result", island, best["solution"], best["fitness"], ga_instance.generations_completed))
+
+
+def run_islands(
+        generations: int,
+        islands: int,
+        migration_interval: int = MIGRATION_INTERVAL,
+        migration_size: int = MIGRATION_SIZE,
+        fitness_cache_mb: int = ga.FITNESS_CACHE_MB,
+        log_interval: int = ga.LOG_INTERVAL,
+        seeded_fraction: float = ga.SEEDED_FRACTION,
+        local_search: Optional[Dict[str, int]] = None,
+        fitness_weights: Optional[Dict[str, Any]] = None,
+        stagnation_generations: int = ga.STAGNATION_GENERATIONS,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+):
+    """Runs the genetic algorithm as an island model with one population per process.
+
+    The islands are connected in a ring: every `migration_interval` generations each island sends its
+    `migration_size` best solutions to the next island, which replaces its worst solutions with them.
+    Every island uses its own random seed and mutation probabilities, and the run stops as soon as any
+    island finds a solution with fitness 0 or, with `stagnation_generations`, satisfies all core and hard
+    constraints without improving its weighted fitness any more.
+
+    Returns:
+        The same tuple as `genetic_algorithm.genetic_algorithm`, for the best solution of all islands.
+    """
+    lessons = database.get_lessons()
+    date_x_room = database.get_date_x_room()
+    problem.get_problem(lessons, date_x_room)
+
+    logger_ga.info(f"Starting genetic algorithm with {islands} islands and {generations} generations")
+
+    seeds = np.random.SeedSequence().generate_state(islands)
+    low, high = ga.MUTATION_PROBABILITY
+    factors = np.geomspace(1 / np.sqrt(MUTATION_SPREAD), np.sqrt(MUTATION_SPREAD), islands)
+
+    inboxes = [PROCESS_CONTEXT.Queue() for _ in range(islands)]
+    messages = PROCESS_CONTEXT.Queue()
+    stop_event = PROCESS_CONTEXT.Event()
+
+    _progress.clear()
+    processes = []
+    for island in range(islands):
+        mutation_probability = (min(1.0, low * factors[island]), min(1.0, high * factors[island]))
+        _progress[island] = {"island": island, "generation": 0, "fitness": None, "core": None, "hard": None, "soft": None}
+        logger_ga.info(f"Island {island}: mutation probability {mutation_probability}, seed {seeds[island]}")
+
+        processes.append(PROCESS_CONTEXT.Process(
+            target=_run_island,
+            args=(island, database.get_data(), generations, mutation_probability, int(seeds[island]),
+                  fitness_cache_mb // islands, log_interval, seeded_fraction, local_search,
+                  fitness_weights, stagnation_generations, migration_interval, migration_size,
+                  inboxes[island], inboxes[(island + 1) % islands], messages, stop_event),
+            daemon=True
+        ))
+
+    start_time = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    results = {}
+    while len(results) < islands:
+        try:
+            message = messages.get(timeout=1)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+
+        if isinstance(message, logging.LogRecord):
+            logger.handle_forwarded(message)
+        elif message[0] == "progress":
+            _, island, generation, best_fitness = message
+            _progress[island].update(generation=generation, **best_fitness)
+            logger_ga.info(f"Island {island}: Generation {generation} with Best Fitness {best_fitness['fitness']}")
+            if on_progress is not None:
+                # the same schema as a single population, for the best of all islands
+                best_island = max((progress for progress in _progress.values() if progress["fitness"] is not None),
+                                  key=lambda progress: progress["fitness"])
+                on_progress({
+                    "generation": max(progress["generation"] for progress in _progress.values()),
+                    "fitness": best_island["fitness"],
+                    "core": best_island["core"],
+                    "hard": best_island["hard"],
+                    "soft": best_island["soft"],
+                    "islands": get_progress()
+                })
+        else:
+            _, island, solution, fitness, generations_completed = message
+            results[island] = (solution, fitness, generations_completed)
+            logger_ga.info(f"Island {island} finished after {generations_completed} generations "
+                           f"with Best Fitness {fitness}")
+
+    for process in processes:
+        process.join()
+
+    runtime = round(time.perf_counter() - start_time, 2)
+    logger_ga.info(f"Genetic algorithm completed in {runtime:.2f} seconds")
+
+    if not results:
+        raise RuntimeError("No island returned a result")
+
+    best_island = max(results, key=lambda island: results[island][1])
+    best_solution, fitness, generations_completed = results[best_island]
+    logger_ga.info(f"Best fitness: {fitness} (island {best_island})")
+
+    result = stundenplan_utils.parse_solution_for_print(best_solution, fitness, runtime, date_x_room, lessons)
+
+    return runtime, result, fitness, generations_completed
@@ -0,0 +1,88 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pygad
+from numpy.typing import NDArray
+
+from src.python.ga.evaluator_incremental import IncrementalEvaluator
+from src.python.ga.gene_space import GeneSpace
+
+LOCAL_SEARCH_INTERVAL: int = 0
+LOCAL_SEARCH_TOP_K: int = 3
+LOCAL_SEARCH_MOVES: int = 200
+CANDIDATES_PER_MOVE: int = 8
+"""Genes of the lesson's domain tried for one conflicting lesson, the best improving one is kept."""
+
+
+class LocalSearch:
+    """Memetic step improving the best solutions of a generation by conflict-directed hill climbing.
+
+    Every `interval` generations the `top_k` best solutions are improved one after the other. A move
+    takes a lesson involved in a conflict or a violated constraint and reassigns it to another gene of its
+    domain, swapping genes with the lesson that already holds the new gene. Moves are scored with an
+    `IncrementalEvaluator`, only improving ones are kept, and at most `max_moves` moves are scored per
+    solution. Improved solutions and their fitness are written back into the pygad population.
+    """
+
+    def __init__(self, gene_space: GeneSpace, interval: int = LOCAL_SEARCH_INTERVAL, top_k: int = LOCAL_SEARCH_TOP_K,
+                 max_moves: int = LOCAL_SEARCH_MOVES):
+        self.gene_space = gene_space
+        self.problem = gene_space.problem
+        self.rng = gene_space.rng
+        self.interval = interval
+        self.top_k = top_k
+        self.max_moves = max_moves
+
+    def on_generation(self, instance: pygad.GA) -> None:
+        """Improves the best solutions of the generation in place, if this generation is due."""
+        if self.interval <= 0 or instance.generations_completed % self.interval != 0:
+            return
+
+        fitness = instance.last_generation_fitness
+        for solution_idx in np.argsort(fitness)[::-1][:self.top_k]:
+            if fitness[solution_idx] >= 0:
+                continue
+
+            solution, solution_fitness = self.improve(instance.population[solution_idx])
+            if solution_fitness > fitness[solution_idx]:
+                instance.population[solution_idx] = solution
+                fitness[solution_idx] = solution_fitness
+
+    def improve(self, solution: NDArray) -> Tuple[NDArray, int]:
+        """Hill climbs from the given solution and returns the improved solution and its fitness."""
+        state = IncrementalEvaluator(self.problem, solution)
+        lesson_of_gene: Dict[int, int] = {int(gene): lesson for lesson, gene in enumerate(state.solution)}
+
+        moves = 0
+        while moves < self.max_moves and state.fitness < 0:
+            lessons = state.conflicting_lessons()
+            if len(lessons) == 0:
+                break
+
+            lesson = int(self.rng.choice(lessons))
+            old_gene = int(state.solution[lesson])
+
+            best_changes, best_delta = None, 0
+            for gene in self.gene_space.sample(np.full(CANDIDATES_PER_MOVE, lesson)).tolist():
+                if gene == old_gene:
+                    continue
+
+                changes = {lesson: gene}
+                other = lesson_of_gene.get(gene)
+                if other is not None:
+                    changes[other] = old_gene
+
+                delta = state.delta(changes)
+                moves += 1
+                if delta > best_delta:
+                    best_changes, best_delta = changes, delta
+
+            if best_changes is None:
+                continue
+
+            state.apply(best_changes)
+            del lesson_of_gene[old_gene]
+            for changed_lesson, gene in best_changes.items():
+                lesson_of_gene[gene] = changed_lesson
+
+        return state.solution.astype(solution.dtype), state.fitness
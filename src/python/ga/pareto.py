@@ -0,0 +1,58 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+OBJECTIVES: Tuple[str, ...] = ("core", "hard", "soft", "fairness")
+"""Names of the objectives in the order of `Problem.objectives`, fairness only if enabled."""
+
+ARCHIVE_SIZE: int = 100
+PARETO_FRONT_SIZE: int = 5
+
+
+def non_dominated(objectives: NDArray) -> NDArray[np.bool_]:
+    """Returns which rows are not dominated by any other row (all objectives are maximised)."""
+    at_least = np.all(objectives[:, np.newaxis, :] >= objectives[np.newaxis, :, :], axis=2)
+    better = np.any(objectives[:, np.newaxis, :] > objectives[np.newaxis, :, :], axis=2)
+    dominated = np.any(at_least & better, axis=0)
+    return ~dominated
+
+
+class ParetoArchive:
+    """Non-dominated solutions found during a multi-objective run.
+
+    The archive is merged with the population of every generation, solutions with the same objectives
+    as a solution already kept are dropped, so the archive holds distinct trade-offs. If more than `max_size` solutions are non-dominated, those with the best sum of objectives are kept.
+    """
+
+    def __init__(self, max_size: int = ARCHIVE_SIZE):
+        self.max_size = max_size
+        self.solutions = None
+        self.objectives = None
+
+    def update(self, population: NDArray, objectives: NDArray) -> None:
+        if self.solutions is not None:
+            population = np.concatenate([self.solutions, population])
+            objectives = np.concatenate([self.objectives, objectives])
+
+        _, unique = np.unique(objectives, axis=0, return_index=True)
+        population = population[unique]
+        objectives = objectives[unique]
+
+        front = non_dominated(objectives)
+        population = population[front]
+        objectives = objectives[front]
+
+        order = np.argsort(-objectives.sum(axis=1), kind="stable")[:self.max_size]
+        self.solutions = population[order].copy()
+        self.objectives = objectives[order].copy()
+
+    def front(self, size: int = PARETO_FRONT_SIZE) -> List[Tuple[NDArray, Dict[str, float]]]:
+        """Returns up to `size` solutions of the front with their named objectives, best sum first."""
+        if self.solutions is None:
+            return []
+
+        return [
+            (solution, {name: value.item() for name, value in zip(OBJECTIVES, objectives)})
+            for solution, objectives in zip(self.solutions[:size], self.objectives[:size])
+        ]
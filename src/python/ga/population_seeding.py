@@ -0,0 +1,103 @@
+from typing import List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.python.ga.gene_space import GeneSpace
+
+SEEDED_FRACTION: float = 0.0
+ORDER_NOISE: float = 0.3
+"""Standard deviation of the log-normal noise on the lesson priorities, so seeded solutions differ."""
+
+
+class GreedySeeder:
+    """Builds solutions greedily, placing the most constrained lessons first.
+
+    A lesson is constrained by the lessons it shares employees or participants with and by the scarcity
+    of the rooms it fits into. Each lesson is placed on an unused gene of its domain whose date causes
+    the fewest employee and participant conflicts with the lessons placed so far, ties are broken at
+    random.
+    """
+
+    def __init__(self, gene_space: GeneSpace):
+        self.gene_space = gene_space
+        self.problem = problem = gene_space.problem
+        self.rng = gene_space.rng
+
+        self.lesson_employees = _owners_by_lesson(problem.employee_lesson, problem.employee_owner, problem.num_lessons)
+        self.lesson_participants = _owners_by_lesson(
+            problem.participant_lesson, problem.participant_owner, problem.num_lessons
+        )
+
+        # lessons sharing an owner with each lesson (counted once per shared owner)
+        employee_load = np.bincount(problem.employee_owner, minlength=len(problem.employees))
+        participant_load = np.bincount(problem.participant_owner, minlength=len(problem.participants))
+        degree = np.array([
+            np.sum(employee_load[employees] - 1) + np.sum(participant_load[participants] - 1)
+            for employees, participants in zip(self.lesson_employees, self.lesson_participants)
+        ], dtype=np.float64)
+
+        scarcity = problem.num_genes / gene_space.domain_sizes
+        self.priority = (degree + 1) * scarcity
+
+    def solution(self, partial: Optional[NDArray[np.int64]] = None) -> NDArray[np.uint32]:
+        """Builds one solution, keeping the genes of `partial` that are not negative if it is given."""
+        problem = self.problem
+        employee_busy = np.zeros((len(problem.employees), problem.num_dates), dtype=np.int64)
+        participant_busy = np.zeros((len(problem.participants), problem.num_dates), dtype=np.int64)
+        used = np.zeros(problem.num_genes, dtype=bool)
+        solution = np.zeros(problem.num_lessons, dtype=np.uint32)
+
+        def place(lesson_idx, gene):
+            solution[lesson_idx] = gene
+            used[gene] = True
+            date = problem.gene_date[gene]
+            np.add.at(employee_busy, (self.lesson_employees[lesson_idx], date), 1)
+            np.add.at(participant_busy, (self.lesson_participants[lesson_idx], date), 1)
+
+        placed = np.zeros(problem.num_lessons, dtype=bool)
+        if partial is not None:
+            placed = partial >= 0
+            for lesson_idx in np.flatnonzero(placed):
+                place(lesson_idx, partial[lesson_idx])
+
+        noise = self.rng.lognormal(0, ORDER_NOISE, problem.num_lessons)
+        for lesson_idx in np.argsort(-self.priority * noise):
+            if placed[lesson_idx]:
+                continue
+            employees = self.lesson_employees[lesson_idx]
+            participants = self.lesson_participants[lesson_idx]
+
+            domain = self.gene_space.domain(lesson_idx)
+            dates = problem.gene_date[domain]
+            date_conflicts = employee_busy[employees].sum(axis=0) + participant_busy[participants].sum(axis=0)
+            conflicts = date_conflicts[dates]
+            conflicts[used[domain]] = np.iinfo(np.int64).max
+
+            best = np.flatnonzero(conflicts == conflicts.min())
+            gene = domain[self.rng.choice(best)]
+            if used[gene]:
+                # every gene of the domain is taken, repaired below like any other duplicate
+                gene = domain[self.rng.integers(len(domain))]
+            place(lesson_idx, gene)
+
+        return solution
+
+
+def initial_population(gene_space: GeneSpace, size: int, seeded_fraction: float = SEEDED_FRACTION) -> NDArray[np.uint32]:
+    """Creates the initial population, `seeded_fraction` of it built greedily and the rest at random."""
+    num_seeded = int(round(size * min(max(seeded_fraction, 0.0), 1.0)))
+
+    population = gene_space.random_population(size)
+    if num_seeded > 0:
+        seeder = GreedySeeder(gene_space)
+        population[:num_seeded] = [seeder.solution() for _ in range(num_seeded)]
+
+    return gene_space.repair(population)
+
+
+def _owners_by_lesson(entry_lessons: NDArray[np.int64], entry_owners: NDArray[np.int64], num_lessons: int) -> List[NDArray[np.int64]]:
+    owners: List[List[int]] = [[] for _ in range(num_lessons)]
+    for lesson, owner in zip(entry_lessons.tolist(), entry_owners.tolist()):
+        owners[lesson].append(owner)
+    return [np.array(lesson_owners, dtype=np.int64) for lesson_owners in owners]
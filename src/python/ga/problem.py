@@ -0,0 +1,334 @@
+import numpy as np
+from typing import Any, Callable, Dict, List, Tuple
+from numpy.typing import NDArray
+
+from src.python.api import database
+from src.python.ga import evaluator_constraint, evaluator_expression
+from src.python.log.logger import logger_ga
+
+CORE_CONSTRAINTS: Tuple[str, ...] = ("employee_conflicts", "student_conflicts", "room_capacity", "room_type")
+"""Names of the core constraints in the order of the columns returned by `Problem.evaluate_core`."""
+
+CONSTRAINT_COMPILERS: Dict[str, Callable] = {
+    "EmployeeFreeTimeslots".lower(): evaluator_constraint.compile_employee_free_timeslots,
+    "EmployeeSubsequentTimeslots".lower(): evaluator_constraint.compile_employee_subsequent_timeslots,
+    "EventDistributeWeeklyBlocks".lower(): evaluator_constraint.compile_event_distribute_weekly_blocks,
+    "Expression".lower(): evaluator_expression.compile_expression,
+}
+"""Compile function per (lower case) constraint type, see `Problem.compile_constraint`."""
+
+CompiledConstraint = Tuple[Dict[str, Any], Callable[[NDArray[np.int64]], NDArray[np.int64]]]
+"""A constraint together with its compiled evaluation function."""
+
+
+class Problem:
+    """Integer-indexed representation of the lessons and date x room combinations of one run.
+
+    Every gene of a solution is an index into `date_x_room`. Instead of resolving the dictionaries
+    behind each gene on every fitness call, the lookup tables built here map a gene directly to its
+    date index, room capacity and room type id, so that constraints can be evaluated with array
+    operations over whole solutions or populations.
+    """
+
+    def __init__(
+            self,
+            lessons: List[Dict[str, Any]],
+            date_x_room: List[Dict[str, Any]],
+            constraints_hard: List[Dict[str, Any]] = (),
+            constraints_soft: List[Dict[str, Any]] = ()
+    ):
+        self.lessons = lessons
+        self.date_x_room = date_x_room
+        self.source_constraints_hard = constraints_hard
+        self.source_constraints_soft = constraints_soft
+
+        self.num_lessons: int = len(lessons)
+        self.num_genes: int = len(date_x_room)
+
+        # dates are identified by their content, just like the (employee, tuple(date.items())) keys
+        date_ids: Dict[tuple, int] = {}
+        room_type_ids: Dict[str, int] = {}
+        self.dates: List[Dict[str, Any]] = []
+
+        self.gene_date = np.empty(self.num_genes, dtype=np.int64)
+        self.gene_room_capacity = np.empty(self.num_genes, dtype=np.int64)
+        self.gene_room_type = np.empty(self.num_genes, dtype=np.int64)
+
+        for gene, schedule in enumerate(date_x_room):
+            date = schedule["date"]
+            room = schedule["room"]
+
+            date_key = tuple(date.items())
+            if date_key not in date_ids:
+                date_ids[date_key] = len(self.dates)
+                self.dates.append(date)
+
+            self.gene_date[gene] = date_ids[date_key]
+            self.gene_room_capacity[gene] = room["capacity"]
+            self.gene_room_type[gene] = room_type_ids.setdefault(room["room_type"], len(room_type_ids))
+
+        self.num_dates: int = len(self.dates)
+        self.date_day = np.array([date["day"] for date in self.dates], dtype=np.int64)
+        self.date_timeslot = np.array([date["timeslot"] for date in self.dates], dtype=np.int64)
+
+        self.lesson_size = np.array([lesson["size"] for lesson in lessons], dtype=np.int64)
+        self.lesson_room_type = np.array(
+            [room_type_ids.setdefault(lesson["room_type"], len(room_type_ids)) for lesson in lessons],
+            dtype=np.int64
+        )
+
+        self.employees, self.employee_lesson, self.employee_owner = self._incidence("employees")
+        self.participants, self.participant_lesson, self.participant_owner = self._incidence("participants")
+
+        self._lessons_by_employee = _group_lessons(self.employee_owner, self.employee_lesson, self.employees)
+        self._lessons_by_event = _group_lessons(
+            np.arange(self.num_lessons), np.arange(self.num_lessons), [lesson["name"] for lesson in lessons]
+        )
+
+        # expression constraints share one event view per solution, see ExpressionEvaluator
+        self.expressions = evaluator_expression.ExpressionEvaluator(lessons, date_x_room)
+        self.lowered_expressions: List[str] = []
+        """Ids of the expression constraints evaluated as arrays instead of by the interpreter."""
+
+        self.constraints_hard: List[CompiledConstraint] = [self.compile_constraint(c) for c in constraints_hard]
+        self.constraints_soft: List[CompiledConstraint] = [self.compile_constraint(c) for c in constraints_soft]
+
+        self.core_totals = np.array(
+            [len(self.employee_lesson), len(self.participant_lesson), self.num_lessons, self.num_lessons],
+            dtype=np.int64
+        )
+
+        # column layout of the rows returned by evaluate()
+        self.core_columns = slice(0, len(CORE_CONSTRAINTS))
+        self.hard_columns = slice(self.core_columns.stop, self.core_columns.stop + len(self.constraints_hard))
+        self.soft_columns = slice(self.hard_columns.stop, self.hard_columns.stop + len(self.constraints_soft))
+        self.num_columns: int = self.soft_columns.stop
+
+        self.fitness_cache = None
+        """Optional `FitnessCache` for the evaluations of this problem, set for the duration of a run."""
+
+        self.parallel_evaluator = None
+        """Optional `ParallelEvaluator` used instead of `evaluate`, set for the duration of a run."""
+
+        self.column_weights: NDArray = np.empty(0)
+        """Weight of every column of `evaluate`'s rows in the fitness, see `set_fitness_weights`."""
+        self.set_fitness_weights()
+
+        self.multi_objective: bool = False
+        """Whether the fitness is a vector of `objectives` instead of one weighted value, set per run."""
+        self.fairness_objective: bool = False
+
+        # constraint owner x (hard and soft) constraint column incidence, for the fairness objective
+        owners = [constraint.get("owner") for constraint, _ in self.constraints_hard + self.constraints_soft]
+        owner_ids = {owner: idx for idx, owner in enumerate(dict.fromkeys(owners))}
+        self.owner_columns = np.zeros((len(owner_ids), len(owners)), dtype=np.int64)
+        for column, owner in enumerate(owners):
+            self.owner_columns[owner_ids[owner], column] = 1
+
+    def _incidence(self, key: str) -> Tuple[List[str], NDArray[np.int64], NDArray[np.int64]]:
+        """Flattens the `key` lists of all lessons into parallel (lesson index, owner index) arrays.
+
+        Duplicate entries within a lesson are kept, since they count as conflicts as well.
+        """
+        owner_ids: Dict[str, int] = {}
+        lesson_indices = []
+        owner_indices = []
+
+        for lesson_idx, lesson in enumerate(self.lessons):
+            for owner in lesson[key]:
+                lesson_indices.append(lesson_idx)
+                owner_indices.append(owner_ids.setdefault(owner, len(owner_ids)))
+
+        return (
+            list(owner_ids),
+            np.array(lesson_indices, dtype=np.int64),
+            np.array(owner_indices, dtype=np.int64),
+        )
+
+    def lessons_of_employee(self, employee: str) -> NDArray[np.int64]:
+        """Returns the indices of all lessons the employee takes part in."""
+        return self._lessons_by_employee.get(employee, _NO_LESSONS)
+
+    def lessons_of_event(self, name: str) -> NDArray[np.int64]:
+        """Returns the indices of all lessons (weekly blocks) of the event with the given name."""
+        return self._lessons_by_event.get(name, _NO_LESSONS)
+
+    def compile_constraint(self, constraint: Dict[str, Any]) -> CompiledConstraint:
+        """Resolves a hard or soft constraint against this problem into an evaluation function.
+
+        The function receives a 2-D population and returns one fitness value per solution. Constraints
+        of an unknown type always evaluate to 0.
+        """
+        compiler = CONSTRAINT_COMPILERS.get(constraint["type"].lower())
+
+        if compiler is None:
+            return constraint, lambda population: np.zeros(len(population), dtype=np.int64)
+
+        return constraint, compiler(constraint, self)
+
+    def gene_domains(self) -> List[NDArray[np.int64]]:
+        """Returns per lesson the genes (date x room indices) whose room fits the lesson.
+
+        A room fits if it has the lesson's room type and enough capacity. If no room fits, all rooms
+        of the lesson's room type are allowed, and if there is none of those either, all genes.
+        """
+        domains = []
+        for lesson_idx in range(self.num_lessons):
+            same_type = self.gene_room_type == self.lesson_room_type[lesson_idx]
+            fitting = same_type & (self.gene_room_capacity >= self.lesson_size[lesson_idx])
+
+            for allowed in (fitting, same_type):
+                if allowed.any():
+                    domains.append(np.flatnonzero(allowed))
+                    break
+            else:
+                domains.append(np.arange(self.num_genes))
+
+        return domains
+
+    def dates_of(self, population: NDArray) -> NDArray[np.int64]:
+        """Maps every gene of a 2-D population to the index of its date in `dates`."""
+        return self.gene_date[population]
+
+    def evaluate_core(self, population: NDArray) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """Counts the violated and satisfied core constraints of every solution in `population`.
+
+        Args:
+            population: 2-D array of shape (solutions, lessons) holding date x room indices.
+
+        Returns:
+            Two arrays of shape (solutions, len(CORE_CONSTRAINTS)) holding the violation and the
+            satisfied counts, in the order of `CORE_CONSTRAINTS`.
+        """
+        population = np.asarray(population, dtype=np.int64)
+        dates = self.dates_of(population)
+        violated = np.zeros((len(population), len(CORE_CONSTRAINTS)), dtype=np.int64)
+
+        violated[:, 0] = _count_duplicates(self.employee_owner * self.num_dates + dates[:, self.employee_lesson])
+        violated[:, 1] = _count_duplicates(self.participant_owner * self.num_dates + dates[:, self.participant_lesson])
+        violated[:, 2] = np.count_nonzero(self.gene_room_capacity[population] < self.lesson_size, axis=1)
+        violated[:, 3] = np.count_nonzero(self.gene_room_type[population] != self.lesson_room_type, axis=1)
+
+        satisfied = self.core_totals - violated
+
+        return violated, satisfied
+
+    def set_fitness_weights(self, core: float = 1, hard: float = 1, soft: float = 1, lexicographic: bool = False) -> None:
+        """Sets how the core, hard and soft results are combined into one fitness value.
+
+        Every hard and soft constraint is additionally weighted by its optional `weight` field (default
+        1). In lexicographic mode the tier weights are ignored and each tier is scaled above the largest
+        possible total of the tiers below it, so any core violation weighs more than all hard ones and
+        any hard violation more than all soft ones.
+        """
+        hard_weights = np.array([c.get("weight", 1) for c, _ in self.constraints_hard])
+        soft_weights = np.array([c.get("weight", 1) for c, _ in self.constraints_soft])
+
+        if lexicographic:
+            # a single constraint evaluates to at least -num_lessons (e.g. EmployeeSubsequentTimeslots)
+            hard = np.sum(soft_weights) * self.num_lessons + 1
+            core = (np.sum(hard_weights) * self.num_lessons + 1) * hard
+            soft = 1
+
+        self.column_weights = np.concatenate([
+            np.full(len(CORE_CONSTRAINTS), -core),  # core columns count violations
+            hard * hard_weights,
+            soft * soft_weights,
+        ])
+        if np.all(np.mod(self.column_weights, 1) == 0):
+            self.column_weights = self.column_weights.astype(np.int64)
+
+    def fitness(self, breakdown: NDArray[np.int64]) -> NDArray:
+        """Combines rows of `evaluate` (or a single row) into fitness values with the current weights."""
+        return breakdown @ self.column_weights
+
+    def objectives(self, breakdown: NDArray[np.int64]) -> NDArray:
+        """Returns per row of `evaluate` the core, hard and soft fitness and, if enabled, the fairness.
+
+        Constraint weights apply within each objective. Fairness is the fitness of the constraint owner
+        (employee) whose hard and soft constraints are violated the most, so improving it spreads the
+        violations more evenly.
+        """
+        weighted = breakdown * self.column_weights
+        objectives = [
+            weighted[:, self.core_columns].sum(axis=1),
+            weighted[:, self.hard_columns].sum(axis=1),
+            weighted[:, self.soft_columns].sum(axis=1),
+        ]
+        if self.fairness_objective:
+            owner_fitness = weighted[:, self.hard_columns.start:self.soft_columns.stop] @ self.owner_columns.T
+            objectives.append(owner_fitness.min(axis=1) if owner_fitness.shape[1] else np.zeros(len(breakdown)))
+
+        return np.stack(objectives, axis=1)
+
+    def evaluate(self, population: NDArray) -> NDArray[np.int64]:
+        """Evaluates all core, hard and soft constraints for every solution in `population`.
+
+        Returns:
+            Array of shape (solutions, num_columns) with the core constraint violation counts in
+            `core_columns` and the fitness of every hard and soft constraint in `hard_columns` and
+            `soft_columns`.
+        """
+        population = np.asarray(population, dtype=np.int64)
+        self.expressions.clear()
+        breakdown = np.empty((len(population), self.num_columns), dtype=np.int64)
+
+        breakdown[:, self.core_columns], _ = self.evaluate_core(population)
+
+        for column, (_, evaluate) in enumerate(self.constraints_hard + self.constraints_soft, self.hard_columns.start):
+            breakdown[:, column] = evaluate(population)
+
+        return breakdown
+
+
+def _count_duplicates(keys: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Counts per row how many keys are equal to an earlier key of the same row."""
+    if keys.shape[1] < 2:
+        return np.zeros(len(keys), dtype=np.int64)
+
+    keys = np.sort(keys, axis=1)
+    return np.count_nonzero(keys[:, 1:] == keys[:, :-1], axis=1)
+
+
+_NO_LESSONS = np.zeros(0, dtype=np.int64)
+
+
+def _group_lessons(
+        owners: NDArray[np.int64], lesson_indices: NDArray[np.int64], names: List[str]
+) -> Dict[str, NDArray[np.int64]]:
+    """Groups lesson indices by the name of their owner, keeping every lesson only once per owner."""
+    groups: Dict[str, List[int]] = {}
+    for owner, lesson_idx in zip(owners, lesson_indices):
+        group = groups.setdefault(names[owner], [])
+        if not group or group[-1] != lesson_idx:
+            group.append(int(lesson_idx))
+
+    return {name: np.array(group, dtype=np.int64) for name, group in groups.items()}
+
+
+_problem = None
+
+
+def get_problem(lessons: List[Dict[str, Any]], date_x_room: List[Dict[str, Any]]) -> Problem:
+    """Returns the compiled problem for the given lessons and date x room combinations.
+
+    The problem, including the hard and soft constraints of the `database`, is compiled once and
+    reused as long as the same lists are passed in and no other data has been injected.
+    """
+    global _problem
+
+    constraints_hard = database.get_constraints_hard()
+    constraints_soft = database.get_constraints_soft()
+
+    if (_problem is None
+            or _problem.lessons is not lessons
+            or _problem.date_x_room is not date_x_room
+            or _problem.source_constraints_hard is not constraints_hard
+            or _problem.source_constraints_soft is not constraints_soft):
+        _problem = Problem(lessons, date_x_room, constraints_hard, constraints_soft)
+        logger_ga.debug(f"Compiled problem with {_problem.num_lessons} lessons, {len(_problem.constraints_hard)} "
+                        f"hard and {len(_problem.constraints_soft)} soft constraints")
+        if _problem.lowered_expressions:
+            logger_ga.info(f"Expression constraints evaluated as arrays: {_problem.lowered_expressions}")
+
+    return _problem
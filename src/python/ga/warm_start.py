@@ -0,0 +1,122 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.python.ga.evaluator_incremental import IncrementalEvaluator
+from src.python.ga.gene_space import GeneSpace
+from src.python.ga.population_seeding import GreedySeeder, initial_population
+from src.python.log.logger import logger_ga
+
+WARM_START_FRACTION: float = 0.5
+"""Fraction of the initial population derived from the previous timetable, the rest is built as usual."""
+
+PERTURBATION: float = 0.05
+"""Probability of a gene of an unpinned lesson to be drawn anew in the derived solutions but the first."""
+
+SUFFIX_PATTERN = re.compile(r"^(.*) \((\d+)\)$")
+"""Suffix `parse_solution_into_timetable` appends to events taking place in parallel."""
+
+
+def solution_from_timetable(
+        timetable: List[Dict[str, Any]],
+        lessons,
+        date_x_room
+) -> Tuple[NDArray[np.int64], NDArray[np.bool_]]:
+    """Maps the entries of a previous timetable onto the lessons of the current input.
+
+    The entries of an event are assigned to its lessons in order. Events, blocks or dates x rooms that no
+    longer exist are skipped, lessons without an entry get the gene -1.
+
+    Returns:
+        The genes of the lessons and whether the participants of each mapped lesson are unchanged.
+    """
+    gene_by_schedule = {
+        (schedule["date"].get("day"), schedule["date"].get("timeslot"), schedule["room"].get("name")): gene
+        for gene, schedule in enumerate(date_x_room)
+    }
+    lessons_by_name: Dict[str, List[int]] = {}
+    for lesson_idx, lesson in enumerate(lessons):
+        lessons_by_name.setdefault(lesson.get("name"), []).append(lesson_idx)
+
+    genes = np.full(len(lessons), -1, dtype=np.int64)
+    unchanged = np.zeros(len(lessons), dtype=bool)
+    next_block: Dict[str, int] = {}
+
+    for entry in timetable:
+        name = entry.get("event")
+        if name not in lessons_by_name:
+            match = SUFFIX_PATTERN.match(name or "")
+            name = match.group(1) if match else name
+
+        gene = gene_by_schedule.get((entry.get("day"), entry.get("timeslot"), entry.get("room")))
+        block = next_block.get(name, 0)
+        if name not in lessons_by_name or gene is None or block >= len(lessons_by_name[name]):
+            continue
+
+        lesson_idx = lessons_by_name[name][block]
+        next_block[name] = block + 1
+        genes[lesson_idx] = gene
+        unchanged[lesson_idx] = entry.get("participants") == lessons[lesson_idx].get("participants")
+
+    # two entries mapped onto the same date x room, only the first one keeps it
+    _, first = np.unique(genes, return_index=True)
+    duplicate = np.ones(len(genes), dtype=bool)
+    duplicate[first] = False
+    duplicate &= genes >= 0
+    genes[duplicate] = -1
+    unchanged[duplicate] = False
+
+    return genes, unchanged
+
+
+def warm_start_population(
+        gene_space: GeneSpace,
+        timetable: List[Dict[str, Any]],
+        size: int,
+        seeded_fraction: float,
+        pin_unchanged: bool = False
+) -> NDArray[np.uint32]:
+    """Creates an initial population from a previous timetable.
+
+    Lessons missing in the previous timetable are placed greedily around the mapped ones. With
+    `pin_unchanged` every lesson that kept its participants, still fits its room and is not involved in a
+    conflict or violated constraint keeps its gene for the whole run, so only what the change broke is
+    optimised. The first solution is the mapped timetable itself, `WARM_START_FRACTION` of the population
+    are copies of it with some unpinned genes drawn anew and the rest is built by `initial_population`.
+    """
+    problem = gene_space.problem
+    genes, unchanged = solution_from_timetable(timetable, problem.lessons, problem.date_x_room)
+    mapped = genes >= 0
+
+    in_domain = np.array([
+        mapped[lesson_idx] and genes[lesson_idx] in gene_space.domain(lesson_idx)
+        for lesson_idx in range(problem.num_lessons)
+    ], dtype=bool)
+    genes[mapped & ~in_domain] = -1
+
+    solution = GreedySeeder(gene_space).solution(genes)
+    solution = gene_space.repair(solution[np.newaxis, :])[0]
+
+    pinned = np.zeros(0, dtype=np.int64)
+    if pin_unchanged:
+        keep = unchanged & in_domain
+        keep[IncrementalEvaluator(problem, solution).conflicting_lessons()] = False
+        pinned = np.flatnonzero(keep)
+        gene_space.pin(solution, pinned)
+
+    logger_ga.info(f"Warm start: {np.count_nonzero(in_domain)} of {problem.num_lessons} lessons taken from the "
+                   f"previous timetable, {len(pinned)} pinned")
+
+    num_derived = max(int(round(size * WARM_START_FRACTION)), 1)
+    population = initial_population(gene_space, size, seeded_fraction)
+    population[:num_derived] = solution
+
+    free = np.ones(problem.num_lessons, dtype=bool)
+    free[pinned] = False
+    mutate = gene_space.rng.random((num_derived - 1, problem.num_lessons)) < PERTURBATION
+    rows, lesson_indices = np.nonzero(mutate & free)
+    population[1 + rows, lesson_indices] = gene_space.sample(lesson_indices)
+
+    return gene_space.repair(population)
@@ -0,0 +1,111 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.python.api import database
+from src.python.io import printer_json
+from src.python.utils import path_utils
+
+SCHEMA_VERSION: int = 1
+"""Version of the compact solution format, readers reject files of other versions."""
+
+
+def save_solution(
+    parsed_solution: Dict[str, Any],
+    job_id: Optional[str] = None
+) -> str:
+    """Saves the parsed solution in the compact format, an `.npz` file instead of the JSON file.
+
+    The timetable is stored as the genes of the solution together with tables of the events and the dates x
+    rooms of the injected input, the hard and soft constraints once together with a mask of the violated
+    ones per solution. Candidates of multi-objective runs are stored the same way. `reader_compact.parse`
+    expands the file into the JSON of `printer_json.save_solution` again.
+
+    Args:
+        parsed_solution: Best solution parsed into a human-readable format, from the injected input.
+        job_id: Id of the job the solution belongs to, see `printer_json.save_solution`.
+
+    Returns:
+        The path of the saved file.
+    """
+    solutions = [parsed_solution] + parsed_solution.get("candidates", [])
+
+    lessons = database.get_lessons()
+    date_x_room = database.get_date_x_room()
+    constraints_hard = database.get_constraints_hard()
+    constraints_soft = database.get_constraints_soft()
+
+    event_ids: Dict[int, int] = {}
+    events = []
+    for event in database.get_events():
+        event_ids[id(event)] = len(events)
+        events.append([event["name"], event.get("participants")])
+
+    rooms = [room["name"] for room in database.get_rooms()]
+    room_ids = {name: room_idx for room_idx, name in enumerate(rooms)}
+    gene_by_schedule = {}
+    for gene, schedule in enumerate(date_x_room):
+        gene_by_schedule.setdefault(
+            (schedule["date"]["day"], schedule["date"]["timeslot"], schedule["room"]["name"]), gene
+        )
+
+    arrays = {
+        "version": np.array(SCHEMA_VERSION),
+        "solutions": np.array([_genes(solution["timetable"], gene_by_schedule) for solution in solutions],
+                              dtype=np.uint32).reshape(len(solutions), len(lessons)),
+        "lesson_events": np.array([event_ids[id(lesson)] for lesson in lessons], dtype=np.int32),
+        "schedule_dates": np.array([[schedule["date"]["day"], schedule["date"]["timeslot"]]
+                                    for schedule in date_x_room], dtype=np.int64).reshape(len(date_x_room), 2),
+        "schedule_rooms": np.array([room_ids[schedule["room"]["name"]] for schedule in date_x_room],
+                                   dtype=np.int32),
+        "violated_hard": np.array([_violated(constraints_hard, solution["constraints"]["hard"]["unsatisfied"])
+                                   for solution in solutions], dtype=bool).reshape(len(solutions), -1),
+        "violated_soft": np.array([_violated(constraints_soft, solution["constraints"]["soft"]["unsatisfied"])
+                                   for solution in solutions], dtype=bool).reshape(len(solutions), -1),
+        "events": _json(events),
+        "rooms": _json(rooms),
+        "constraints": _json({"hard": constraints_hard, "soft": constraints_soft}),
+        "summaries": _json({
+            "candidates": "candidates" in parsed_solution,
+            "solutions": [{
+                "metadata": solution["metadata"],
+                "core": solution["constraints"]["core"],
+                "hard_fitness": solution["constraints"]["hard"]["fitness"],
+                "soft_fitness": solution["constraints"]["soft"]["fitness"],
+            } for solution in solutions]
+        }),
+    }
+
+    filename = printer_json.solution_filename(job_id, "npz")
+    os.makedirs(path_utils.RESOURCE_OUTPUT_PATH, exist_ok=True)
+    solution_filepath = os.path.join(path_utils.RESOURCE_OUTPUT_PATH, filename)
+    np.savez_compressed(solution_filepath, **arrays)
+
+    printer_json.save_latest_pointer(filename)
+
+    return solution_filepath
+
+
+def _genes(timetable: List[Dict[str, Any]], gene_by_schedule) -> List[int]:
+    # the timetable has one entry per lesson, in the order of the lessons
+    return [gene_by_schedule[(entry["day"], entry["timeslot"], entry["room"])] for entry in timetable]
+
+
+def _violated(constraints: List[Dict[str, Any]], unsatisfied: List[Dict[str, Any]]) -> List[bool]:
+    # unsatisfied constraints are listed in the order of the input's constraints
+    violated = []
+    unsatisfied_idx = 0
+    for constraint in constraints:
+        is_violated = unsatisfied_idx < len(unsatisfied) and unsatisfied[unsatisfied_idx] == constraint
+        unsatisfied_idx += is_violated
+        violated.append(is_violated)
+
+    if unsatisfied_idx != len(unsatisfied):
+        raise ValueError("Unsatisfied constraints do not belong to the injected input")
+    return violated
+
+
+def _json(data: Any) -> np.ndarray:
+    return np.array(json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=printer_json.json_default))
@@ -2,7 +2,7 @@ import json
 import os
 from collections import OrderedDict
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator, Optional
 
 import numpy as np
 import pytz
@@ -10,46 +10,82 @@ import pytz
 from src.python.log.logger import logger_app
 from src.python.utils import path_utils
 
-def save(data, filepath):
+def save(data, filepath, compact=False):
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
     with open(filepath, "w", encoding="UTF8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=4)
+        if compact:
+            # without indentation, uploaded inputs are only read by the application
+            json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(data, file, ensure_ascii=False, indent=4)
 
-def save_solution(
-    parsed_solution: dict[str, Any]
-) -> None:
-    """Saves the parsed solution as a JSON file.
+def json_default(obj):
+    if isinstance(obj, (np.integer,)):
+        return int(obj)
+    if isinstance(obj, (np.floating,)):
+        return float(obj)
+    if isinstance(obj, (np.ndarray,)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
-    Args:
-        parsed_solution: Best solution parsed into a human-readable format.
-        fitness: Fitness of the best solution.
-        debug_mode: Whether to print the JSON for debugging purposes, `False` by default.
-    """
+def iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    """Yields `items` as the chunks of a compact JSON array, one item at a time."""
+    yield "["
+    for i, item in enumerate(items):
+        yield ("," if i else "") + json.dumps(item, ensure_ascii=False, separators=(",", ":"), default=json_default)
+    yield "]"
 
+def solution_filename(job_id: Optional[str] = None, extension: str = "json") -> str:
+    """Returns the file name of a solution saved now, `parsed_solution_<time>[_<job_id>].<extension>`."""
     current_time: str = (
         datetime.now(pytz.utc)
         .astimezone(pytz.timezone("Europe/Berlin"))
         .strftime("%Y-%m-%d_%H-%M-%S")
     )
 
-    solution_filename: str = f"parsed_solution_{current_time}.json"
+    if job_id is not None:
+        return f"parsed_solution_{current_time}_{job_id}.{extension}"
+    return f"parsed_solution_{current_time}.{extension}"
+
+def save_solution(
+    parsed_solution: dict[str, Any],
+    job_id: Optional[str] = None
+) -> str:
+    """Saves the parsed solution as a JSON file.
+
+    Args:
+        parsed_solution: Best solution parsed into a human-readable format.
+        job_id: Id of the job the solution belongs to, appended to the file name so solutions of
+            concurrent jobs do not overwrite each other.
+
+    Returns:
+        The path of the saved file.
+    """
+
+    filename: str = solution_filename(job_id)
     solution_directory: str = path_utils.RESOURCE_OUTPUT_PATH
     os.makedirs(solution_directory, exist_ok=True)
 
-    solution_filepath: str = os.path.join(solution_directory, solution_filename)
+    solution_filepath: str = os.path.join(solution_directory, filename)
 
     # Prepare the JSON structure
     json_data = parsed_solution
 
-    def custom_encoder(obj):
-        if isinstance(obj, (np.integer,)):
-            return int(obj)
-        if isinstance(obj, (np.floating,)):
-            return float(obj)
-        if isinstance(obj, (np.ndarray,)):
-            return obj.tolist()
-        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
-
     with open(solution_filepath, "w", encoding="UTF8") as solution_file:
-        json.dump(json_data, solution_file, ensure_ascii=False, indent=4, default=custom_encoder)
+        json.dump(json_data, solution_file, ensure_ascii=False, indent=4, default=json_default)
+
+    save_latest_pointer(filename)
+
+    return solution_filepath
+
+def save_latest_pointer(solution_filename: str) -> None:
+    """Points `path_utils.LATEST_SOLUTION_POINTER_PATH` to a solution, so readers of the latest
+    solution neither list nor stat the output folder.
+
+    The pointer is replaced atomically, solutions of concurrent jobs are saved by different processes.
+    """
+    temporary_path = f"{path_utils.LATEST_SOLUTION_POINTER_PATH}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="UTF8") as pointer_file:
+        pointer_file.write(solution_filename)
+    os.replace(temporary_path, path_utils.LATEST_SOLUTION_POINTER_PATH)
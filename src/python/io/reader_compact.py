@@ -0,0 +1,112 @@
+import json
+import zipfile
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.python.io import reader_json
+from src.python.io.printer_compact import SCHEMA_VERSION
+from src.python.log.logger import logger_app
+from src.python.utils import stundenplan_utils
+
+READ_ERRORS = (OSError, ValueError, KeyError, zipfile.BadZipFile, zlib.error)
+"""Errors raised when a saved solution is missing, corrupt or has another schema version."""
+
+
+def parse(npz_file_path: str) -> Dict[str, Any]:
+    """Expands a solution saved by `printer_compact.save_solution` into the JSON structure of
+    `printer_json.save_solution`.
+
+    Raises:
+        `FileNotFoundError`: If the file does not exist.
+        `ValueError`: If the file has another schema version.
+    """
+    arrays = _load(npz_file_path)
+    constraints = json.loads(arrays["constraints"].item())
+    summaries = json.loads(arrays["summaries"].item())
+    lessons, date_x_room = _schedule(arrays)
+
+    solutions = [
+        _expand(genes, summary, violated_hard, violated_soft, constraints, lessons, date_x_room)
+        for genes, summary, violated_hard, violated_soft in zip(
+            arrays["solutions"], summaries["solutions"], arrays["violated_hard"], arrays["violated_soft"]
+        )
+    ]
+
+    result = solutions[0]
+    if summaries["candidates"]:
+        result["candidates"] = solutions[1:]
+    return result
+
+
+def parse_solution(file_path: str):
+    """Parses a saved solution in either format, `None` if the file can't be read or is corrupt."""
+    try:
+        if file_path.endswith(".npz"):
+            return parse(file_path)
+        return reader_json.parse(file_path)
+    except READ_ERRORS as e:
+        logger_app.error(f"Solution {file_path} can't be read: {e}")
+        return None
+
+
+def iter_timetable(file_path: str) -> Optional[Iterator[Dict[str, Any]]]:
+    """Timetable of the best saved solution in either format entry by entry, `None` if the file can't be read.
+
+    The file is read up front so errors surface before the first entry. The entries of a compact solution
+    are only built while iterating, a JSON solution already holds its whole timetable.
+    """
+    if not file_path.endswith(".npz"):
+        solution = parse_solution(file_path)
+        return None if solution is None else iter(solution["timetable"])
+
+    try:
+        arrays = _load(file_path)
+        lessons, date_x_room = _schedule(arrays)
+        genes = arrays["solutions"][0].tolist()
+    except (*READ_ERRORS, IndexError) as e:
+        logger_app.error(f"Solution {file_path} can't be read: {e}")
+        return None
+    return stundenplan_utils.iter_solution_into_timetable(genes, date_x_room, lessons)
+
+
+def _load(npz_file_path: str) -> Dict[str, np.ndarray]:
+    with np.load(npz_file_path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    if arrays["version"].item() != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported compact solution version {arrays['version'].item()} of {npz_file_path}")
+    return arrays
+
+
+def _schedule(arrays: Dict[str, np.ndarray]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    events = json.loads(arrays["events"].item())
+    rooms = json.loads(arrays["rooms"].item())
+
+    lessons = [{"name": events[event_idx][0], "participants": events[event_idx][1]}
+               for event_idx in arrays["lesson_events"].tolist()]
+    date_x_room = [{"date": {"day": day, "timeslot": timeslot}, "room": {"name": rooms[room_idx]}}
+                   for (day, timeslot), room_idx in zip(arrays["schedule_dates"].tolist(),
+                                                        arrays["schedule_rooms"].tolist())]
+    return lessons, date_x_room
+
+
+def _expand(genes, summary, violated_hard, violated_soft, constraints, lessons, date_x_room) -> Dict[str, Any]:
+    return {
+        "timetable": stundenplan_utils.parse_solution_into_timetable(genes.tolist(), date_x_room, lessons),
+        "metadata": summary["metadata"],
+        "constraints": {
+            "core": summary["core"],
+            "hard": _split(summary["hard_fitness"], constraints["hard"], violated_hard),
+            "soft": _split(summary["soft_fitness"], constraints["soft"], violated_soft),
+        }
+    }
+
+
+def _split(fitness, constraints: List[Dict[str, Any]], violated) -> Dict[str, Any]:
+    return {
+        "fitness": fitness,
+        "unsatisfied": [constraint for constraint, is_violated in zip(constraints, violated.tolist()) if is_violated],
+        "satisfied": [constraint for constraint, is_violated in zip(constraints, violated.tolist()) if not is_violated],
+    }
@@ -1,5 +1,6 @@
+import codecs
 import json
-from typing import Any
+from typing import Any, Iterator
 
 
 def parse(json_file_path: str):
@@ -20,3 +21,114 @@ def parse(json_file_path: str):
         return data
     except IOError:
         return None
+
+
+CHUNK_SIZE: int = 64 * 1024
+"""Bytes read at once by `JsonStream`."""
+
+NUMBER_CHARACTERS = frozenset("+-.0123456789eE")
+
+
+class JsonStream:
+    """Reads a JSON document incrementally from a binary file object.
+
+    Objects and arrays can be iterated member by member and element by element, everything else is
+    decoded as a whole. Only the chunk being parsed is buffered, so a large document is never held in
+    memory as text, only the values taken from it.
+    """
+
+    def __init__(self, file, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def peek(self) -> str:
+        """Returns the next character that is not whitespace, an empty string at the end of the document."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._read(self.chunk_size):
+                return self.buffer[self.pos:self.pos + 1]
+
+    def value(self) -> Any:
+        """Decodes the next value as a whole."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            if self._number_ends_buffer():
+                # the number may continue in the next chunk, "1." of "1.5" would be decoded as 1
+                self._read(size)
+                continue
+            try:
+                value, self.pos = self.json_decoder.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise self._error(e.msg, e.pos) from None
+            # values spanning many chunks are read in growing steps, so they are not decoded too often
+            self._read(size)
+            size *= 2
+
+    def members(self) -> Iterator[str]:
+        """Iterates the keys of an object, the value of each member has to be read before the next key."""
+        self._expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error("Expecting property name enclosed in double quotes", self.pos)
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self) -> Iterator[Any]:
+        """Iterates the elements of an array, each decoded as a whole."""
+        self._expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self._expect(",]") == "]":
+                return
+
+    def end(self) -> None:
+        """Checks that nothing but whitespace follows."""
+        if self.peek() != "":
+            raise self._error("Extra data", self.pos)
+
+    def _expect(self, characters: str) -> str:
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise self._error(f"Expecting one of {' '.join(characters)}", self.pos)
+        self.pos += 1
+        return character
+
+    def _number_ends_buffer(self) -> bool:
+        if self.eof:
+            return False
+        end = self.pos
+        while end < len(self.buffer) and self.buffer[end] in NUMBER_CHARACTERS:
+            end += 1
+        return end > self.pos and end == len(self.buffer)
+
+    def _read(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(size)
+        self.eof = not chunk
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def _error(self, message: str, pos: int) -> ValueError:
+        return ValueError(f"{message}: char {self.offset + pos}")
@@ -1,8 +1,11 @@
+import itertools
 import json
 import logging.config
+import logging.handlers
 import os
-from io import StringIO
+from collections import deque
 from logging import Logger
+from typing import Any, Dict, List, Optional, Tuple
 from src.python.utils import path_utils
 from src.python.io import reader_json
 
@@ -11,19 +14,110 @@ LOGGING_CONFIG_PATH: str = os.path.join(path_utils.RESOURCE_CONFIG_PATH, "loggin
 
 _is_logging_configured = False
 
+LOG_OWNER_ENV: str = "STUNDENPLAN_LOG_OWNER"
+"""Environment variable with the id of the process that opened the log files, inherited by its child processes."""
+
+LOG_BUFFER_LINES: int = 10000
+"""Log lines kept in memory per log, older lines are moved to the log's overflow file."""
+
+OVERFLOW_FILE_BYTES: int = 10 * 1024 * 1024
+OVERFLOW_FILE_BACKUPS: int = 3
+
 formatter = logging.Formatter('%(asctime)s %(levelname)s - %(message)s')
 
-stream_log_algorithm = StringIO()
-stream_log_application = StringIO()
-stream_log_server = StringIO()
 
-stream_handler_algorithm = logging.StreamHandler(stream_log_algorithm)
-stream_handler_application = logging.StreamHandler(stream_log_application)
-stream_handler_server = logging.StreamHandler(stream_log_server)
+class RingBufferHandler(logging.Handler):
+    """Keeps the latest `capacity` formatted log lines of one log in memory, numbered consecutively.
+
+    Clients query the lines after the last number they have seen instead of the whole log. Lines pushed
+    out of the buffer are appended to a rotating overflow file `<name>.overflow.log` in the logs folder.
+    """
+
+    def __init__(self, name: str, capacity: int = LOG_BUFFER_LINES):
+        super().__init__()
+        self.lines: deque = deque()
+        self.capacity = capacity
+        self.sequence = 0
+        self.overflow_path = os.path.join(path_utils.RESOURCES_PATH, "logs", f"{name}.overflow.log")
+        self.overflow: Optional[logging.Handler] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        self.sequence += 1
+        self.lines.append((self.sequence, line))
+        if len(self.lines) > self.capacity:
+            self._spill(self.lines.popleft()[1])
+
+    def _spill(self, line: str) -> None:
+        if self.overflow is None:
+            os.makedirs(os.path.dirname(self.overflow_path), exist_ok=True)
+            self.overflow = logging.handlers.RotatingFileHandler(
+                self.overflow_path, maxBytes=OVERFLOW_FILE_BYTES, backupCount=OVERFLOW_FILE_BACKUPS,
+                encoding="utf8", delay=True
+            )
+        self.overflow.handle(logging.makeLogRecord({"msg": line}))
+
+    def query(self, since: Optional[int] = None, limit: Optional[int] = None) -> Tuple[List[Tuple[int, str]], int, int]:
+        """Returns log lines with their numbers.
+
+        Args:
+            since: Only lines with a higher number are returned, the first `limit` of them. `None`
+                returns the last `limit` lines.
+            limit: Maximum number of lines, `None` for all.
+
+        Returns:
+            The lines, the number of the latest line and the number of the oldest line still in memory.
+        """
+        with self.lock:
+            latest = self.sequence
+            first = self.lines[0][0] if self.lines else latest + 1
+            if since is not None:
+                # numbers are consecutive, so the first line after `since` is found by its offset
+                start = min(max(since + 1 - first, 0), len(self.lines))
+                stop = len(self.lines) if limit is None else min(start + max(limit, 0), len(self.lines))
+            else:
+                stop = len(self.lines)
+                start = 0 if limit is None else max(stop - max(limit, 0), 0)
+            lines = list(itertools.islice(self.lines, start, stop))
+
+        return lines, latest, first
+
+    def text(self) -> str:
+        with self.lock:
+            return "".join(f"{line}\n" for _, line in self.lines)
+
+
+memory_handlers: Dict[str, RingBufferHandler] = {
+    name: RingBufferHandler(name) for name in ("algorithm", "application", "server")
+}
+for _handler in memory_handlers.values():
+    _handler.setFormatter(formatter)
+
+# handler each in-memory log is written to, a queue to the parent in processes that forward their logs
+_memory_targets: Dict[str, logging.Handler] = dict(memory_handlers)
+
+
+def forward_memory_logs(target: Any) -> None:
+    """Sends the records of the in-memory logs to a queue instead of keeping them in this process.
+
+    Used by processes of a job or a run, the process reading the queue passes the records to
+    `handle_forwarded`, so they end up in the in-memory logs of the server.
+    """
+    for name, handler in list(_memory_targets.items()):
+        queue_handler = logging.handlers.QueueHandler(target)
+        logging.getLogger(name).removeHandler(handler)
+        logging.getLogger(name).addHandler(queue_handler)
+        _memory_targets[name] = queue_handler
+
 
-stream_handler_algorithm.setFormatter(formatter)
-stream_handler_application.setFormatter(formatter)
-stream_handler_server.setFormatter(formatter)
+def handle_forwarded(record: logging.LogRecord) -> None:
+    """Writes a record forwarded by another process to the in-memory log it was written to."""
+    _memory_targets[record.name].handle(record)
 
 def configure_logging() -> None:
     """Configures the logging for the application.
@@ -39,6 +133,11 @@ def configure_logging() -> None:
             json_config = reader_json.parse(LOGGING_CONFIG_PATH)
 
             if json_config is not None:
+                if os.environ.setdefault(LOG_OWNER_ENV, str(os.getpid())) != str(os.getpid()):
+                    # processes started by the server or a run add to the log files of their parent
+                    for handler in json_config.get("handlers", {}).values():
+                        if handler.get("mode") == "w":
+                            handler["mode"] = "a"
                 logging.config.dictConfig(json_config)
 
             _is_logging_configured = True  # Mark as configured
@@ -52,15 +151,15 @@ logger_app: Logger = logging.getLogger("application")
 logger_ga: Logger = logging.getLogger("algorithm")
 logger_srv: Logger = logging.getLogger("server")
 
-logger_ga.addHandler(stream_handler_algorithm)
-logger_app.addHandler(stream_handler_application)
-logger_srv.addHandler(stream_handler_server)
+logger_ga.addHandler(memory_handlers["algorithm"])
+logger_app.addHandler(memory_handlers["application"])
+logger_srv.addHandler(memory_handlers["server"])
 
 def get_logs_algorithm():
-    return stream_log_algorithm.getvalue()
+    return memory_handlers["algorithm"].text()
 
 def get_logs_application():
-    return stream_log_application.getvalue()
+    return memory_handlers["application"].text()
 
 def get_logs_server():
-    return stream_log_server.getvalue()
\ No newline at end of file
+    return memory_handlers["server"].text()
\ No newline at end of file
@@ -1,14 +1,25 @@
+import argparse
+
 from src.python.log.logger import logger_app
 from src.python.io import reader_json as parser
 from src.python.app import config, core
 
 
 def main() -> None:
+    argument_parser = argparse.ArgumentParser(description="Generates a Stundenplan for the configured input")
+    argument_parser.add_argument("--resume", metavar="CHECKPOINT_ID",
+                                 help="resume the run of the given checkpoint instead of starting a new one")
+    argument_parser.add_argument("--warm-start", metavar="SOLUTION",
+                                 help='start from a previous parsed_solution file of the output folder or "latest"')
+    argument_parser.add_argument("--pin-unchanged", action="store_true",
+                                 help="with --warm-start, keep unchanged lessons without conflicts in place")
+    args = argument_parser.parse_args()
+
     logger_app.debug("Starting Application")
     app_config = parser.parse(config.get_application_path_config())
     config.set_config(app_config)
 
-    core.run()
+    core.run(resume=args.resume, warm_start=args.warm_start, pin_unchanged=args.pin_unchanged)
 
     exit(0)
 
@@ -1,15 +1,18 @@
 import fnmatch
 import os
-import threading
 from datetime import datetime
 
 import pytz
 from flask import Flask, request, jsonify, send_from_directory, render_template_string, abort, Response
-from flask_restx import Api, Resource, fields
-from src.python.app import core, config
+from flask_restx import Api, Resource, fields, marshal
+from src.python.app import config
+from src.python.app import progress
+from src.python.app.jobs import CREATED, job_queue
 from src.python.app.docs import DocumentationCompiler
-from src.python.io import reader_json, printer_json
-from src.python.log.logger import logger_app, get_logs_algorithm, get_logs_application, logger_srv, get_logs_server
+from src.python.app.results import ResultCache
+from src.python.ga import checkpoint
+from src.python.io import reader_json, reader_compact, printer_json
+from src.python.log.logger import logger_app, logger_srv, memory_handlers
 from src.python.utils import path_utils, stundenplan_utils
 from src.python.utils.models import register_models
 import logging
@@ -37,9 +40,8 @@ model_stundenplan_input = models['stundenplan_input']
 model_stundenplan_output = models['stundenplan_output']
 model_status = models['status_model']
 
-# Global variables and lock
-algorithm_lock = threading.Lock()
-is_running = False
+result_cache = ResultCache(lambda response: marshal(response, model_stundenplan_output, mask=False))
+job_queue.on_completed.append(result_cache.publish)
 
 allowed_ips = config.get_server_allowed_ips()
 
@@ -59,50 +61,51 @@ def log_response_code(response):
     return response
 
 
-def run_genetic_algorithm_thread():
-    global is_running
-
-    try:
-        core.run()
-    except Exception as e:
-        logger_app.error(f"Error during algorithm execution: {str(e)}")
-    finally:
-        is_running = False  # Reset the running flag
-
-
 @ns_logs.route('/')
-class LogsAlgorithmResource(Resource):
+class LogsResource(Resource):
 
-    @ns_config.doc('get_logs')
+    @ns_logs.doc('get_logs')
     def get(self):
         """Retrieves the available logs"""
-        return ["application", "algorithm", "server"]
+        return list(memory_handlers)
 
 
-@ns_logs.route('/server')
-class LogsAlgorithmResource(Resource):
+@ns_logs.route('/<string:name>')
+class LogResource(Resource):
 
-    @ns_config.doc('get_server_logs')
-    def get(self):
-        """Retrieves the algorithm logs."""
-        return Response(get_logs_server(), content_type="text/plain")
-
-@ns_logs.route('/algorithm')
-class LogsAlgorithmResource(Resource):
+    @ns_logs.doc('get_log', params={
+        'since': 'Number of the last line received, only later lines are returned',
+        'limit': 'Maximum number of lines, without since the latest lines'
+    })
+    @ns_logs.response(200, 'OK: Returning the log lines')
+    @ns_logs.response(400, 'Bad Request: since or limit is not a number')
+    @ns_logs.response(404, 'Not Found: No such log exists')
+    def get(self, name):
+        """Retrieves the lines of a log kept in memory (application, algorithm or server).
 
-    @ns_config.doc('get_algorithm_logs')
-    def get(self):
-        """Retrieves the algorithm logs."""
-        return Response(get_logs_algorithm(), content_type="text/plain")
+        Without parameters the lines are returned as plain text. With `since` or `limit` the lines are
+        returned as JSON with their numbers, `next` is the `since` of the following request. Lines older
+        than `first` have been moved to the log's overflow file."""
+        handler = memory_handlers.get(name)
+        if handler is None:
+            api.abort(404, f"No log {name} exists")
 
+        if "since" not in request.args and "limit" not in request.args:
+            return Response(handler.text(), content_type="text/plain")
 
-@ns_logs.route('/application')
-class LogsAlgorithmResource(Resource):
+        try:
+            since = int(request.args["since"]) if "since" in request.args else None
+            limit = int(request.args["limit"]) if "limit" in request.args else None
+        except ValueError:
+            api.abort(400, "since and limit must be numbers")
 
-    @ns_config.doc('get_application_logs')
-    def get(self):
-        """Retrieves the application logs."""
-        return Response(get_logs_application(), content_type="text/plain")
+        lines, latest, first = handler.query(since, limit)
+        return {
+            "lines": [{"seq": seq, "line": line} for seq, line in lines],
+            "next": lines[-1][0] if lines else max(since or 0, first - 1),
+            "latest": latest,
+            "first": first
+        }, 200
 
 
 @ns_config.route('/')
@@ -131,76 +134,86 @@ class ConfigResource(Resource):
 class StundenplanResource(Resource):
 
     @ns_stundenplan.doc('get_stundenplan')
-    @ns_stundenplan.marshal_with(model_stundenplan_output, mask=False)
-    @ns_config.response(200, 'OK: Returning Stundenplan Result')
+    @ns_stundenplan.response(200, 'OK: Returning Stundenplan Result', model_stundenplan_output)
+    @ns_stundenplan.response(304, 'Not Modified: The result matches the ETag of If-None-Match')
     @ns_config.response(404, "Not Found: No Stundenplan Result has been generated yet")
     @ns_config.response(500, "Internal Server Error: Output File can't be parsed")
     def get(self):
-        """Fetches the latest Stundenplan data from the server."""
+        """Fetches the latest Stundenplan data from the server.
+
+        The result is served from memory with an `ETag`, requests with a matching `If-None-Match` header
+        get a 304 without a body. Clients accepting gzip get the result compressed. `timestamp` is the
+        time the result was saved."""
         client_ip = request.remote_addr
         logger_srv.info(f"Attempting to get stundenplan-result from user {client_ip}")
 
         path = path_utils.RESOURCE_OUTPUT_PATH
         try:
-            files = [f for f in os.listdir(path) if f.startswith("parsed_solution_") and f.endswith(".json")]
-
-            newest_file = max(files, key=lambda f: os.path.getctime(os.path.join(path, f)))
-            filepath = os.path.join(path, newest_file)
-            logger_app.debug(f"Newest file determined: {filepath}")
-
-            data = reader_json.parse(filepath)
-            if data is None:
+            try:
+                result = result_cache.latest()
+            except ValueError:
                 logger_app.error(f"Attempted to get stundenplan-result from {client_ip}, but output data can't be parsed or is empty")
-                return {
+                return marshal({
                     "data": None,
                     "timestamp": datetime.now().isoformat(),
                     "status": "failed"
-                }, 500
-
-            return {
-                "status": "success",
-                "timestamp": datetime.now().isoformat(),
-                "data": data
-            }, 200
+                }, model_stundenplan_output, mask=False), 500
+            if result is None:
+                raise FileNotFoundError(path)
+
+            if request.if_none_match.contains(result.etag):
+                response = Response(status=304)
+            elif "gzip" in request.accept_encodings:
+                response = Response(result.gzipped, mimetype="application/json")
+                response.headers["Content-Encoding"] = "gzip"
+            else:
+                response = Response(result.body, mimetype="application/json")
+            response.set_etag(result.etag)
+            response.headers["Cache-Control"] = "no-cache"
+            response.vary.add("Accept-Encoding")
+            return response
         except Exception as e:
             logger_app.error(f"Attempted to get stundenplan-result from {client_ip}, but no output data has been generated yet")
-            return {
+            return marshal({
                 "data": None,
                 "status": "unavailable",
                 "timestamp": datetime.now().isoformat()
-            }, 404
+            }, model_stundenplan_output, mask=False), 404
 
     @ns_stundenplan.doc('post_stundenplan')
     @ns_stundenplan.expect(model_stundenplan_input)
     @ns_stundenplan.response(201, "Accepted: Stundenplan data saved successfully.")
     @ns_stundenplan.response(400, "Bad Request: Missing or malformed input data.")
-    @ns_stundenplan.response(409, "Conflict: The algorithm is currently running.")
+    @ns_stundenplan.response(415, "Unsupported Media Type: The input data is not sent as JSON.")
     def post(self):
-        """Saves Stundenplan data to the server. Input data is validated before saving."""
-        global is_running
+        """Saves Stundenplan data to the server. Input data is validated before saving.
 
+        The input is read and validated in one pass while it is received, all messages are returned at
+        once. Creates a job for the input and returns its `job_id`, `PUT` with the `job_id` runs it."""
         client_ip = request.remote_addr
         logger_srv.info(f"Attempting to save new stundenplan-input data from user {client_ip}")
 
-        if is_running:
-            api.abort(409, "Cannot save data while algorithm is running")
-            # TODO return irgendwas, 409
-
         current_time: str = (
             datetime.now(pytz.utc)
             .astimezone(pytz.timezone("Europe/Berlin"))
             .strftime("%Y-%m-%d_%H-%M-%S")
         )
 
-        data = request.get_json()
-        verify = stundenplan_utils.verify_input(data)
+        if not request.is_json:
+            api.abort(415, "Input data must be sent as application/json")
+
+        try:
+            data, verify = stundenplan_utils.read_input(request.stream)
+        except ValueError as e:
+            logger_app.warning(f"Attempted to load malformed data: {e}")
+            return {"messages": [f"input is not valid JSON: {e}"], "success": False}, 400
 
         if not verify["success"]:
             logger_app.warning("Attempted to load invalid data")
             logger_app.warning("Messages: " + str(verify["messages"]))
 
             filename = f"server_input_{current_time}_invalid.json"
-            printer_json.save(data, config.get_path_input_custom(filename))
+            printer_json.save(data, config.get_path_input_custom(filename), compact=True)
 
             return verify, 400
 
@@ -208,45 +221,169 @@ class StundenplanResource(Resource):
 
         filename = f"server_input_{current_time}.json"
         config.set_filename_input(filename)
-        printer_json.save(data_optimized, config.get_path_input())
+        printer_json.save(data_optimized, config.get_path_input(), compact=True)
 
-        return verify, 201
+        job = job_queue.create(data_optimized, filename, posted=True)
+        return dict(verify, job_id=job.id), 201
 
-    @ns_stundenplan.doc('put_stundenplan')
+    @ns_stundenplan.doc('put_stundenplan', params={
+        'job_id': 'Id of the job to run, returned by POST, by default the job of the latest POST',
+        'resume': 'Id of a checkpoint to resume the run of, see /api/status',
+        'warm_start': 'File name of a previous parsed_solution to start from, or "latest"',
+        'pin_unchanged': 'With warm_start: keep unchanged lessons without conflicts in place (true/false)'
+    })
     @ns_stundenplan.response(202, "Accepted: Stundenplan Generation has been started.")
     @ns_stundenplan.response(400, "Bad Request: Missing input data.")
-    @ns_stundenplan.response(409, "Conflict: The algorithm is currently running.")
+    @ns_stundenplan.response(404, "Not Found: The job, checkpoint or previous solution does not exist.")
+    @ns_stundenplan.response(409, "Conflict: The job or the checkpoint to resume has already been started.")
     def put(self):
-        """Initiates the genetic algorithm to generate solutions for Stundenplan data."""
-        global is_running
+        """Queues a job of the genetic algorithm to generate solutions for Stundenplan data.
+
+        The job runs with a snapshot of the current config as soon as a job worker is free, see
+        `application.job_workers`. Without `job_id` the job of the latest POST is run, or a new job for
+        the current input if that one has already been started. With `resume` the interrupted run of the
+        given checkpoint is continued instead. With `warm_start` the run starts from a previous timetable
+        mapped onto the current input, for small input changes."""
         client_ip = request.remote_addr
         logger_srv.info(f"Attempting to start algorithm from user {client_ip}")
 
-        data = reader_json.parse(config.get_path_input())
-        if data is None:
-            api.abort(400, "No Stundenplan-Data exists")
+        job_id = request.args.get("job_id")
+        if job_id is not None:
+            job = job_queue.get(job_id)
+            if job is None:
+                api.abort(404, f"No job {job_id} exists")
+        else:
+            job = job_queue.latest_posted()
+            if job is None:
+                data = reader_json.parse(config.get_path_input())
+                if data is None:
+                    api.abort(400, "No Stundenplan-Data exists")
+                job = job_queue.create(data, config.get_config()["application"]["filepath_input"])
+
+        resume = request.args.get("resume")
+        if resume is not None and not checkpoint.exists(resume):
+            api.abort(404, f"No checkpoint {resume} exists")
+        if resume is not None and resume in job_queue.active_checkpoints():
+            api.abort(409, f"Checkpoint {resume} belongs to a queued or running job")
+
+        warm_start = request.args.get("warm_start")
+        if warm_start is not None and path_utils.find_solution_path(warm_start) is None:
+            api.abort(404, f"No solution {warm_start} exists")
+        pin_unchanged = request.args.get("pin_unchanged", "false").lower() == "true"
 
-        if is_running:
-            api.abort(409, "An algorithm run is already in progress")
+        try:
+            job_queue.submit(job, resume=resume, warm_start=warm_start, pin_unchanged=pin_unchanged)
+        except ValueError as e:
+            api.abort(409, str(e))
+
+        return {"status": "Algorithm started", "job_id": job.id}, 202
+
+
+@ns_stundenplan.route('/<string:job_id>')
+class StundenplanJobResource(Resource):
+
+    @ns_stundenplan.doc('get_stundenplan_job')
+    @ns_stundenplan.response(200, 'OK: Returning the result of the job')
+    @ns_stundenplan.response(202, 'Accepted: The job has not finished yet, returning its progress')
+    @ns_stundenplan.response(404, 'Not Found: No such job exists')
+    @ns_stundenplan.response(500, 'Internal Server Error: The job failed or its result can\'t be parsed')
+    def get(self, job_id):
+        """Fetches the status, progress and result of one job."""
+        job = job_queue.get(job_id)
+        if job is None:
+            api.abort(404, f"No job {job_id} exists")
+
+        response = {
+            "status": job.status,
+            "timestamp": datetime.now().isoformat(),
+            "job": job.to_dict(),
+            "data": None
+        }
+        if job.is_active or job.status == CREATED:
+            return response, 202
+        if job.result_path is None:
+            response["message"] = f"Job {job_id} has no result: {job.error}"
+            return response, 500
+
+        response["data"] = reader_compact.parse_solution(job.result_path)
+        if response["data"] is None:
+            logger_app.error(f"Result of job {job_id} can't be parsed")
+            response["message"] = f"The result of job {job_id} can't be read"
+            return response, 500
+        return response, 200
+
+
+@ns_stundenplan.route('/<string:job_id>/timetable')
+class StundenplanJobTimetableResource(Resource):
+
+    @ns_stundenplan.doc('get_stundenplan_job_timetable')
+    @ns_stundenplan.response(200, 'OK: Streaming the timetable of the best solution as a JSON array')
+    @ns_stundenplan.response(404, 'Not Found: No such job exists or it has no result yet')
+    @ns_stundenplan.response(500, 'Internal Server Error: The result of the job can\'t be read')
+    def get(self, job_id):
+        """Streams the timetable of a finished job entry by entry.
+
+        Same entries as the `timetable` of the job's result, but written to the response while they are
+        built, so large timetables don't have to be held in memory as a whole."""
+        job = job_queue.get(job_id)
+        if job is None:
+            api.abort(404, f"No job {job_id} exists")
+        if job.result_path is None:
+            api.abort(404, f"Job {job_id} has no result")
+
+        entries = reader_compact.iter_timetable(job.result_path)
+        if entries is None:
+            logger_app.error(f"Result of job {job_id} can't be parsed")
+            api.abort(500, f"The result of job {job_id} can't be read")
+        return Response(printer_json.iter_json_array(entries), mimetype="application/json")
+
+
+@ns_stundenplan.route('/<string:job_id>/progress')
+class StundenplanJobProgressResource(Resource):
+
+    @ns_stundenplan.doc('get_stundenplan_job_progress', params={
+        'since': 'Id of the last progress event received, the Last-Event-ID header takes precedence'
+    })
+    @ns_stundenplan.response(200, 'OK: Streaming the progress as text/event-stream')
+    @ns_stundenplan.response(404, 'Not Found: No such job exists')
+    def get(self, job_id):
+        """Streams the progress of a job as Server-Sent Events.
+
+        Every generation sends a `progress` event with the generation, the best fitness, its core, hard
+        and soft fitness, the generations per second and the estimated remaining seconds (`eta`). A
+        `done` event with the job's final status ends the stream."""
+        job = job_queue.get(job_id)
+        if job is None:
+            api.abort(404, f"No job {job_id} exists")
 
         try:
-            with algorithm_lock:
-                is_running = True
-                threading.Thread(
-                    target=run_genetic_algorithm_thread,
-                    daemon=True
-                ).start()
-            return {"status": "Algorithm started"}, 202
-        except Exception as e:
-            api.abort(500, str(e))
+            last_id = int(request.headers.get("Last-Event-ID", request.args.get("since", 0)))
+        except ValueError:
+            last_id = 0
+
+        events = progress.stream(job.events, last_id, lambda: {"status": job.status, "error": job.error})
+        return Response(events, mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @ns_status.route('/')
 class StatusResource(Resource):
     @ns_status.doc('get_status')
     def get(self):
-        """Checks the current status of the server and algorithm execution."""
-        return {"is_running": is_running}, 200
+        """Checks the current status of the server and algorithm execution.
+
+        `is_running` is set while any job is queued or running. `checkpoints` lists the checkpoints of
+        interrupted runs, those of queued or running jobs are left out."""
+        jobs = job_queue.summaries()
+        running = [job for job in jobs if job["status"] == "running"]
+        active_checkpoints = job_queue.active_checkpoints()
+        return {
+            "is_running": job_queue.is_busy(),
+            "islands": running[-1]["progress"].get("islands", []) if running else [],
+            "jobs": jobs,
+            "checkpoints": [checkpoint_id for checkpoint_id in checkpoint.list_checkpoints()
+                            if checkpoint_id not in active_checkpoints]
+        }, 200
 
 
 # Serve the index.html
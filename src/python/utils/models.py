@@ -75,7 +75,7 @@ def __register_output_models(api):
 
     # Core Constraints Model
     core_constraints_model = api.model('WrappedCoreConstraints', {
-        'fitness': fields.Integer(required=True, description='Fitness score for core constraints'),
+        'fitness': fields.Float(required=True, description='Fitness score for core constraints'),
         'unsatisfied': fields.Nested(core_constraint_model),
         'satisfied': fields.Nested(core_constraint_model),
     })
@@ -84,26 +84,39 @@ def __register_output_models(api):
     constraints_model = api.model('Constraints', {
         'core': fields.Nested(core_constraints_model),
         'hard': fields.Nested(api.model('HardConstraints', {
-            'fitness': fields.Integer(required=True, description='Fitness score for hard constraints'),
+            'fitness': fields.Float(required=True, description='Fitness score for hard constraints'),
             'unsatisfied': constraints,
             'satisfied': constraints
         })),
         'soft': fields.Nested(api.model('SoftConstraints', {
-            'fitness': fields.Integer(required=True, description='Fitness score for soft constraints'),
+            'fitness': fields.Float(required=True, description='Fitness score for soft constraints'),
             'unsatisfied': constraints,
             'satisfied': constraints
         })),
     })
 
+    metadata_model = api.model('Metadata', {
+        'fitness': fields.Float(required=True, description='Overall fitness score for the timetable'),
+        'runtime': fields.String(required=True, description='Runtime of the algorithm in seconds'),
+        'objectives': fields.Raw(description='Objective values of a multi-objective candidate'),
+    })
+
+    # Candidate of a multi-objective run
+    candidate_model = api.model('Candidate', {
+        'timetable': fields.List(fields.Nested(event_model), required=True, description='List of scheduled events'),
+        'metadata': fields.Nested(metadata_model),
+        'constraints': fields.Nested(constraints_model, required=True,
+                                     description='Constraints data for the timetable'),
+    })
+
     # Timetable Model
     stundenplan_output = api.model('Stundenplan', {
         'timetable': fields.List(fields.Nested(event_model), required=True, description='List of scheduled events'),
-        'metadata': fields.Nested(api.model('Metadata', {
-            'fitness': fields.Integer(required=True, description='Overall fitness score for the timetable'),
-            'runtime': fields.String(required=True, description='Runtime of the algorithm in seconds'),
-        })),
+        'metadata': fields.Nested(metadata_model),
         'constraints': fields.Nested(constraints_model, required=True,
                                      description='Constraints data for the timetable'),
+        'candidates': fields.List(fields.Nested(candidate_model),
+                                  description='Pareto front of a multi-objective run (multi-objective mode only)'),
     })
 
     full_stundenplan_output = api.model('Stundenplan_Output', {
@@ -117,16 +130,60 @@ def __register_output_models(api):
 def register_models(api):
     config_model = api.model('Config', {
         'algorithm': fields.Nested(api.model('ConfigAlgorithm', {
-            'generations_max': fields.Integer(required=True, description='Number of generations for the algorithm')
+            'generations_max': fields.Integer(required=True, description='Number of generations for the algorithm'),
+            'fitness_cache_mb': fields.Integer(description='Memory cap of the fitness cache in MB, 0 disables it'),
+            'log_interval': fields.Integer(description='Generations between detailed constraint logs'),
+            'fitness_workers': fields.Integer(description='Worker processes for the fitness evaluation, 0 disables them'),
+            'seeded_population_fraction': fields.Float(description='Fraction of the initial population built greedily instead of at random'),
+            'local_search_interval': fields.Integer(description='Generations between two local searches on the best solutions, 0 disables it'),
+            'local_search_top_k': fields.Integer(description='Number of best solutions improved by the local search'),
+            'local_search_moves': fields.Integer(description='Moves scored per solution and local search'),
+            'fitness_weight_core': fields.Float(description='Weight of the core constraint violations in the fitness'),
+            'fitness_weight_hard': fields.Float(description='Weight of the hard constraints in the fitness'),
+            'fitness_weight_soft': fields.Float(description='Weight of the soft constraints in the fitness'),
+            'fitness_lexicographic': fields.Boolean(description='Rank core before hard before soft constraints, ignoring the tier weights'),
+            'stagnation_generations': fields.Integer(description='Stop once core and hard constraints hold and soft fitness stagnated for this many generations, 0 disables it'),
+            'multi_objective': fields.Boolean(description='Optimise core, hard and soft constraints as separate objectives and return a Pareto front'),
+            'multi_objective_fairness': fields.Boolean(description='Add the fitness of the most disadvantaged employee as objective of multi-objective runs'),
+            'pareto_front_size': fields.Integer(description='Number of candidate timetables returned by multi-objective runs'),
+            'checkpoint_interval': fields.Integer(description='Generations between two checkpoints of a run, 0 disables them'),
+            'islands': fields.Integer(description='Number of island populations run in parallel, 0 disables them'),
+            'island_migration_interval': fields.Integer(description='Generations between two island migrations'),
+            'island_migration_size': fields.Integer(description='Solutions sent to the next island per migration')
         })),
         'application': fields.Nested(api.model('ConfigApp', {
             'filepath_input': fields.String(required=True, description='Configuration file name'),
-            'server_allowed_ips': fields.List(fields.String(required=True, description='IP Pattern'))
+            'server_allowed_ips': fields.List(fields.String(required=True, description='IP Pattern')),
+            'job_workers': fields.Integer(description='Number of jobs run at the same time, each in its own process'),
+            'result_format': fields.String(description='Format solutions are saved in, "json" or "compact" (.npz)')
         }))
     })
 
+    island_model = api.model('IslandStatus', {
+        'island': fields.Integer(description='Island index'),
+        'generation': fields.Integer(description='Latest reported generation'),
+        'fitness': fields.Float(description='Best fitness of the island'),
+        'core': fields.Integer(description='Core fitness of the best solution of the island'),
+        'hard': fields.Integer(description='Hard fitness of the best solution of the island'),
+        'soft': fields.Integer(description='Soft fitness of the best solution of the island'),
+    })
+
+    job_model = api.model('Job', {
+        'id': fields.String(description='Job id'),
+        'status': fields.String(description='created, queued, running, completed or failed'),
+        'input': fields.String(description='File name of the job\'s input'),
+        'progress': fields.Raw(description='Latest progress event of the job, see /api/stundenplan/<job_id>/progress'),
+        'error': fields.String(description='Error of a failed job'),
+        'created': fields.String(description='Timestamp ISO8601'),
+        'started': fields.String(description='Timestamp ISO8601'),
+        'finished': fields.String(description='Timestamp ISO8601'),
+    })
+
     status_model = api.model('Status', {
-        'is_running': fields.Boolean(description='Algorithm running status')
+        'is_running': fields.Boolean(description='Whether any job is queued or running'),
+        'jobs': fields.List(fields.Nested(job_model), description='Known jobs, oldest first'),
+        'islands': fields.List(fields.Nested(island_model), description='Progress per island (island model only)'),
+        'checkpoints': fields.List(fields.String, description='Ids of the checkpoints of interrupted runs, newest first')
     })
 
     stundenplan_input = __register_input_models(api)
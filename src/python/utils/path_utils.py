@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 
 
 def find_absolute_directory_path_upwards(
@@ -41,6 +42,39 @@ RESOURCE_CONFIG_PATH: str = os.path.join(RESOURCES_PATH, "config")
 
 RESOURCE_OUTPUT_PATH: str = os.path.join(RESOURCES_PATH, "output")
 
+RESOURCE_CHECKPOINT_PATH: str = os.path.join(RESOURCES_PATH, "checkpoints")
+
+LATEST_SOLUTION_POINTER_PATH: str = os.path.join(RESOURCE_OUTPUT_PATH, "latest_solution")
+"""File holding the file name of the newest parsed solution, written whenever a solution is saved."""
+
+def find_solution_path(name: str) -> Optional[str]:
+    """Returns the path of a parsed solution in the output folder, "latest" selects the newest one.
+
+    Args:
+        name: File name of a `parsed_solution_*.json` or `parsed_solution_*.npz` file or "latest".
+
+    Returns:
+        The path of the solution, `None` if no such solution exists.
+    """
+    if not os.path.isdir(RESOURCE_OUTPUT_PATH):
+        return None
+
+    if name == "latest" and os.path.isfile(LATEST_SOLUTION_POINTER_PATH):
+        with open(LATEST_SOLUTION_POINTER_PATH, "r", encoding="utf-8") as pointer_file:
+            filepath = os.path.join(RESOURCE_OUTPUT_PATH, pointer_file.read().strip())
+        if os.path.isfile(filepath):
+            return filepath
+
+    files = [f for f in os.listdir(RESOURCE_OUTPUT_PATH)
+             if f.startswith("parsed_solution_") and f.endswith((".json", ".npz"))]
+    if name == "latest":
+        if not files:
+            return None
+        return os.path.join(RESOURCE_OUTPUT_PATH, max(files, key=lambda f: os.path.getctime(os.path.join(RESOURCE_OUTPUT_PATH, f))))
+
+    return os.path.join(RESOURCE_OUTPUT_PATH, name) if name in files else None
+
+
 PATH_SERVER_STATIC: str = os.path.join(SRC_PATH, "static")
 
 PATH_DOCS: str = os.path.join(SRC_PATH, "docs")
\ No newline at end of file
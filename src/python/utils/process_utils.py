@@ -0,0 +1,8 @@
+import multiprocessing
+
+PROCESS_CONTEXT = multiprocessing.get_context("spawn")
+"""Start method of all processes of the application: jobs, islands and evaluation workers.
+
+A spawned process is a new interpreter that inherits none of the threads, locks or state of its parent. Jobs
+run log and queue feeder threads and the checkpoint writer, a forked child could inherit their locks held.
+"""
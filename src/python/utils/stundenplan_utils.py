@@ -1,9 +1,11 @@
 import json
-from typing import List, Any, Dict
+from collections import defaultdict
+from typing import List, Any, Callable, Dict, Iterable, Iterator, Tuple
 
 import numpy as np
 
-from src.python.ga import evaluator
+from src.python.ga import evaluator, evaluator_expression
+from src.python.io import reader_json
 
 def optimize_input(data):
     rooms = data["rooms"]
@@ -19,156 +21,246 @@ def optimize_input(data):
 
     return data
 
-def verify_input(data):
-    messages = []
+def _verify_timeslot(timeslot, messages):
+    if "day" not in timeslot or "timeslot" not in timeslot:
+        messages.append("timeslot has invalid data")
 
-    # TODO if data ist kein json object -> error
-    # TODO type checks für keys
 
-    if "timeslots" not in data:
-        messages.append("timeslots are missing")
+def _verify_room(room, messages):
+    if "name" not in room:
+        messages.append("a room has no name")
     else:
-        for timeslot in data["timeslots"]:
-            if "day" not in timeslot or "timeslot" not in timeslot:
-                messages.append("timeslot has invalid data")
+        if "capacity" not in room:
+            messages.append(f"room {room['name']} has no capacity key")
+        if "room_type" not in room:
+            messages.append(f"room {room['name']} has no room_type key")
+
 
-    if "rooms" not in data:
-        messages.append("rooms is missing")
+def _verify_event(event, messages):
+    if "name" not in event:
+        messages.append("an event has no name")
     else:
-        for room in data["rooms"]:
-            if "name" not in room:
-                messages.append("a room has no name")
+        if "employees" not in event:
+            messages.append(f"event {event['name']} has no employees key")
+        if "participants" not in event:
+            messages.append(f"event {event['name']} has no participants key")
+        if "size" not in event:
+            messages.append(f"event {event['name']} has no size key")
+        if "weekly_blocks" not in event:
+            messages.append(f"event {event['name']} has no weekly_blocks key")
+        if "room_type" not in event:
+            messages.append(f"event {event['name']} has no room_type")
+
+
+def _verify_constraint(constraint, messages):
+    if "id" not in constraint:
+        messages.append("a constraint has no id")
+    else:
+        id = constraint["id"]
+        if "owner" not in constraint:
+            messages.append(f"constraint {id} has no owner")
+        if "fields" not in constraint:
+            messages.append(f"constraint {id} has no fields")
+
+        if "inverted" not in constraint:
+            messages.append(f"constraint {id} has no key inverted")
+
+        if "weight" in constraint and (not isinstance(constraint["weight"], (int, float))
+                                       or isinstance(constraint["weight"], bool)
+                                       or constraint["weight"] < 0):
+            messages.append(f"constraint {id} has an invalid weight, expected a number >= 0")
+
+        fields = constraint.get("fields", {})
+        if "type" not in constraint:
+            messages.append(f"constraint {id} has no type")
+        elif constraint["type"].lower() == "EmployeeFreeTimeslots".lower():
+            if "timeslots" not in fields:
+                messages.append(f"Timeslots not in EmployeeFreeTimeslots - id: {id}")
+        elif constraint["type"].lower() == "EmployeeSubsequentTimeslots".lower():
+            if "limit" not in fields:
+                messages.append(f"Limit not in EmployeeSubsequentTimeslots - id: {id}")
+        elif constraint["type"].lower() == "EventDistributeWeeklyBlocks".lower():
+            if "event" not in fields:
+                messages.append(f"Event not in EventDistributeWeeklyBlocks - id: {id}")
+        elif constraint["type"].lower() == "Expression".lower():
+            if "expression" not in fields:
+                messages.append(f"Expression not in Constraint Fields - id: {id}")
             else:
-                if "capacity" not in room:
-                    messages.append(f"room {room['name']} has no capacity key")
-                if "room_type" not in room:
-                    messages.append(f"room {room['name']} has no room_type key")
+                try:
+                    evaluator_expression.compile_source(fields["expression"])
+                except (SyntaxError, ValueError, TypeError) as e:
+                    messages.append(f"Expression could not be compiled - id: {id}: {e}")
+        else:
+            messages.append(f"constraint {id} has unknown type {constraint['type']}")
 
-    if "events" not in data:
-        messages.append("events is missing")
-    else:
-        for event in data["events"]:
-            if "name" not in event:
-                messages.append("an event has no name")
+
+class InputVerifier:
+    """Verifies input data element by element, so elements can be verified while the input is read.
+
+    `verify_each` checks the elements of a section (timeslots, rooms, events, hard or soft constraints) as
+    they pass through, `result` checks the presence of the sections and verifies the sections that have
+    not been passed through `verify_each`. The messages are those of `verify_input`, in the same order.
+    """
+
+    SECTIONS: Dict[str, Callable[[Any, List[str]], None]] = {
+        "timeslots": _verify_timeslot,
+        "rooms": _verify_room,
+        "events": _verify_event,
+        "hard": _verify_constraint,
+        "soft": _verify_constraint,
+    }
+
+    def __init__(self):
+        self.messages: Dict[str, List[str]] = {}
+
+    def verify_each(self, section: str, elements: Iterable[Any]) -> Iterator[Any]:
+        messages = self.messages.setdefault(section, [])
+        verify = self.SECTIONS[section]
+        for element in elements:
+            if isinstance(element, dict):
+                verify(element, messages)
             else:
-                if "employees" not in event:
-                    messages.append(f"event {event['name']} has no employees key")
-                if "participants" not in event:
-                    messages.append(f"event {event['name']} has no participants key")
-                if "size" not in event:
-                    messages.append(f"event {event['name']} has no size key")
-                if "weekly_blocks" not in event:
-                    messages.append(f"event {event['name']} has no weekly_blocks key")
-                if "room_type" not in event:
-                    messages.append(f"event {event['name']} has no room_type")
-
-    if "constraints" not in data:
-        messages.append("constraints are missing")
-    else:
-        hasBothConstraints = True
-        constraints = data["constraints"]
-        if "hard" not in constraints:
-            messages.append("hard constraints are missing")
-            hasBothConstraints = False
-        if "soft" not in constraints:
-            messages.append("soft constraints are missing")
-            hasBothConstraints = False
-
-        if hasBothConstraints:
-            for constraint in (constraints["hard"] + constraints["soft"]):
-                if "id" not in constraint:
-                    messages.append("a constraint has no id")
+                messages.append(f"{section} contains an element that is not an object")
+            yield element
+
+    def result(self, data) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            return {"messages": ["input is not a JSON object"], "success": False}
+
+        constraints = data.get("constraints", {})
+        sections = {"timeslots": data, "rooms": data, "events": data, "hard": constraints, "soft": constraints}
+        for section, parent in sections.items():
+            if section in self.messages or not isinstance(parent, dict) or section not in parent:
+                continue
+            if isinstance(parent[section], list):
+                for _ in self.verify_each(section, parent[section]):
+                    pass
+            else:
+                self.messages[section] = [f"{section} is not a list"]
+
+        messages = []
+        missing = {"timeslots": "timeslots are missing", "rooms": "rooms is missing", "events": "events is missing"}
+        for section, message in missing.items():
+            if section not in data:
+                messages.append(message)
+            else:
+                messages += self.messages[section]
+
+        if "constraints" not in data:
+            messages.append("constraints are missing")
+        elif not isinstance(constraints, dict):
+            messages.append("constraints is not an object")
+        else:
+            if "hard" not in constraints:
+                messages.append("hard constraints are missing")
+            if "soft" not in constraints:
+                messages.append("soft constraints are missing")
+            if "hard" in constraints and "soft" in constraints:
+                messages += self.messages["hard"] + self.messages["soft"]
+
+        return {
+            "messages": messages,
+            "success": len(messages) == 0
+        }
+
+
+def verify_input(data):
+    return InputVerifier().result(data)
+
+
+def read_input(file) -> Tuple[Any, Dict[str, Any]]:
+    """Reads and verifies input data from a binary file object, e.g. the body of a request, in one pass.
+
+    The sections of the input are read element by element and every element is verified right after it
+    has been read, so the raw input is never held in memory next to the parsed one.
+
+    Returns:
+        The input data and the result of `verify_input` for it.
+
+    Raises:
+        `ValueError`: If the file does not contain a single valid JSON document.
+    """
+    stream = reader_json.JsonStream(file)
+    verifier = InputVerifier()
+
+    if stream.peek() != "{":
+        data = stream.value()
+        stream.end()
+        return data, verifier.result(data)
+
+    data = {}
+    for key in stream.members():
+        if key in ("timeslots", "rooms", "events") and stream.peek() == "[":
+            data[key] = list(verifier.verify_each(key, stream.elements()))
+        elif key == "constraints" and stream.peek() == "{":
+            constraints = data[key] = {}
+            for kind in stream.members():
+                if kind in ("hard", "soft") and stream.peek() == "[":
+                    constraints[kind] = list(verifier.verify_each(kind, stream.elements()))
                 else:
-                    id = constraint["id"]
-                    if "owner" not in constraint:
-                        messages.append(f"constraint {id} has no owner")
-                    if "fields" not in constraint:
-                        messages.append(f"constraint {id} has no fields")
-
-                    if "inverted" not in constraint:
-                        messages.append(f"constraint {id} has no key inverted")
-
-                    if "type" not in constraint:
-                        messages.append(f"constraint {id} has no type")
-                    elif constraint["type"].lower() == "EmployeeFreeTimeslots".lower():
-                        if "timeslots" not in constraint["fields"]:
-                            messages.append(f"Timeslots not in EmployeeFreeTimeslots - id: {id}")
-                    elif constraint["type"].lower() == "EmployeeSubsequentTimeslots".lower():
-                        if "limit" not in constraint["fields"]:
-                            messages.append(f"Limit not in EmployeeSubsequentTimeslots - id: {id}")
-                    elif constraint["type"].lower() == "EventDistributeWeeklyBlocks".lower():
-                        if "event" not in constraint["fields"]:
-                            messages.append(f"Event not in EventDistributeWeeklyBlocks - id: {id}")
-                    elif constraint["type"].lower() == "Expression".lower():
-                        if "expression" not in constraint["fields"]:
-                            messages.append(f"Expression not in Constraint Fields - id: {id}")
-                    else:
-                        messages.append(f"constraint {id} has unknown type {constraint['type']}")
-
-
-    return {
-        "messages": messages,
-        "success": len(messages) == 0
-    }
+                    constraints[kind] = stream.value()
+        else:
+            data[key] = stream.value()
+    stream.end()
 
+    return data, verifier.result(data)
 
-def parse_solution_into_timetable(pygad_solution,date_x_room,lessons) -> List[Dict[str, Any]]:
-    """Parses a PyGad solution for printing and transforms it into a human-readable list format.
+
+def iter_solution_into_timetable(pygad_solution, date_x_room, lessons) -> Iterator[Dict[str, Any]]:
+    """Parses a PyGad solution into the entries of `parse_solution_into_timetable` one at a time.
+
+    Events in the same timeslot as an entry whose name starts with the event's name get the suffix " (n)",
+    n being the number of such entries. The names of the entries are indexed by day and timeslot, so only
+    the entries of the same timeslot (at most one per room) are compared instead of all previous entries.
 
     Args:
         pygad_solution: PyGad solution to parse.
         date_x_room: List of date and room pairs.
         lessons: List of lesson dictionaries.
 
-    Returns:
-        A list of dictionaries, each representing a scheduled event.
+    Yields:
+        A dictionary for every lesson, representing a scheduled event.
     """
-    timetable = []
+    names_by_timeslot: Dict[Tuple[Any, Any], Dict[str, int]] = defaultdict(dict)
 
     for i, date_x_room_id in enumerate(pygad_solution):
         schedule = date_x_room[date_x_room_id]
         date = schedule["date"]
-        room = schedule["room"]
         event = lessons[i]  # type: ignore
 
         day = date['day']
         timeslot = date['timeslot']
         event_name = event["name"]
-        room_name = room["name"]
-        participants = event["participants"]
-
-        # Check for duplicate events in the same timeslot and room
-        existing_event = next(
-            (item for item in timetable if item["day"] == day and
-             item["timeslot"] == timeslot and
-             item["event"].startswith(event_name)),
-            None
-        )
-
-        if existing_event:
+
+        # Check for duplicate events in the same timeslot
+        names = names_by_timeslot[(day, timeslot)]
+        count = sum(n for name, n in names.items() if name.startswith(event_name))
+        if count:
             # If the event already exists in the same timeslot, append a suffix
-            count = sum(1 for item in timetable if item["day"] == day and
-                        item["timeslot"] == timeslot and
-                        item["event"].startswith(event_name))
-            event_entry = {
-                "day": day,
-                "timeslot": timeslot,
-                "event": f"{event_name} ({count})",
-                "room": room_name,
-                "participants": participants
-            }
-        else:
-            event_entry = {
-                "day": day,
-                "timeslot": timeslot,
-                "event": event_name,
-                "room": room_name,
-                "participants": participants
-            }
+            event_name = f"{event_name} ({count})"
+        names[event_name] = names.get(event_name, 0) + 1
+
+        yield {
+            "day": day,
+            "timeslot": timeslot,
+            "event": event_name,
+            "room": schedule["room"]["name"],
+            "participants": event["participants"]
+        }
+
+
+def parse_solution_into_timetable(pygad_solution,date_x_room,lessons) -> List[Dict[str, Any]]:
+    """Parses a PyGad solution for printing and transforms it into a human-readable list format.
 
-        timetable.append(event_entry)
+    Args:
+        pygad_solution: PyGad solution to parse.
+        date_x_room: List of date and room pairs.
+        lessons: List of lesson dictionaries.
 
-    return timetable
+    Returns:
+        A list of dictionaries, each representing a scheduled event.
+    """
+    return list(iter_solution_into_timetable(pygad_solution, date_x_room, lessons))
 
 
 def parse_solution_for_print(best_solution, fitness, runtime, date_x_room, lessons):
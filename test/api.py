@@ -41,6 +41,31 @@ def wait_for_completion():
         time.sleep(0.1)  # Wait for 0.5 seconds before checking again
 
 
+def request_api(method, path, **kwargs):
+    """Send a request to an endpoint below /api and return the response, whatever its status code."""
+    return requests.request(method, f"{BASE_URL}/{path}", **kwargs)
+
+
+def get_job(job_id):
+    """Retrieve the status, progress and result of one job from GET /api/stundenplan/<job_id>."""
+    response = requests.get(f"{BASE_URL}/stundenplan/{job_id}")
+    return response.json()
+
+
+def get_config():
+    """Retrieve the current configuration from GET /api/config."""
+    response = requests.get(f"{BASE_URL}/config")
+    response.raise_for_status()
+    return response.json()
+
+
+def post_config(config):
+    """Update parts of the configuration using POST /api/config."""
+    response = requests.post(f"{BASE_URL}/config", json=config)
+    response.raise_for_status()
+    return response.json()
+
+
 def get_result():
     """Retrieve the result from GET /api/stundenplan."""
     response = requests.get(f"{BASE_URL}/stundenplan")
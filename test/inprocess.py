@@ -0,0 +1,34 @@
+import os
+import sys
+
+import numpy as np
+
+from api import load_test_input
+
+# in-process tests call the application's modules directly instead of going through the API
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+# the logging config of the application writes into this folder, relative to the repository root the
+# tests are run from (`python test/test.py`)
+os.makedirs(os.path.join(ROOT_PATH, "src", "resources", "logs"), exist_ok=True)
+
+from src.python.api import database  # noqa: E402
+
+
+def inject_test_input(name):
+    """Injects a test input into the database and returns its lessons and date x room pairs."""
+    return inject_input(load_test_input(name))
+
+
+def inject_input(data):
+    """Injects input data into the database and returns its lessons and date x room pairs."""
+    database.inject(data)
+    return database.get_lessons(), database.get_date_x_room()
+
+
+def random_population(lessons, date_x_room, size=50, seed=0):
+    """Returns random solutions, genes may repeat so that every kind of conflict occurs."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, len(date_x_room), (size, len(lessons)), dtype=np.int64)
@@ -0,0 +1,147 @@
+from src.python.ga import evaluator_expression
+
+# Straightforward evaluation of single solutions, one lesson at a time, as the algorithm did before its
+# evaluation was vectorised. In-process tests compare the optimised evaluation against it.
+
+
+def evaluate_constraints_core(solution, lessons, date_x_room):
+    """Returns the violations of every core constraint of one solution."""
+    violations = {
+        "employee_conflicts": 0,
+        "student_conflicts": 0,
+        "room_capacity": 0,
+        "room_type": 0,
+    }
+    employee_planned_at_date = set()
+    date_x_students = set()
+
+    for event_idx, date_x_room_id in enumerate(solution):
+        event = lessons[event_idx]
+        schedule = date_x_room[date_x_room_id]
+        date = schedule["date"]
+        room = schedule["room"]
+
+        for employee_id in event["employees"]:
+            employee_x_date = (employee_id, tuple(date.items()))
+            if employee_x_date in employee_planned_at_date:
+                violations["employee_conflicts"] += 1
+            employee_planned_at_date.add(employee_x_date)
+
+        for participant in event["participants"]:
+            date_x_student = (participant, tuple(date.items()))
+            if date_x_student in date_x_students:
+                violations["student_conflicts"] += 1
+            date_x_students.add(date_x_student)
+
+        if room["capacity"] < event["size"]:
+            violations["room_capacity"] += 1
+
+        if room["room_type"] != event["room_type"]:
+            violations["room_type"] += 1
+
+    return violations
+
+
+def evaluate_constraint(constraint, solution, lessons, date_x_room):
+    """Returns the fitness of one hard or soft constraint for one solution, expressions are interpreted."""
+    constraint_type = constraint["type"].lower()
+
+    if constraint_type == "EmployeeFreeTimeslots".lower():
+        return evaluate_employee_free_timeslots(constraint, solution, lessons, date_x_room)
+    elif constraint_type == "EmployeeSubsequentTimeslots".lower():
+        return evaluate_employee_subsequent_timeslots(constraint, solution, lessons, date_x_room)
+    elif constraint_type == "EventDistributeWeeklyBlocks".lower():
+        return evaluate_event_distribute_weekly_blocks(constraint, solution, lessons, date_x_room)
+    elif constraint_type == "Expression".lower():
+        return evaluator_expression.evaluate_expression(constraint["fields"]["expression"], solution, lessons,
+                                                        date_x_room)
+
+    return 0
+
+
+def evaluate_employee_free_timeslots(constraint, solution, lessons, date_x_room):
+    employee = constraint["owner"]
+    inverted = constraint["inverted"]
+    forbidden_slots = {(slot["day"], slot["timeslot"]) for slot in constraint["fields"]["timeslots"]}
+
+    for event_idx, date_x_room_id in enumerate(solution):
+        event = lessons[event_idx]
+        date = date_x_room[date_x_room_id]["date"]
+
+        if employee in event["employees"]:
+            # if inverted, the employee may only have events in the given timeslots
+            if ((date["day"], date["timeslot"]) in forbidden_slots) != inverted:
+                return -1
+
+    return 0
+
+
+def evaluate_employee_subsequent_timeslots(constraint, solution, lessons, date_x_room):
+    employee = constraint["owner"]
+    limit = constraint["fields"]["limit"]
+    employee_schedule = {}
+
+    for event_idx, date_x_room_id in enumerate(solution):
+        event = lessons[event_idx]
+        date = date_x_room[date_x_room_id]["date"]
+
+        if employee in event["employees"]:
+            employee_schedule.setdefault(date["day"], []).append(date["timeslot"])
+
+    violations = 0
+    for timeslots in employee_schedule.values():
+        sorted_slots = sorted(timeslots)
+        consecutive_count = 1
+        for i in range(1, len(sorted_slots)):
+            if sorted_slots[i] == sorted_slots[i - 1] + 1:
+                consecutive_count += 1
+                if consecutive_count > limit:
+                    violations += 1
+            else:
+                consecutive_count = 1
+
+    return -violations
+
+
+def evaluate_event_distribute_weekly_blocks(constraint, solution, lessons, date_x_room):
+    event_name = constraint["fields"]["event"]
+    inverted = constraint["inverted"]
+    event_days = set()
+
+    for event_idx, date_x_room_id in enumerate(solution):
+        if lessons[event_idx]["name"] == event_name:
+            day = date_x_room[date_x_room_id]["date"]["day"]
+            if day in event_days and not inverted:
+                # if not inverted, blocks of the event must be on different days
+                return -1
+            event_days.add(day)
+
+    if inverted:
+        # if inverted, all blocks of the event must be on the same day
+        return 0 if len(event_days) <= 1 else -1
+    return 0
+
+
+def parse_solution_into_timetable(solution, date_x_room, lessons):
+    """Returns the timetable of one solution, duplicate events of a timeslot are searched in the whole timetable."""
+    timetable = []
+
+    for event_idx, date_x_room_id in enumerate(solution):
+        schedule = date_x_room[date_x_room_id]
+        date = schedule["date"]
+        event_name = lessons[event_idx]["name"]
+
+        # events of the same timeslot starting with the same name get a suffix
+        count = sum(1 for item in timetable if item["day"] == date["day"] and
+                    item["timeslot"] == date["timeslot"] and
+                    item["event"].startswith(event_name))
+
+        timetable.append({
+            "day": date["day"],
+            "timeslot": date["timeslot"],
+            "event": f"{event_name} ({count})" if count else event_name,
+            "room": schedule["room"]["name"],
+            "participants": lessons[event_idx]["participants"]
+        })
+
+    return timetable
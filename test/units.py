@@ -1,6 +1,31 @@
+import io
+import json
+import logging
+import os
+import re
 import sys
+import tempfile
+from types import SimpleNamespace
 
-from api import load_test_input, post_input_data, run_algorithm, wait_for_completion, get_result, call_api
+import numpy as np
+
+from api import (load_test_input, post_input_data, run_algorithm, wait_for_completion, get_result, call_api, get_job,
+                 get_config, post_config, request_api)
+from inprocess import inject_input, inject_test_input, random_population
+import reference
+
+from src.python.app import jobs
+from src.python.ga import evaluator, evaluator_expression, evaluator_expression_lowering, problem
+from src.python.ga import genetic_algorithm as ga
+from src.python.ga.evaluator_incremental import IncrementalEvaluator
+from src.python.ga.evaluator_parallel import ParallelEvaluator
+from src.python.ga.gene_space import GeneSpace
+from src.python.ga.local_search import LocalSearch
+from src.python.ga.pareto import ParetoArchive, non_dominated
+from src.python.ga.fitness_cache import FitnessCache
+from src.python.ga.population_seeding import GreedySeeder, initial_population
+from src.python.io import printer_compact, printer_json, reader_compact, reader_json
+from src.python.utils import path_utils, stundenplan_utils
 
 
 def test_constraint_employeesubsequenttimeslots():
@@ -167,3 +192,834 @@ def test_constraint_expression_4():
     except Exception as e:
         print(f"Test failed with error: {e}")
         return False, result
+
+
+def test_invalid_constraint_expression_syntax():
+    """An expression that can't be compiled is rejected when the input is posted."""
+    input_data = load_test_input(sys._getframe().f_code.co_name)
+    result = post_input_data(input_data)
+    try:
+        if not result["success"] and any("could not be compiled" in message for message in result["messages"]):
+            return True, result
+
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        return False, result
+
+    return False, result
+
+
+def test_evaluate_core_constraints():
+    """Test that the vectorised core constraints count the same violations as the reference evaluation."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room)
+
+    breakdown = evaluator.evaluate_breakdown(population, lessons, date_x_room)
+    for solution, row in zip(population, breakdown):
+        expected = list(reference.evaluate_constraints_core(solution, lessons, date_x_room).values())
+        actual = row[compiled.core_columns].tolist()
+        if actual != expected:
+            return False, {"solution": solution.tolist(), "expected": expected, "actual": actual}
+
+    return True, {"solutions": len(population)}
+
+
+def test_fitness_function_batch():
+    """Test that evaluating a population in one batch gives the fitness of evaluating every solution alone."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    instance = SimpleNamespace(variables=(lessons, date_x_room))
+    population = random_population(lessons, date_x_room)
+
+    batch = evaluator.fitness_function_batch(instance, population, list(range(len(population)))).tolist()
+    single = [evaluator.fitness_function(instance, solution, idx) for idx, solution in enumerate(population)]
+
+    # random solutions violate constraints, so differences would show
+    return batch == single and min(batch) < 0, {"batch": batch, "single": single}
+
+
+def test_compiled_constraints():
+    """Test that the compiled hard and soft constraints evaluate like the reference evaluation."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room)
+    constraints = [constraint for constraint, _ in compiled.constraints_hard + compiled.constraints_soft]
+
+    breakdown = evaluator.evaluate_breakdown(population, lessons, date_x_room)
+    for solution, row in zip(population, breakdown):
+        expected = [reference.evaluate_constraint(constraint, solution, lessons, date_x_room)
+                    for constraint in constraints]
+        actual = row[compiled.hard_columns.start:compiled.soft_columns.stop].tolist()
+        if actual != expected:
+            return False, {"solution": solution.tolist(), "expected": expected, "actual": actual}
+
+    return True, {"solutions": len(population), "constraints": len(constraints)}
+
+
+def test_incremental_evaluator():
+    """Test that scoring and applying moves incrementally agrees with evaluating the solution in full."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    instance = SimpleNamespace(variables=(lessons, date_x_room))
+    rng = np.random.default_rng(0)
+
+    state = IncrementalEvaluator(compiled, random_population(lessons, date_x_room, size=1)[0])
+    for step in range(300):
+        changes = {int(lesson): int(rng.integers(len(date_x_room)))
+                   for lesson in rng.integers(len(lessons), size=rng.integers(1, 4))}
+        moved = state.solution.copy()
+        moved[list(changes)] = list(changes.values())
+
+        fitness = state.fitness
+        if step % 2 == 0:
+            delta = state.delta(changes)
+            expected = evaluator.fitness_function(instance, moved, 0)
+            if delta != expected - fitness or state.fitness != fitness:
+                return False, {"step": step, "changes": changes, "delta": delta, "expected": expected - fitness}
+        else:
+            state.apply(changes)
+
+        core, hard, soft = evaluator.evaluate_population(state.solution[np.newaxis, :], lessons, date_x_room)
+        expected = [core[0].item(), hard[0].item(), soft[0].item()]
+        actual = [state.core_fitness, state.hard_fitness, state.soft_fitness]
+        if actual != expected:
+            return False, {"step": step, "solution": state.solution.tolist(), "expected": expected, "actual": actual}
+
+    return True, {"steps": 300, "fitness": state.fitness}
+
+
+def test_fitness_cache():
+    """Test that breakdowns taken from the fitness cache equal those evaluated without it."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room)
+    # repeated solutions within one population are looked up as well
+    population[1::2] = population[0::2]
+
+    expected = evaluator.evaluate_breakdown(population, lessons, date_x_room)
+    # small enough that the second population evicts part of the first one
+    compiled.fitness_cache = FitnessCache(4 * 1024, compiled.num_columns)
+    try:
+        first = evaluator.evaluate_breakdown(population, lessons, date_x_room)
+        second = evaluator.evaluate_breakdown(population[::-1], lessons, date_x_room)[::-1]
+        cache = str(compiled.fitness_cache)
+        hits = compiled.fitness_cache.hits
+    finally:
+        compiled.fitness_cache = None
+
+    success = np.array_equal(first, expected) and np.array_equal(second, expected) and hits > 0
+    return success, {"cache": cache}
+
+
+def test_weighted_fitness():
+    """Test that the fitness weights each tier and each hard and soft constraint by its weight."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room)
+
+    compiled.set_fitness_weights(core=1.5, hard=2, soft=0.25)
+    try:
+        fitness = compiled.fitness(evaluator.evaluate_breakdown(population, lessons, date_x_room))
+    finally:
+        compiled.set_fitness_weights()
+
+    for solution, actual in zip(population, fitness.tolist()):
+        core = sum(reference.evaluate_constraints_core(solution, lessons, date_x_room).values())
+        hard, soft = (
+            sum(constraint.get("weight", 1) * reference.evaluate_constraint(constraint, solution, lessons, date_x_room)
+                for constraint, _ in constraints)
+            for constraints in (compiled.constraints_hard, compiled.constraints_soft)
+        )
+        expected = -1.5 * core + 2 * hard + 0.25 * soft
+        if not np.isclose(actual, expected):
+            return False, {"solution": solution.tolist(), "expected": expected, "actual": actual}
+
+    return True, {"solutions": len(population), "fitness": fitness.tolist()}
+
+
+def test_lexicographic_fitness():
+    """Test that in lexicographic mode a core violation weighs more than any hard and soft violations and a
+    hard violation more than any soft violations."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room, size=200)
+    breakdown = evaluator.evaluate_breakdown(population, lessons, date_x_room)
+
+    # a single constraint evaluates to at least -num_lessons
+    one_core = np.zeros(compiled.num_columns, dtype=np.int64)
+    one_core[compiled.core_columns.start] = 1
+    worst_hard = np.zeros(compiled.num_columns, dtype=np.int64)
+    worst_hard[compiled.hard_columns] = -compiled.num_lessons
+    worst_hard[compiled.soft_columns] = -compiled.num_lessons
+    one_hard = np.zeros(compiled.num_columns, dtype=np.int64)
+    one_hard[compiled.hard_columns.start] = -1
+    worst_soft = np.zeros(compiled.num_columns, dtype=np.int64)
+    worst_soft[compiled.soft_columns] = -compiled.num_lessons
+
+    compiled.set_fitness_weights(lexicographic=True)
+    try:
+        one_core, worst_hard, one_hard, worst_soft = compiled.fitness(
+            np.stack([one_core, worst_hard, one_hard, worst_soft])).tolist()
+        fitness = compiled.fitness(breakdown)
+    finally:
+        compiled.set_fitness_weights()
+
+    # sorting by fitness is sorting by core, then hard, then soft fitness, each with the constraint weights
+    objectives = [tuple(row) for row in compiled.objectives(breakdown).tolist()]
+    by_fitness = [objectives[i] for i in np.argsort(fitness, kind="stable")]
+
+    success = one_core < worst_hard and one_hard < worst_soft and by_fitness == sorted(objectives)
+    return success, {"one_core": one_core, "worst_hard": worst_hard, "one_hard": one_hard, "worst_soft": worst_soft}
+
+
+def test_stagnation_stop():
+    """Test that runs stop once a solution satisfying all core and hard constraints stops improving."""
+    data = load_test_input("equivalence")
+    data["constraints"]["hard"] = []
+    lessons, date_x_room = inject_input(data)
+    lesson_domains = GeneSpace(problem.get_problem(lessons, date_x_room), random_seed=0)
+
+    # seeded solutions of this input have no core conflicts, random ones have
+    infeasible = random_population(lessons, date_x_room, size=1)[0]
+    seeder = GreedySeeder(lesson_domains)
+    feasible = sorted((seeder.solution() for _ in range(20)),
+                      key=lambda solution: evaluator.fitness_function(
+                          SimpleNamespace(variables=(lessons, date_x_room)), solution, 0))
+    worse, better = feasible[0], feasible[-1]
+
+    stagnation = ga.StagnationStop(lessons, date_x_room, 3)
+    bests = [infeasible, worse, worse, better, better, better, infeasible, better, better, better, better]
+    stops = [stagnation.update(best, generation) for generation, best in enumerate(bests, start=1)]
+    disabled = ga.StagnationStop(lessons, date_x_room, 0)
+    never = [disabled.update(better, generation) for generation in range(1, 10)]
+
+    expected = [False] * 10 + [True]
+    return stops == expected and not any(never), {"stops": stops, "expected": expected}
+
+def test_pareto_archive():
+    """Test that the archive keeps the distinct non-dominated solutions, best sum of objectives first."""
+    objectives = np.array([[0, -2, -5], [0, -3, -1], [-1, -2, -6], [0, -2, -5], [0, -4, -1], [-1, 0, 0]])
+    population = np.arange(len(objectives))[:, np.newaxis] * np.ones((1, 3), dtype=np.int64)
+
+    front = non_dominated(objectives)
+    archive = ParetoArchive(max_size=2)
+    archive.update(population[:3], objectives[:3])
+    first = archive.solutions[:, 0].tolist()
+    archive.update(population[3:], objectives[3:])
+    second = archive.solutions[:, 0].tolist()
+
+    success = (
+        front.tolist() == [True, True, False, True, False, True]
+        and first == [1, 0]
+        # the duplicate of solution 0 and the dominated solution 4 are dropped, solution 0 has the worst sum
+        and second == [5, 1]
+        and [named for _, named in archive.front(1)] == [{"core": -1, "hard": 0, "soft": 0}]
+    )
+    return success, {"front": front.tolist(), "first": first, "second": second}
+
+
+def test_multi_objective_run():
+    """Test that a multi-objective run returns non-dominated candidates and leaves the problem in single
+    objective mode, also if it fails."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+
+    _, result, _, _ = ga.genetic_algorithm(generations=5, fitness_cache_mb=0, multi_objective=True,
+                                           checkpoint_interval=0)
+    after_run = compiled.multi_objective
+    try:
+        ga.genetic_algorithm(generations=5, multi_objective=True, fairness_objective=True, resume="unknown")
+        failed = False
+    except Exception:
+        failed = True
+    after_failure = compiled.multi_objective or compiled.fairness_objective
+
+    objectives = np.array([[candidate["metadata"]["objectives"][name] for name in ("core", "hard", "soft")]
+                           for candidate in result["candidates"]])
+    success = (
+        len(objectives) > 0
+        and bool(non_dominated(objectives).all())
+        and not after_run
+        and failed
+        and not after_failure
+    )
+    return success, {"objectives": objectives.tolist(), "failed": failed}
+
+def _in_domains(population, lesson_domains):
+    return all(gene in lesson_domains.domain(lesson_idx)
+               for solution in population for lesson_idx, gene in enumerate(solution.tolist()))
+
+
+def _has_duplicates(population):
+    return any(len(set(solution.tolist())) < len(solution) for solution in population)
+
+
+def test_gene_domains():
+    """Test that random, mutated and repaired genes stay inside the lessons' domains and that pinned lessons
+    never change."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    lesson_domains = GeneSpace(problem.get_problem(lessons, date_x_room), random_seed=0)
+
+    expected = []
+    for lesson in lessons:
+        same_type = [gene for gene, schedule in enumerate(date_x_room)
+                     if schedule["room"]["room_type"] == lesson["room_type"]]
+        fitting = [gene for gene in same_type if date_x_room[gene]["room"]["capacity"] >= lesson["size"]]
+        expected.append(fitting or same_type or list(range(len(date_x_room))))
+    if [lesson_domains.domain(lesson_idx).tolist() for lesson_idx in range(len(lessons))] != expected:
+        return False, {"expected": expected}
+
+    # every offspring mutated with a high probability, pygad's fitness is not needed for that
+    instance = SimpleNamespace(adaptive_mutation_population_fitness=lambda offspring: (0, np.zeros(len(offspring))))
+    mutation = lesson_domains.adaptive_mutation((0.5, 0.5))
+
+    results = {}
+    population = lesson_domains.random_population(100)
+    for pinned in (False, True):
+        if pinned:
+            pinned_lessons = np.array([0, 5, 7])
+            pinned_genes = population[0][pinned_lessons].copy()
+            lesson_domains.pin(population[0], pinned_lessons)
+            population = lesson_domains.random_population(100)
+
+        mutated = mutation(population.copy(), instance)
+        crossed = population.copy()
+        crossed[:, 1:] = population[::-1, 1:]
+        crossed[:, 2] = crossed[:, 1]
+        repaired = lesson_domains.repair(crossed)
+
+        for name, solutions in (("random", population), ("mutated", mutated), ("repaired", repaired)):
+            valid = _in_domains(solutions, lesson_domains) and not _has_duplicates(solutions)
+            if pinned:
+                valid = valid and (solutions[:, pinned_lessons] == pinned_genes).all()
+            results[f"{name}{' pinned' if pinned else ''}"] = valid
+        results[f"changed{' pinned' if pinned else ''}"] = bool((mutated != population).any())
+
+    return all(results.values()), results
+
+def test_population_seeding():
+    """Test that greedily seeded solutions have no more core conflicts than random ones and respect the
+    gene domains."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    lesson_domains = GeneSpace(compiled, random_seed=0)
+
+    population = initial_population(lesson_domains, 40, seeded_fraction=0.5)
+    core_conflicts = evaluator.evaluate_breakdown(population, lessons, date_x_room)[:, compiled.core_columns].sum(axis=1)
+    seeded, random = core_conflicts[:20], core_conflicts[20:]
+
+    success = (
+        seeded.max() <= random.min()
+        and _in_domains(population, lesson_domains)
+        and not _has_duplicates(population)
+    )
+    return success, {"seeded": seeded.tolist(), "random": random.tolist()}
+
+def test_local_search():
+    """Test that the local search never makes a solution worse, reports its fitness correctly and leaves
+    pinned lessons in place."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    instance = SimpleNamespace(variables=(lessons, date_x_room))
+    lesson_domains = GeneSpace(problem.get_problem(lessons, date_x_room), random_seed=0)
+    local_search = LocalSearch(lesson_domains, interval=1, top_k=1, max_moves=100)
+    pinned_lessons = np.array([2, 3, 11])
+
+    improvements = []
+    for pinned in (False, True):
+        solutions = lesson_domains.random_population(30)
+        if pinned:
+            pinned_genes = solutions[0][pinned_lessons].copy()
+            lesson_domains.pin(solutions[0], pinned_lessons)
+            solutions = lesson_domains.random_population(30)
+
+        for solution in solutions:
+            before = evaluator.fitness_function(instance, solution, 0)
+            improved, fitness = local_search.improve(solution)
+            after = evaluator.fitness_function(instance, improved, 0)
+            if fitness != after or after < before or (pinned and (improved[pinned_lessons] != pinned_genes).any()):
+                return False, {"solution": solution.tolist(), "improved": improved.tolist(), "before": before,
+                               "after": after, "fitness": fitness}
+            improvements.append(after - before)
+
+    return sum(improvements) > 0, {"improvements": improvements}
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_log_interval():
+    """Test that the best solution's violations are only logged on improvement or every log_interval
+    generations and its core, hard and soft fitness only evaluated on improvement."""
+    inject_test_input("equivalence")
+    records = _Records()
+    progress = []
+    evaluations = []
+    evaluate_population = evaluator.evaluate_population
+
+    def counting_evaluate_population(*args):
+        evaluations.append(args[0].copy())
+        return evaluate_population(*args)
+
+    logging.getLogger("algorithm").addHandler(records)
+    evaluator.evaluate_population = counting_evaluate_population
+    try:
+        ga.genetic_algorithm(generations=30, log_interval=10, fitness_cache_mb=0, checkpoint_interval=0,
+                             on_progress=progress.append)
+    finally:
+        evaluator.evaluate_population = evaluate_population
+        logging.getLogger("algorithm").removeHandler(records)
+
+    logged, generation = [], None
+    for message in records.messages:
+        if message.startswith("Generation "):
+            generation = int(message.split()[1])
+        elif message.startswith("Core Constraints conflicts") and generation is not None:
+            logged.append(generation)
+
+    fitness = [event["fitness"] for event in progress]
+    improved = [event["generation"] for i, event in enumerate(progress) if i == 0 or fitness[i] > fitness[i - 1]]
+    expected = sorted(set(improved) | {event["generation"] for event in progress if event["generation"] % 10 == 0})
+
+    success = (
+        [event["generation"] for event in progress] == list(range(1, len(progress) + 1))
+        and logged == expected
+        and len(evaluations) == len(improved)
+    )
+    return success, {"logged": logged, "expected": expected, "evaluations": len(evaluations), "improved": improved}
+
+def test_parallel_evaluator():
+    """Test that the worker processes evaluate a population like the calling process."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room, size=64)
+
+    expected = compiled.evaluate(population)
+    with ParallelEvaluator(compiled, 2, len(population)) as parallel:
+        actual = parallel.evaluate(population)
+
+    return np.array_equal(actual, expected), {"solutions": len(population), "workers": 2}
+
+
+def test_island_progress():
+    """Test that runs with several islands report the same progress fields as a single population."""
+    islands = get_config()["algorithm"]["islands"]
+    post_config({"algorithm": {"islands": 2}})
+    try:
+        post_input_data(load_test_input("equivalence"))
+        job_id = run_algorithm()["job_id"]
+        wait_for_completion()
+        result = get_job(job_id)
+    finally:
+        post_config({"algorithm": {"islands": islands}})
+
+    try:
+        progress = result["job"]["progress"]
+        fields = ("fitness", "core", "hard", "soft")
+        success = (
+            isinstance(progress["fitness"], float)
+            and len(progress["islands"]) == 2
+            and all(all(field in island for field in fields) for island in progress["islands"] + [progress])
+        )
+        return success, result
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        return False, result
+
+
+def _expressions(compiled):
+    return [constraint["fields"]["expression"]
+            for constraint, _ in compiled.constraints_hard + compiled.constraints_soft
+            if constraint["type"].lower() == "expression"]
+
+
+def _compare_expression_evaluator(backend):
+    lessons, date_x_room = inject_test_input("equivalence")
+    expressions = _expressions(problem.get_problem(lessons, date_x_room))
+    population = random_population(lessons, date_x_room)
+
+    expression_evaluator = evaluator_expression.ExpressionEvaluator(lessons, date_x_room, backend=backend)
+    for expression in expressions:
+        expression_evaluator.add(expression)
+
+    results = expression_evaluator.evaluate(population)
+    for solution, row in zip(population, results):
+        expected = [evaluator_expression.evaluate_expression(expression, solution, lessons, date_x_room)
+                    for expression in expressions]
+        if row.tolist() != expected:
+            return False, {"solution": solution.tolist(), "expected": expected, "actual": row.tolist()}
+
+    return True, {"solutions": len(population), "expressions": expressions, "violations": int(-results.sum())}
+
+
+def test_expression_evaluator():
+    """Test that the compiled expressions of the python backend evaluate like single interpreted expressions."""
+    return _compare_expression_evaluator("python")
+
+
+def test_expression_numpy_backend():
+    """Test that the NumPy backend of the expression DSL evaluates like single interpreted expressions."""
+    return _compare_expression_evaluator("numpy")
+
+
+LOWERED_EXPRESSIONS = [
+    "any(has_participant('M_INF', event) and day(event) == 1 and timeslot(event) <= 2 for event in events if not event_named(event, 'Englisch'))",
+    "all(3 > timeslot(event) for event in events_by_employee(events, 'BOE')) or not "
+    "events_all_same_day(events_by_employee(events, 'BAU'), 'Rechnernetze')",
+    "all('HS01' == event_room_name(event) or not on_timeslot(event, 5) for event in events_by_name(events, 'Analysis'))",
+]
+"""Expressions of further supported shapes, besides those of the equivalence input."""
+
+
+def test_expression_lowering():
+    """Test that expressions lowered to array evaluations agree with the interpreter."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    compiled = problem.get_problem(lessons, date_x_room)
+    population = random_population(lessons, date_x_room)
+
+    lowered = {}
+    for expression in _expressions(compiled) + LOWERED_EXPRESSIONS:
+        evaluate = evaluator_expression_lowering.lower_expression(expression, compiled)
+        if evaluate is not None:
+            lowered[expression] = evaluate(population)
+    if len(lowered) < len(LOWERED_EXPRESSIONS) + 4:
+        return False, {"lowered": list(lowered)}
+
+    for expression, results in lowered.items():
+        expected = [evaluator_expression.evaluate_expression(expression, solution, lessons, date_x_room)
+                    for solution in population]
+        if results.tolist() != expected:
+            return False, {"expression": expression, "expected": expected, "actual": results.tolist()}
+
+    return True, {expression: int(-results.sum()) for expression, results in lowered.items()}
+
+
+def test_resume_unknown_checkpoint():
+    """Test that resuming a checkpoint that does not exist is rejected and the status lists the checkpoints."""
+    post_input_data(load_test_input("equivalence"))
+    response = request_api("put", "stundenplan/", params={"resume": "unknown"})
+    status = request_api("get", "status/").json()
+
+    success = response.status_code == 404 and isinstance(status.get("checkpoints"), list)
+    return success, {"resume": response.status_code, "checkpoints": status.get("checkpoints")}
+
+
+def test_warm_start():
+    """Test that a run can start from the latest solution and unknown solutions are rejected."""
+    post_input_data(load_test_input("equivalence"))
+    run_algorithm()
+    wait_for_completion()
+
+    unknown = request_api("put", "stundenplan/", params={"warm_start": "unknown"})
+    response = request_api("put", "stundenplan/", params={"warm_start": "latest", "pin_unchanged": "true"})
+    wait_for_completion()
+    result = get_job(response.json()["job_id"]) if response.status_code == 202 else None
+
+    success = (
+        unknown.status_code == 404
+        and result is not None
+        and result["status"] == "completed"
+        and len(result["data"]["timetable"]) > 0
+    )
+    return success, {"unknown": unknown.status_code, "latest": response.status_code, "result": result}
+
+
+def test_weighted_fitness_result():
+    """Test that the latest result keeps the fractional fitness of weighted runs."""
+    weights = {"fitness_weight_core": 1.1, "fitness_weight_hard": 1.01, "fitness_weight_soft": 0.503}
+    algorithm = get_config()["algorithm"]
+    post_config({"algorithm": weights})
+    try:
+        job_id = post_input_data(load_test_input("equivalence"))["job_id"]
+        request_api("put", "stundenplan/", params={"job_id": job_id})
+        wait_for_completion()
+        expected = get_job(job_id)["data"]["metadata"]["fitness"]
+        result = get_result()
+    finally:
+        post_config({"algorithm": {key: algorithm[key] for key in weights}})
+
+    fitness = result["data"]["metadata"]["fitness"]
+    return fitness == expected and (fitness % 1 != 0 or fitness == 0), {"expected": expected, "fitness": fitness}
+
+def test_job_endpoints():
+    """Test that a posted input is run as its own job, which can be fetched by its id and only run once."""
+    job_id = post_input_data(load_test_input("equivalence"))["job_id"]
+    started = request_api("put", "stundenplan/", params={"job_id": job_id})
+    wait_for_completion()
+
+    result = request_api("get", f"stundenplan/{job_id}")
+    again = request_api("put", "stundenplan/", params={"job_id": job_id})
+    unknown = request_api("get", "stundenplan/unknown")
+    unknown_put = request_api("put", "stundenplan/", params={"job_id": "unknown"})
+
+    success = (
+        started.status_code == 202
+        and started.json()["job_id"] == job_id
+        and result.status_code == 200
+        and result.json()["job"]["id"] == job_id
+        and len(result.json()["data"]["timetable"]) > 0
+        and again.status_code == 409
+        and unknown.status_code == 404
+        and unknown_put.status_code == 404
+    )
+    return success, {
+        "started": started.status_code,
+        "result": result.status_code,
+        "again": again.status_code,
+        "unknown": unknown.status_code,
+        "unknown_put": unknown_put.status_code,
+    }
+
+
+
+def test_put_latest_posted_job():
+    """Test that a PUT without job_id runs the job of the latest POST and never an older created job."""
+    first = post_input_data(load_test_input("equivalence"))["job_id"]
+    second = post_input_data(load_test_input("equivalence"))["job_id"]
+    request_api("put", "stundenplan/", params={"job_id": second})
+    wait_for_completion()
+
+    started = request_api("put", "stundenplan/").json()["job_id"]
+    wait_for_completion()
+    first_job = get_job(first)["job"]
+
+    success = started not in (first, second) and first_job["status"] == "created"
+    return success, {"first": first, "second": second, "started": started, "first_status": first_job["status"]}
+
+
+def test_created_jobs_forgotten():
+    """Test that jobs which are created but never queued are forgotten like finished ones."""
+    queue = jobs.JobQueue(lambda: 1)
+    created = [queue.create({}, posted=True) for _ in range(jobs.MAX_JOBS + 10)]
+
+    success = (
+        len(queue.jobs) == jobs.MAX_JOBS + 1
+        and queue.latest_posted() is created[-1]
+        and created[0].id not in queue.jobs
+    )
+    return success, {"jobs": len(queue.jobs), "max_jobs": jobs.MAX_JOBS}
+
+def test_progress_stream():
+    """Test that the progress stream of a job sends its generations and ends with a done event."""
+    job_id = post_input_data(load_test_input("equivalence"))["job_id"]
+    request_api("put", "stundenplan/", params={"job_id": job_id})
+    response = request_api("get", f"stundenplan/{job_id}/progress", stream=True, timeout=60)
+    events = [line.split(":", 1)[1].strip() for line in response.iter_lines(decode_unicode=True)
+              if line.startswith("event:")]
+    wait_for_completion()
+
+    success = (
+        response.status_code == 200
+        and response.headers["Content-Type"].startswith("text/event-stream")
+        and "progress" in events
+        and events[-1] == "done"
+    )
+    return success, {"status_code": response.status_code, "events": events}
+
+
+def test_log_queries():
+    """Test that log lines can be queried by range and invalid queries are rejected."""
+    logs = request_api("get", "logs/").json()
+    for _ in range(6):
+        # every request adds a line to the server log
+        request_api("get", "status/")
+
+    tail = request_api("get", "logs/server", params={"limit": 5}).json()
+    latest = tail["latest"]
+    since = request_api("get", "logs/server", params={"since": latest - 3, "limit": 2}).json()
+    invalid = request_api("get", "logs/server", params={"since": "x"})
+    unknown = request_api("get", "logs/unknown")
+
+    success = (
+        "server" in logs
+        and [line["seq"] for line in tail["lines"]] == list(range(latest - 4, latest + 1))
+        and [line["seq"] for line in since["lines"]] == [latest - 2, latest - 1]
+        and since["next"] == latest - 1
+        and invalid.status_code == 400
+        and unknown.status_code == 404
+    )
+    return success, {
+        "logs": logs,
+        "tail": tail,
+        "since": since,
+        "invalid": invalid.status_code,
+        "unknown": unknown.status_code,
+    }
+
+
+def test_result_etag():
+    """Test that the latest result is served with an ETag, revalidated with 304 and compressed on request."""
+    post_input_data(load_test_input("equivalence"))
+    run_algorithm()
+    wait_for_completion()
+
+    first = request_api("get", "stundenplan/", headers={"Accept-Encoding": "identity"})
+    etag = first.headers.get("ETag")
+    second = request_api("get", "stundenplan/", headers={"Accept-Encoding": "identity"})
+    not_modified = request_api("get", "stundenplan/", headers={"If-None-Match": etag})
+    gzipped = request_api("get", "stundenplan/", headers={"Accept-Encoding": "gzip"})
+
+    run_algorithm()
+    wait_for_completion()
+    changed = request_api("get", "stundenplan/", headers={"If-None-Match": etag})
+
+    success = (
+        first.status_code == 200
+        and etag is not None
+        and second.headers.get("ETag") == etag
+        and second.content == first.content
+        and not_modified.status_code == 304
+        and not not_modified.content
+        and gzipped.headers.get("Content-Encoding") == "gzip"
+        and gzipped.json() == first.json()
+        and changed.status_code == 200
+        and changed.headers.get("ETag") != etag
+    )
+    return success, {
+        "etag": etag,
+        "not_modified": not_modified.status_code,
+        "content_encoding": gzipped.headers.get("Content-Encoding"),
+        "changed": changed.headers.get("ETag"),
+    }
+
+
+def test_compact_solution():
+    """Test that a solution saved in the compact format reads back like the same solution saved as JSON."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    population = random_population(lessons, date_x_room, size=4)
+    instance = SimpleNamespace(variables=(lessons, date_x_room))
+    fitness = evaluator.fitness_function_batch(instance, population, list(range(len(population)))).tolist()
+
+    parsed = [stundenplan_utils.parse_solution_for_print(solution.tolist(), solution_fitness, 1.5, date_x_room, lessons)
+              for solution, solution_fitness in zip(population, fitness)]
+    solutions = {"best": parsed[0], "candidates": dict(parsed[0], candidates=parsed[1:])}
+
+    output_path, pointer_path = path_utils.RESOURCE_OUTPUT_PATH, path_utils.LATEST_SOLUTION_POINTER_PATH
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path_utils.RESOURCE_OUTPUT_PATH = directory
+        path_utils.LATEST_SOLUTION_POINTER_PATH = os.path.join(directory, "latest_solution")
+        try:
+            for name, solution in solutions.items():
+                json_path = printer_json.save_solution(solution, f"{name}-json")
+                expected = reader_json.parse(json_path)
+                compact_path = printer_compact.save_solution(solution, f"{name}-compact")
+                # the compact result is compared as JSON, the way the API serves it
+                actual = json.loads(json.dumps(reader_compact.parse(compact_path), default=printer_json.json_default))
+                if actual != expected:
+                    return False, {"solution": name, "expected": expected, "actual": actual}
+                results[name] = {"json": os.path.getsize(json_path), "compact": os.path.getsize(compact_path)}
+        finally:
+            path_utils.RESOURCE_OUTPUT_PATH, path_utils.LATEST_SOLUTION_POINTER_PATH = output_path, pointer_path
+
+    return True, results
+
+
+def test_stream_timetable():
+    """Test that the streamed timetable of a job equals the timetable of its result."""
+    job_id = post_input_data(load_test_input("equivalence"))["job_id"]
+    request_api("put", "stundenplan/", params={"job_id": job_id})
+    wait_for_completion()
+
+    result = get_job(job_id)["data"]
+    response = request_api("get", f"stundenplan/{job_id}/timetable", stream=True)
+    chunks = list(response.iter_content(decode_unicode=True))
+    missing = request_api("get", "stundenplan/missing/timetable")
+
+    success = (
+        response.status_code == 200
+        and response.headers["Content-Type"].startswith("application/json")
+        and json.loads("".join(chunks)) == result["timetable"]
+        and missing.status_code == 404
+    )
+    return success, {"status": response.status_code, "chunks": len(chunks), "entries": len(result["timetable"]),
+                     "missing_status": missing.status_code}
+
+def test_corrupt_solution():
+    """Test that saved solutions which can't be read are parsed as None instead of raising."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    solution = random_population(lessons, date_x_room, size=1)[0]
+    parsed = stundenplan_utils.parse_solution_for_print(solution.tolist(), -1, 1.5, date_x_room, lessons)
+
+    output_path, pointer_path = path_utils.RESOURCE_OUTPUT_PATH, path_utils.LATEST_SOLUTION_POINTER_PATH
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path_utils.RESOURCE_OUTPUT_PATH = directory
+        path_utils.LATEST_SOLUTION_POINTER_PATH = os.path.join(directory, "latest_solution")
+        try:
+            for name, path in (("json", printer_json.save_solution(parsed, "json")),
+                               ("compact", printer_compact.save_solution(parsed, "compact"))):
+                results[name] = reader_compact.parse_solution(path) is not None
+                with open(path, "rb") as file:
+                    content = file.read()
+                for corruption, corrupt in (("truncated", content[:len(content) // 2]), ("garbage", b"\x00garbage")):
+                    with open(path, "wb") as file:
+                        file.write(corrupt)
+                    results[f"{name} {corruption}"] = reader_compact.parse_solution(path) is None
+                results[f"{name} missing"] = reader_compact.parse_solution(path + ".missing") is None
+        finally:
+            path_utils.RESOURCE_OUTPUT_PATH, path_utils.LATEST_SOLUTION_POINTER_PATH = output_path, pointer_path
+
+    return all(results.values()), results
+
+def test_parse_solution_into_timetable():
+    """Test that solutions are parsed into the same timetable as by the reference, also with duplicate events."""
+    lessons, date_x_room = inject_test_input("equivalence")
+    # solutions crowded into the first genes place many events with the same names into the same timeslots
+    population = np.concatenate([random_population(lessons, date_x_room),
+                                 random_population(lessons, date_x_room[:10], seed=1)])
+
+    duplicates = 0
+    for solution in population:
+        expected = reference.parse_solution_into_timetable(solution.tolist(), date_x_room, lessons)
+        actual = stundenplan_utils.parse_solution_into_timetable(solution.tolist(), date_x_room, lessons)
+        if actual != expected:
+            return False, {"solution": solution.tolist(), "expected": expected, "actual": actual}
+        duplicates += sum(1 for entry in expected if re.search(r" \(\d+\)$", entry["event"]))
+
+    return duplicates > 0, {"solutions": len(population), "duplicates": duplicates}
+
+
+def _malformed_inputs(data):
+    events = data["events"]
+    yield "no events", {key: value for key, value in data.items() if key != "events"}
+    yield "events not a list", dict(data, events={"event": events[0]})
+    yield "event not an object", dict(data, events=events[:1] + ["event"] + events[1:])
+    yield "event without name", dict(data, events=[{key: value for key, value in events[0].items() if key != "name"}])
+    yield "hard constraints not a list", dict(data, constraints=dict(data["constraints"], hard=None))
+    yield "constraints not an object", dict(data, constraints=[])
+    yield "not an object", [data]
+    yield "empty", {}
+
+
+def test_read_input():
+    """Test that reading an input while it is received verifies it like the whole input read at once."""
+    script_dir = os.path.dirname(__file__)
+    inputs = [(name[:-len(".json")], load_test_input(name[:-len(".json")]))
+              for name in sorted(os.listdir(os.path.join(script_dir, "input")))]
+    inputs += list(_malformed_inputs(load_test_input("equivalence")))
+
+    invalid = []
+    for name, data in inputs:
+        for indent in (None, 4):
+            body = json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+            expected = stundenplan_utils.verify_input(json.loads(body))
+            actual_data, actual = stundenplan_utils.read_input(io.BytesIO(body))
+            if actual_data != data or actual != expected:
+                return False, {"input": name, "indent": indent, "expected": expected, "actual": actual}
+        if not expected["success"]:
+            invalid.append(name)
+
+    rejected = []
+    for body in (b"", b"{", b'{"events": []} []', b'{"events": [1,]}'):
+        try:
+            stundenplan_utils.read_input(io.BytesIO(body))
+        except ValueError:
+            rejected.append(body.decode("utf-8"))
+
+    return len(rejected) == 4, {"inputs": len(inputs), "invalid": invalid, "rejected": rejected}